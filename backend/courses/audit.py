@@ -0,0 +1,242 @@
+import threading
+from typing import NamedTuple
+
+from .catalog_version import get_catalog_version
+from .models import CoursePrereq, Major, MajorRequirement, Student, StudentTakenCourse
+
+
+class Rule(NamedTuple):
+    """A compiled requirement: `courses` is the bit mask of its courses in the rule set."""
+    requirement: int
+    count: int
+    elective: bool
+    courses: int
+
+
+class Program(NamedTuple):
+    """The compiled requirements of a major or core."""
+    major: int
+    name: str
+    is_major: bool
+    rules: tuple
+
+
+class RequirementAudit(NamedTuple):
+    """The audit of a requirement: the number of its distinct courses taken out of `count`."""
+    requirement: int
+    count: int
+    elective: bool
+    satisfied: int
+
+    @property
+    def complete(self):
+        return self.satisfied >= self.count
+
+
+class ProgramAudit(NamedTuple):
+    """The audit of a major or core, complete when all its requirements are."""
+    major: int
+    name: str
+    is_major: bool
+    requirements: tuple
+
+    @property
+    def complete(self):
+        return all(requirement.complete for requirement in self.requirements)
+
+    def as_dict(self):
+        """Get the audit as JSON data."""
+        return {
+            'major': self.name,
+            'is_major': self.is_major,
+            'complete': self.complete,
+            'requirements': [
+                {'requirement': requirement.requirement, 'count': requirement.count, 'elective': requirement.elective,
+                 'satisfied': requirement.satisfied, 'complete': requirement.complete}
+                for requirement in self.requirements
+            ],
+        }
+
+
+class RuleSet():
+    """The requirements and prerequisites of the catalog compiled to bit masks.
+
+    Every course of a requirement or of a prerequisite has a bit, a set of
+    courses is an int. Auditing a student is then one dict lookup per taken
+    course and one `&` per requirement, whatever the number of courses in the
+    requirements. Built once per catalog version by `get_rule_set`, nothing
+    here may be mutated by callers.
+    """
+    def __init__(self, version, majors, requirements, requirement_courses, prereqs):
+        """Compile the catalog rows.
+
+        Args:
+            version (int): The catalog version the rows were read at.
+            majors (iterable): (id, name, is_major) of every major and core.
+            requirements (iterable): (id, major id, count, elective) of every requirement.
+            requirement_courses (iterable): (requirement id, course id) of every course of a requirement.
+            prereqs (iterable): (course id, prerequisite set id, course id of the set) rows,
+                the course of an empty set is None.
+        """
+        self.version = version
+        self.bits = {}
+
+        courses = {}
+        for requirement_id, course_id in requirement_courses:
+            courses[requirement_id] = courses.get(requirement_id, 0) | self._bit(course_id)
+        rules = {}
+        for requirement_id, major_id, count, elective in requirements:
+            rules.setdefault(major_id, []).append(Rule(requirement_id, count, elective, courses.get(requirement_id, 0)))
+        self.programs = {
+            major_id: Program(major_id, name, is_major, tuple(rules.get(major_id, ())))
+            for major_id, name, is_major in majors
+        }
+        self.by_name = {program.name.lower(): program for program in self.programs.values()}
+        self.cores = tuple(program for program in self.programs.values() if not program.is_major)
+        # the courses of the requirements, the only ones a student is told to take
+        self.requirement_courses = 0
+        for mask in courses.values():
+            self.requirement_courses |= mask
+
+        # course bit -> the masks of its prerequisite sets, a course needs one course of every set
+        sets = {}
+        for course_id, prereq_id, required_id in prereqs:
+            key = (self._bit(course_id), prereq_id)
+            sets[key] = sets.get(key, 0) | (self._bit(required_id) if required_id is not None else 0)
+        prereq_masks = {}
+        for (course_bit, prereq_id), mask in sets.items():
+            prereq_masks.setdefault(course_bit, []).append(mask)
+        self.prereqs = tuple((course_bit, tuple(masks)) for course_bit, masks in prereq_masks.items())
+        self.course_ids = {bit: course_id for course_id, bit in self.bits.items()}
+
+    def _bit(self, course_id):
+        bit = self.bits.get(course_id)
+        if bit is None:
+            bit = self.bits[course_id] = 1 << len(self.bits)
+        return bit
+
+    def taken_mask(self, course_ids):
+        """Get the mask of taken courses, the courses the catalog does not use are left out.
+
+        Args:
+            course_ids (iterable): The canonical ids of the taken courses.
+
+        Returns:
+            int: The mask.
+        """
+        bits = self.bits
+        mask = 0
+        for course_id in course_ids:
+            mask |= bits.get(course_id, 0)
+        return mask
+
+    def programs_of(self, major_ids):
+        """Get the programs a student is audited against: the cores and those of its majors."""
+        programs = self.programs
+        return self.cores + tuple(
+            programs[major_id] for major_id in major_ids if major_id in programs and programs[major_id].is_major
+        )
+
+    def audit(self, taken, major_ids=()):
+        """Audit a student.
+
+        Args:
+            taken (int): The mask of the taken courses, see `taken_mask`.
+            major_ids (iterable): The majors of the student.
+
+        Returns:
+            list: The `ProgramAudit` of every core, then of every major.
+        """
+        return [
+            ProgramAudit(program.major, program.name, program.is_major, tuple(
+                RequirementAudit(rule.requirement, rule.count, rule.elective, (taken & rule.courses).bit_count())
+                for rule in program.rules
+            ))
+            for program in self.programs_of(major_ids)
+        ]
+
+    def eligible(self, taken):
+        """Get the requirement courses not taken whose prerequisites are met.
+
+        Args:
+            taken (int): The mask of the taken courses.
+
+        Returns:
+            int: The mask of the eligible courses.
+        """
+        eligible = self.requirement_courses & ~taken
+        for course_bit, masks in self.prereqs:
+            if eligible & course_bit:
+                for mask in masks:
+                    if not taken & mask:
+                        eligible &= ~course_bit
+                        break
+        return eligible
+
+    def course_ids_of(self, mask):
+        """Get the ids of the courses of a mask, sorted."""
+        course_ids = []
+        while mask:
+            bit = mask & -mask
+            course_ids.append(self.course_ids[bit])
+            mask ^= bit
+        return sorted(course_ids)
+
+
+def compile_rule_set(version):
+    """Read the catalog and compile it, in 4 queries.
+
+    Args:
+        version (int): The catalog version the rows are read at.
+
+    Returns:
+        RuleSet: The compiled catalog.
+    """
+    return RuleSet(
+        version,
+        Major.objects.order_by('id').values_list('id', 'name', 'is_major'),
+        MajorRequirement.objects.order_by('id').values_list('id', 'major_id', 'count', 'elective'),
+        MajorRequirement.courses.through.objects.values_list('majorrequirement_id', 'course_id'),
+        CoursePrereq.objects.values_list('course_id', 'id', 'prereqs'),
+    )
+
+
+_rule_set = None
+_rule_set_lock = threading.Lock()
+
+
+def get_rule_set():
+    """Get the compiled catalog of this process, compiled again when the catalog version changes.
+
+    Returns:
+        RuleSet: The shared rule set.
+    """
+    global _rule_set
+    version = get_catalog_version()
+    if _rule_set is None or _rule_set.version != version:
+        with _rule_set_lock:
+            if _rule_set is None or _rule_set.version != version:
+                _rule_set = compile_rule_set(version)
+    return _rule_set
+
+
+def audit_students(student_ids, batch_size=1000):
+    """Audit stored students, reading their taken courses and majors in batches.
+
+    Args:
+        student_ids (list): The `Student` ids.
+        batch_size (int): The number of students read per query.
+
+    Yields:
+        tuple: (student id, list of `ProgramAudit`), in the order of the ids.
+    """
+    rule_set = get_rule_set()
+    for start in range(0, len(student_ids), batch_size):
+        ids = student_ids[start:start + batch_size]
+        taken, majors = {}, {}
+        for student_id, course_id in StudentTakenCourse.objects.filter(student_id__in=ids).values_list('student_id', 'course_id'):
+            taken.setdefault(student_id, []).append(course_id)
+        for student_id, major_id in Student.major.through.objects.filter(student_id__in=ids).values_list('student_id', 'major_id'):
+            majors.setdefault(student_id, []).append(major_id)
+        for student_id in ids:
+            yield student_id, rule_set.audit(rule_set.taken_mask(taken.get(student_id, ())), majors.get(student_id, ()))
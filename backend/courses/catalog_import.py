@@ -0,0 +1,349 @@
+from typing import NamedTuple
+
+from django.db import transaction
+
+from .catalog_version import catalog_import
+from .course_id import split_course_title
+from .models import Course, CoursePrereq, Major, MajorRequirement, Student
+from .progress import refresh_progress
+from .recommendor.catalog import get_catalog
+
+
+# the major the catalog files describe, and the number of its electives
+CS_MAJOR = 'CS'
+CS_ELECTIVE_COUNT = 4
+
+# the core categories counted together, two of their courses are required
+COMBINED_CORES = ('IPC', 'HPC', 'SSPC')
+COMBINED_CORE = 'IPC/HPC/SSPC'
+COMBINED_CORE_COUNT = 2
+# the language core is not a requirement of the database
+SKIPPED_CORES = ('Language',)
+
+
+class CatalogCourse(NamedTuple):
+    """A course of the catalog files: (id, name, credit), `credit` is None when no file lists it."""
+    id: str
+    name: str
+    credit: object
+
+
+class CatalogRequirement(NamedTuple):
+    """A requirement of the catalog files: (count, elective, courses), `courses` a frozenset of ids."""
+    count: int
+    elective: bool
+    courses: frozenset
+
+
+class CatalogProgram(NamedTuple):
+    """A major or a core of the catalog files: (name, is_major, requirements)."""
+    name: str
+    is_major: bool
+    requirements: tuple
+
+
+class CatalogData(NamedTuple):
+    """What the catalog files put in the database.
+
+    `courses` maps course ids to `CatalogCourse`, `prereqs` the SH electives
+    and the major courses, the only courses with prerequisites in the files,
+    to the frozensets of course ids a student must take one of.
+    """
+    courses: dict
+    programs: tuple
+    prereqs: dict
+
+
+def catalog_data(catalog):
+    """Get the courses, majors, cores and prerequisites of the catalog files.
+
+    A course in several files gets the first name and credits listed, in the
+    order the files were always imported in: CS major courses, SH electives,
+    NY electives, NY cores, SH cores and the courses only named as prerequisites.
+
+    Args:
+        catalog (CourseCatalog): The catalog files.
+
+    Returns:
+        CatalogData: The rows of the catalog.
+    """
+    listed = []
+    for group in catalog.cs_major_courses:
+        listed += [CatalogCourse(*split_course_title(title), None) for title in group]
+    listed += [CatalogCourse(course.id, course.name, course.credits) for course in catalog.sh_elective_courses]
+    listed += [CatalogCourse(course.id, course.name, course.credits) for course in catalog.ny_elective_courses]
+    for core_courses in (catalog.ny_core_courses, catalog.sh_core_courses):
+        listed += [CatalogCourse(course.id, course.name, course.credits)
+                   for category in core_courses.values() for course in category]
+    for course in catalog.sh_elective_courses:
+        for pre_req in course.pre_reqs:
+            listed += [CatalogCourse(*split_course_title(option), None) for option in pre_req.split(' OR ')]
+    prereqs = {course_id: [frozenset(group) for group in groups] for course_id, groups in catalog.course_prereqs.items()}
+
+    courses = {}
+    for course in listed:
+        known = courses.get(course.id)
+        if known is None:
+            courses[course.id] = course
+        elif not known.name and course.name or known.credit is None and course.credit is not None:
+            courses[course.id] = CatalogCourse(course.id, known.name or course.name,
+                                               course.credit if known.credit is None else known.credit)
+
+    electives = frozenset(course.id for course in catalog.sh_elective_courses + catalog.ny_elective_courses)
+    programs = [CatalogProgram(CS_MAJOR, True, tuple(
+        [CatalogRequirement(1, False, frozenset(group)) for group in catalog.major_groups]
+        + [CatalogRequirement(CS_ELECTIVE_COUNT, True, electives)]
+    ))]
+    # the NY and SH courses of a core are one requirement
+    cores = {}
+    for core_courses in (catalog.ny_core_courses, catalog.sh_core_courses):
+        for category, category_courses in core_courses.items():
+            if category in SKIPPED_CORES:
+                continue
+            name = COMBINED_CORE if category in COMBINED_CORES else category
+            cores.setdefault(name, set()).update(course.id for course in category_courses)
+    # the combined core last, as it was always created
+    for name in sorted(cores, key=lambda name: name == COMBINED_CORE):
+        count = COMBINED_CORE_COUNT if name == COMBINED_CORE else 1
+        programs.append(CatalogProgram(name, False, (CatalogRequirement(count, False, frozenset(cores[name])),)))
+    return CatalogData(courses, tuple(programs), prereqs)
+
+
+class RequirementUpdate(NamedTuple):
+    """A requirement of the database changed to one of the catalog: (requirement, added, removed) course ids."""
+    requirement: MajorRequirement
+    added: frozenset
+    removed: frozenset
+
+
+class CatalogDiff():
+    """The changes making the database that of the catalog files, see `diff_catalog`.
+
+    Only the catalog is written: courses of the database not in the files,
+    eg. created from the histories, are kept, as the majors and cores the
+    files do not describe and the descriptions of the courses.
+    """
+    def __init__(self, programs):
+        """Initialize an empty diff.
+
+        Args:
+            programs (dict): (name, is_major) -> `Major` of the database, for
+                the majors and cores of the catalog already created.
+        """
+        self.programs = programs
+        self.new_courses = []
+        self.updated_courses = []
+        self.new_programs = []
+        # ((program name, is_major), `CatalogRequirement`) pairs to create
+        self.new_requirements = []
+        self.updated_requirements = []
+        self.deleted_requirements = []
+        # (course id, frozenset of course ids) prerequisite sets to create
+        self.new_prereqs = []
+        self.deleted_prereqs = []
+
+    def __bool__(self):
+        """Whether anything changes."""
+        return any((self.new_courses, self.updated_courses, self.new_programs, self.new_requirements,
+                    self.updated_requirements, self.deleted_requirements, self.new_prereqs, self.deleted_prereqs))
+
+    @property
+    def requirements_changed(self):
+        """Whether the requirements of the students change, and with them their progress."""
+        return bool(self.new_requirements or self.updated_requirements or self.deleted_requirements)
+
+    def summary(self):
+        """Describe the changes.
+
+        Returns:
+            list: One line per kind of row changed, empty when nothing changes.
+        """
+        counts = (
+            ('courses', len(self.new_courses), len(self.updated_courses), 0),
+            ('majors and cores', len(self.new_programs), 0, 0),
+            ('requirements', len(self.new_requirements), len(self.updated_requirements), len(self.deleted_requirements)),
+            ('prerequisite sets', len(self.new_prereqs), 0, len(self.deleted_prereqs)),
+        )
+        return [
+            f"{name}: {created} created, {updated} updated, {deleted} deleted"
+            for name, created, updated, deleted in counts if created or updated or deleted
+        ]
+
+
+def _match(wanted, existing):
+    """Pair the rows of the catalog with those of the database, equal ones first.
+
+    Args:
+        wanted (list): The values of the catalog.
+        existing (list): (row, value) pairs of the database, the oldest first.
+
+    Returns:
+        tuple: The (row, value) pairs of the database to change to a value of
+            the catalog, the values left to create and the rows left to delete.
+    """
+    unmatched = list(wanted)
+    rest = []
+    for row, value in existing:
+        if value in unmatched:
+            unmatched.remove(value)
+        else:
+            rest.append(row)
+    changed = list(zip(rest, unmatched))
+    return changed, unmatched[len(changed):], rest[len(changed):]
+
+
+def diff_catalog(data):
+    """Compare the catalog with the database, in 5 queries.
+
+    Args:
+        data (CatalogData): The catalog, see `catalog_data`.
+
+    Returns:
+        CatalogDiff: The changes.
+    """
+    # a program created twice is the first one
+    programs = {}
+    for major in Major.objects.filter(name__in=[program.name for program in data.programs]).order_by('-id'):
+        programs[major.name, major.is_major] = major
+    diff = CatalogDiff(programs)
+    stored = {
+        course_id: (name, credit) for course_id, name, credit
+        in Course.objects.filter(id__in=data.courses).values_list('id', 'name', 'credit')
+    }
+    for course in data.courses.values():
+        if course.id not in stored:
+            diff.new_courses.append(Course(
+                id=course.id, name=course.name,
+                **({} if course.credit is None else {'credit': course.credit}),
+            ))
+            continue
+        name, credit = stored[course.id]
+        if course.name and course.name != name or course.credit is not None and course.credit != credit:
+            diff.updated_courses.append(Course(
+                id=course.id, name=course.name or name, credit=credit if course.credit is None else course.credit,
+            ))
+
+    requirements = {}
+    for requirement in MajorRequirement.objects.filter(major__in=programs.values()).order_by('id'):
+        requirements.setdefault(requirement.major_id, []).append(requirement)
+    requirement_courses = {}
+    rows = MajorRequirement.courses.through.objects.filter(majorrequirement__major__in=programs.values())
+    for requirement_id, course_id in rows.values_list('majorrequirement_id', 'course_id'):
+        requirement_courses.setdefault(requirement_id, set()).add(course_id)
+
+    for program in data.programs:
+        major = programs.get((program.name, program.is_major))
+        if major is None:
+            diff.new_programs.append(Major(name=program.name, is_major=program.is_major))
+            diff.new_requirements += [((program.name, program.is_major), wanted) for wanted in program.requirements]
+            continue
+        existing = [
+            (requirement, CatalogRequirement(
+                requirement.count, requirement.elective, frozenset(requirement_courses.get(requirement.id, ()))
+            ))
+            for requirement in requirements.get(major.id, [])
+        ]
+        current = dict(existing)
+        changed, created, deleted = _match(program.requirements, existing)
+        for requirement, wanted in changed:
+            courses = current[requirement].courses
+            requirement.count, requirement.elective = wanted.count, wanted.elective
+            diff.updated_requirements.append(
+                RequirementUpdate(requirement, wanted.courses - courses, courses - wanted.courses)
+            )
+        diff.new_requirements += [((program.name, program.is_major), wanted) for wanted in created]
+        diff.deleted_requirements += [requirement.id for requirement in deleted]
+
+    prereqs = {}
+    rows = CoursePrereq.objects.filter(course__in=data.prereqs).order_by('id').values_list('course_id', 'id', 'prereqs')
+    for course_id, prereq_id, required_id in rows:
+        courses = prereqs.setdefault(course_id, {}).setdefault(prereq_id, set())
+        if required_id is not None:
+            courses.add(required_id)
+    for course_id, groups in data.prereqs.items():
+        existing = [(prereq_id, frozenset(courses)) for prereq_id, courses in prereqs.get(course_id, {}).items()]
+        changed, created, deleted = _match(groups, existing)
+        # prerequisite sets are not referenced, a changed one is created again
+        diff.new_prereqs += [(course_id, group) for group in created + [group for prereq_id, group in changed]]
+        diff.deleted_prereqs += deleted + [prereq_id for prereq_id, group in changed]
+    return diff
+
+
+def apply_catalog_diff(diff):
+    """Write the changes of `diff_catalog` in one transaction, with bulk queries.
+
+    The catalog version is bumped once, and the requirement progress of the
+    students is computed again when the requirements changed.
+
+    Args:
+        diff (CatalogDiff): The changes.
+    """
+    if not diff:
+        return
+    Through = MajorRequirement.courses.through
+    PrereqThrough = CoursePrereq.prereqs.through
+    with transaction.atomic(), catalog_import():
+        if diff.new_courses:
+            # a course created meanwhile from a history is updated by the next import
+            Course.objects.bulk_create(diff.new_courses, ignore_conflicts=True)
+        if diff.updated_courses:
+            Course.objects.bulk_update(diff.updated_courses, ['name', 'credit'])
+
+        programs = dict(diff.programs)
+        programs.update(((major.name, major.is_major), major) for major in Major.objects.bulk_create(diff.new_programs))
+        if diff.deleted_requirements:
+            MajorRequirement.objects.filter(id__in=diff.deleted_requirements).delete()
+        if diff.updated_requirements:
+            MajorRequirement.objects.bulk_update(
+                [update.requirement for update in diff.updated_requirements], ['count', 'elective'],
+            )
+            for update in diff.updated_requirements:
+                if update.removed:
+                    Through.objects.filter(majorrequirement_id=update.requirement.id, course_id__in=update.removed).delete()
+        new_requirements = MajorRequirement.objects.bulk_create(
+            MajorRequirement(major=programs[key], count=wanted.count, elective=wanted.elective)
+            for key, wanted in diff.new_requirements
+        )
+        Through.objects.bulk_create(
+            [Through(majorrequirement_id=requirement.id, course_id=course_id)
+             for requirement, (key, wanted) in zip(new_requirements, diff.new_requirements)
+             for course_id in wanted.courses]
+            + [Through(majorrequirement_id=update.requirement.id, course_id=course_id)
+               for update in diff.updated_requirements for course_id in update.added],
+            batch_size=1000,
+        )
+
+        if diff.deleted_prereqs:
+            CoursePrereq.objects.filter(id__in=diff.deleted_prereqs).delete()
+        new_prereqs = CoursePrereq.objects.bulk_create(
+            CoursePrereq(course_id=course_id) for course_id, group in diff.new_prereqs
+        )
+        PrereqThrough.objects.bulk_create(
+            (PrereqThrough(courseprereq_id=prereq.id, course_id=course_id)
+             for prereq, (prereq_course_id, group) in zip(new_prereqs, diff.new_prereqs) for course_id in group),
+            batch_size=1000,
+        )
+
+    if diff.requirements_changed:
+        student_ids = list(Student.objects.order_by('id').values_list('id', flat=True))
+        for start in range(0, len(student_ids), 500):
+            refresh_progress(student_ids[start:start + 500])
+
+
+def import_catalog(catalog=None, dry_run=False):
+    """Make the courses, majors, cores and prerequisites of the database those of the catalog files.
+
+    Importing the same files again changes nothing: the rows of the database
+    are compared with the files before anything is written.
+
+    Args:
+        catalog (CourseCatalog): The catalog files, those of `get_catalog` by default.
+        dry_run (bool): Only compute the changes.
+
+    Returns:
+        CatalogDiff: The changes, written unless `dry_run`.
+    """
+    diff = diff_catalog(catalog_data(catalog or get_catalog()))
+    if not dry_run:
+        apply_catalog_diff(diff)
+    return diff
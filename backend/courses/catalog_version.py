@@ -0,0 +1,84 @@
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import models
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils import timezone
+
+from .models import CatalogVersion, Course, CoursePrereq, Major, MajorRequirement
+
+
+# the models the catalog is made of, a change to any of them bumps the version
+CATALOG_MODELS = (Major, Course, MajorRequirement, CoursePrereq)
+CATALOG_RELATIONS = (MajorRequirement.courses.through, CoursePrereq.prereqs.through)
+
+# the cache alias in settings.CACHES the version is kept in, to be read without a query
+VERSION_CACHE = 'default'
+VERSION_KEY = 'catalog-version'
+
+_state = threading.local()
+
+
+def get_catalog_version():
+    """Get the version of the catalog.
+
+    The version is read from the database at most once per
+    `settings.CATALOG_VERSION_TIMEOUT` seconds, a process whose cache is not
+    shared sees the changes made by another process after at most that long.
+
+    Returns:
+        int: The version, 0 before the first change.
+    """
+    cache = caches[VERSION_CACHE]
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = CatalogVersion.objects.values_list('version', flat=True).first() or 0
+        cache.set(VERSION_KEY, version, timeout=settings.CATALOG_VERSION_TIMEOUT)
+    return version
+
+
+def bump_catalog_version():
+    """Give the catalog a new version, the data built from the previous one is stale.
+
+    Returns:
+        int: The new version.
+    """
+    updated = CatalogVersion.objects.update(version=models.F('version') + 1, updated=timezone.now())
+    if not updated:
+        CatalogVersion.objects.get_or_create(defaults={'version': 0})
+        CatalogVersion.objects.update(version=models.F('version') + 1, updated=timezone.now())
+    version = CatalogVersion.objects.values_list('version', flat=True).first()
+    caches[VERSION_CACHE].set(VERSION_KEY, version, timeout=settings.CATALOG_VERSION_TIMEOUT)
+    return version
+
+
+@contextmanager
+def catalog_import():
+    """Bump the catalog version once for all the changes made in the block, not once per change."""
+    depth = getattr(_state, 'depth', 0)
+    _state.depth = depth + 1
+    try:
+        yield
+    finally:
+        _state.depth = depth
+    if depth == 0:
+        bump_catalog_version()
+
+
+def _catalog_changed(sender, **kwargs):
+    if kwargs.get('raw') or getattr(_state, 'depth', 0):
+        # fixtures loading, or an import bumping the version once at its end
+        return
+    if kwargs.get('action', 'post_').startswith('post_'):
+        bump_catalog_version()
+
+
+def connect_signals():
+    """Bump the catalog version on every save or delete of the catalog models, eg. in the admin."""
+    for model in CATALOG_MODELS:
+        post_save.connect(_catalog_changed, sender=model, dispatch_uid=f'catalog-save-{model.__name__}')
+        post_delete.connect(_catalog_changed, sender=model, dispatch_uid=f'catalog-delete-{model.__name__}')
+    for through in CATALOG_RELATIONS:
+        m2m_changed.connect(_catalog_changed, sender=through, dispatch_uid=f'catalog-m2m-{through.__name__}')
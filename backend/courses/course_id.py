@@ -0,0 +1,74 @@
+import re
+import sys
+from functools import lru_cache
+
+
+# subject ('CSCI-SHU'), optional ' - ' separator and catalog number ('220', '301A')
+_COURSE_ID_PATTERN = re.compile(r'^([A-Za-z]+-[A-Za-z]+)\s*(?:-\s*)?(\S+)$')
+
+# 'CSCI-SHU 11 Introduction to Computer Programming' -> ('CSCI-SHU 11', 'Introduction to ...')
+_COURSE_TITLE_PATTERN = re.compile(r'^\s*([A-Za-z]+-[A-Za-z]+)\s+(?:-\s+)?(\S+)\s*(.*?)\s*$')
+
+# cross-listed courses are written 'INFO-UB 23/TECH-UB 23'
+ALIAS_SEPARATOR = '/'
+
+
+def _canonical_part(course_id):
+    """Canonicalize a single (not cross-listed) course number."""
+    course_id = ' '.join(course_id.split())
+    match = _COURSE_ID_PATTERN.match(course_id)
+    if match is None:
+        # not a course number we understand, only the whitespace is normalized
+        return course_id
+    subject, number = match.groups()
+    return f'{subject.upper()} {number.upper()}'
+
+
+@lru_cache(maxsize=8192)
+def canonical_course_id(course_id):
+    """Get the canonical form of a course number.
+
+    'CSCI-SHU - 220', 'CSCI-SHU 220' and ' csci-shu  220 ' all give 'CSCI-SHU 220',
+    cross-listed numbers keep every alias: 'INFO-UB 23/TECH-UB 23'. The result is
+    interned, so canonical ids can be compared and hashed cheaply.
+
+    Args:
+        course_id (str): The course number as found in a transcript or a catalog.
+
+    Returns:
+        str: The canonical course number.
+    """
+    parts = (_canonical_part(part) for part in course_id.split(ALIAS_SEPARATOR))
+    return sys.intern(ALIAS_SEPARATOR.join(part for part in parts if part))
+
+
+@lru_cache(maxsize=8192)
+def course_id_aliases(course_id):
+    """Get every canonical number of a (possibly cross-listed) course.
+
+    Args:
+        course_id (str): The course number.
+
+    Returns:
+        tuple: The canonical numbers, eg. ('INFO-UB 23', 'TECH-UB 23').
+    """
+    return tuple(sys.intern(part) for part in canonical_course_id(course_id).split(ALIAS_SEPARATOR) if part)
+
+
+def split_course_title(title):
+    """Split a catalog title into the canonical course number and the course name.
+
+    Args:
+        title (str): eg. 'CSCI-SHU 11 Introduction to Computer Programming'.
+
+    Returns:
+        tuple: The course number and the course name ('' if there is no name).
+
+    Raises:
+        ValueError: If the title does not start with a course number.
+    """
+    match = _COURSE_TITLE_PATTERN.match(title)
+    if match is None:
+        raise ValueError(f"Cannot parse course title {title!r}")
+    subject, number, name = match.groups()
+    return canonical_course_id(f'{subject} {number}'), name
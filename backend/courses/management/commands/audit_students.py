@@ -0,0 +1,49 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.audit import audit_students
+from courses.models import Student
+
+
+class Command(BaseCommand):
+    """Audit a cohort against the requirements of the database and write the results as NDJSON."""
+
+    help = ("Audit students against their cores and majors, compiled from the requirements in the database, "
+            "one JSON line per student.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('students', nargs='*', type=int, help="Ids of the students to audit.")
+        parser.add_argument('--all', action='store_true', help="Audit every student.")
+        parser.add_argument('--incomplete', action='store_true', help="Only write the students with a requirement left.")
+        parser.add_argument('--output', help="Write the results to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        student_ids = options['students']
+        if options['all']:
+            student_ids = list(Student.objects.order_by('id').values_list('id', flat=True))
+        if not student_ids:
+            raise CommandError("Nothing to do, give student ids or --all.")
+
+        output = open(options['output'], 'w') if options['output'] else self.stdout
+        start = time.perf_counter()
+        incomplete = 0
+        try:
+            for student_id, audits in audit_students(student_ids):
+                complete = all(audit.complete for audit in audits)
+                incomplete += not complete
+                if complete and options['incomplete']:
+                    continue
+                output.write(json.dumps({
+                    'student': student_id, 'complete': complete, 'programs': [audit.as_dict() for audit in audits],
+                }) + '\n')
+        finally:
+            if output is not self.stdout:
+                output.close()
+        elapsed = time.perf_counter() - start
+
+        self.stderr.write(
+            f"{len(student_ids)} students, {incomplete} incomplete, {elapsed:.2f}s, "
+            f"{len(student_ids) / elapsed if elapsed else 0:.1f} students/sec"
+        )
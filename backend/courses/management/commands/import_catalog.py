@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.catalog_import import import_catalog
+from courses.recommendor.catalog import CatalogError
+
+
+class Command(BaseCommand):
+    """Import the catalog files in the database."""
+
+    help = ("Make the courses, CS major, cores and prerequisites of the database those of the catalog JSON files, "
+            "in one transaction. Nothing is written when the database already matches the files.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report the changes without writing them.")
+
+    def handle(self, *args, **options):
+        try:
+            diff = import_catalog(dry_run=options['dry_run'])
+        except (CatalogError, ValueError) as exc:
+            raise CommandError(f"Cannot import the catalog: {exc}")
+        if not diff:
+            self.stdout.write("catalog unchanged")
+            return
+        for line in diff.summary():
+            self.stdout.write(line)
+        if options['dry_run']:
+            self.stdout.write("dry run, nothing written")
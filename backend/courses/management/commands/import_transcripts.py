@@ -0,0 +1,67 @@
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.transcript_import import ImportCheckpoint, import_histories, iter_transcripts, parse_transcript_files
+
+
+class Command(BaseCommand):
+    """Import a cohort of exported transcripts."""
+
+    help = ("Parse the transcript pages of a folder or tarball in parallel and write the students, "
+            "the username of a student is the file name without its extension.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Folder (searched recursively) or tarball of transcript HTML files.")
+        parser.add_argument('--pattern', default='*', help="Glob pattern of the file names to import.")
+        parser.add_argument('--workers', type=int, default=None, help="Worker processes, one per core by default.")
+        parser.add_argument('--batch-size', type=int, default=500, help="Students written per transaction.")
+        parser.add_argument('--checkpoint', help="File of the imported files, an import started again skips them.")
+        parser.add_argument('--error-log', help="Write the files that failed to this file instead of stderr.")
+
+    def handle(self, *args, **options):
+        path, batch_size = options['path'], options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1")
+        try:
+            checkpoint = ImportCheckpoint(options['checkpoint'])
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f"Cannot read the checkpoint {options['checkpoint']}: {exc}")
+        try:
+            items = iter_transcripts(path, options['pattern'], skip=checkpoint.done)
+            results = parse_transcript_files(items, workers=options['workers'])
+            error_log = open(options['error_log'], 'a') if options['error_log'] else self.stderr
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        start = time.perf_counter()
+        imported = failed = 0
+        try:
+            while True:
+                try:
+                    batch = list(islice(results, batch_size))
+                except (OSError, EOFError) as exc:
+                    raise CommandError(f"Cannot read {path}: {exc}")
+                if not batch:
+                    break
+                parsed = [result for result in batch if result.error is None]
+                for result in batch:
+                    if result.error is not None:
+                        error_log.write(f"{result.name}\t{result.error}\n")
+                import_histories(parsed)
+                checkpoint.add(result.name for result in parsed)
+                imported += len(parsed)
+                failed += len(batch) - len(parsed)
+                elapsed = time.perf_counter() - start
+                self.stderr.write(f"{imported + failed} files, {failed} failed, {(imported + failed) / elapsed:.1f} files/sec")
+        finally:
+            if error_log is not self.stderr:
+                error_log.close()
+        elapsed = time.perf_counter() - start
+
+        files = imported + failed
+        self.stdout.write(
+            f"{files} files, {imported} imported, {failed} failed, {len(checkpoint.done) - imported} skipped, "
+            f"{elapsed:.2f}s, {files / elapsed if elapsed else 0:.1f} files/sec"
+        )
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.models import Student
+from courses.progress import check_progress, refresh_progress
+
+
+class Command(BaseCommand):
+    """Check or rebuild the requirement progress of the students."""
+
+    help = ("Compute the requirement progress of every student from the taken courses again, "
+            "eg. after the requirements changed. With --check only report the students whose progress is wrong.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help="Report the wrong progress without writing it.")
+        parser.add_argument('--batch-size', type=int, default=500, help="Students computed at once.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1")
+        student_ids = list(Student.objects.order_by('id').values_list('id', flat=True))
+        wrong = []
+        for start in range(0, len(student_ids), batch_size):
+            batch = student_ids[start:start + batch_size]
+            if options['check']:
+                wrong += check_progress(batch)
+            else:
+                refresh_progress(batch)
+        if not options['check']:
+            self.stdout.write(f"progress of {len(student_ids)} students rebuilt")
+            return
+        for student_id in wrong:
+            self.stderr.write(f"student {student_id}: progress differs from the taken courses")
+        self.stdout.write(f"{len(student_ids)} students checked, {len(wrong)} with a wrong progress")
+        if wrong:
+            raise CommandError("the progress is not consistent, run rebuild_progress without --check")
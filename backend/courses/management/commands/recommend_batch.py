@@ -0,0 +1,68 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.models import Student
+from courses.recommendor.batch import BatchJob, recommend_batch, student_jobs, to_ndjson
+
+
+class Command(BaseCommand):
+    """Recommend courses for a cohort and write the results as NDJSON."""
+
+    help = "Recommend courses for many students in parallel, one JSON line per student."
+
+    def add_arguments(self, parser):
+        parser.add_argument('students', nargs='*', type=int, help="Ids of the students to recommend for.")
+        parser.add_argument('--all', action='store_true', help="Recommend for every student.")
+        parser.add_argument('--histories', help="JSON file with raw histories: a list of "
+                            "{\"id\": ..., \"course_dict\": {...}} or an {id: course_dict} object.")
+        parser.add_argument('--identity', default='chinese', choices=['chinese', 'inter'])
+        parser.add_argument('--intense', action='store_true')
+        parser.add_argument('--workers', type=int, default=None, help="Worker processes, one per core by default.")
+        parser.add_argument('--output', help="Write the results to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        identity, intense = options['identity'], options['intense']
+
+        student_ids = options['students']
+        if options['all']:
+            student_ids = list(Student.objects.order_by('id').values_list('id', flat=True))
+        jobs = list(student_jobs(student_ids, identity, intense))
+        if options['histories']:
+            jobs += self._history_jobs(options['histories'], identity, intense)
+        if not jobs:
+            raise CommandError("Nothing to do, give student ids, --all or --histories.")
+
+        output = open(options['output'], 'w') if options['output'] else self.stdout
+        start = time.perf_counter()
+        failed = 0
+        try:
+            for result in recommend_batch(jobs, workers=options['workers']):
+                failed += 'error' in result
+                for line in to_ndjson([result]):
+                    output.write(line)
+        finally:
+            if output is not self.stdout:
+                output.close()
+        elapsed = time.perf_counter() - start
+
+        self.stderr.write(
+            f"{len(jobs)} students, {failed} failed, {elapsed:.2f}s, {len(jobs) / elapsed:.1f} students/sec"
+        )
+
+    def _history_jobs(self, path, identity, intense):
+        """Read the raw histories file."""
+        try:
+            with open(path) as f:
+                histories = json.load(f)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read histories from {path}: {exc}")
+        if isinstance(histories, dict):
+            histories = [{'id': key, 'course_dict': course_dict} for key, course_dict in histories.items()]
+        if not isinstance(histories, list):
+            raise CommandError("Histories must be a list or an object")
+        return [
+            BatchJob(history.get('id'), history.get('course_dict'), identity, intense)
+            for history in histories
+        ]
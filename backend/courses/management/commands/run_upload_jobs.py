@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from courses.uploads import run_pending_jobs
+
+
+class Command(BaseCommand):
+    """Run the pending course history upload jobs."""
+
+    help = "Parse and save the upload jobs, and run again the jobs of a process that crashed while running them."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Run the pending jobs and stop.")
+        parser.add_argument('--interval', type=float, default=1.0, help="Seconds between two looks for new jobs.")
+
+    def handle(self, *args, **options):
+        while True:
+            count = run_pending_jobs()
+            if count:
+                self.stderr.write(f"{count} upload jobs run")
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_student_course_dict_alter_student_level_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='student',
+            name='level_id',
+            field=models.SmallIntegerField(choices=[(0, 'preschool'), (1, 'freshman_1st'), (2, 'freshman_2nd'), (3, 'sophomore_1st'), (4, 'sophomore_2nd'), (5, 'junior_1st'), (6, 'junior_2nd'), (7, 'senior_1st'), (8, 'senior_2nd')], default=0),
+        ),
+        migrations.CreateModel(
+            name='UploadJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'pending'), ('running', 'running'), ('done', 'done'), ('failed', 'failed')], default='pending', max_length=10)),
+                ('page', models.TextField(blank=True)),
+                ('update_course', models.BooleanField(default=False)),
+                ('skipped', models.BooleanField(null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('started', models.DateTimeField(null=True)),
+                ('finished', models.DateTimeField(null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
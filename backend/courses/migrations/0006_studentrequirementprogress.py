@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_catalogversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentRequirementProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('satisfied', models.PositiveSmallIntegerField(default=0)),
+                ('credits', models.PositiveIntegerField(default=0)),
+                ('courses', models.JSONField(default=list)),
+                ('requirement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress', to='courses.majorrequirement')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress', to='courses.student')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('student', 'requirement'), name='unique_student_requirement_progress')],
+            },
+        ),
+    ]
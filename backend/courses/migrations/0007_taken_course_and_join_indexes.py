@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def delete_duplicate_taken_courses(apps, schema_editor):
+    """Keep the first of the taken courses of a student with the same course and semester."""
+    StudentTakenCourse = apps.get_model('courses', 'StudentTakenCourse')
+    seen, duplicates = set(), []
+    rows = StudentTakenCourse.objects.order_by('id').values_list('id', 'student_id', 'semester', 'course_id')
+    for taken_id, *key in rows.iterator():
+        key = tuple(key)
+        if key in seen:
+            duplicates.append(taken_id)
+        else:
+            seen.add(key)
+    for start in range(0, len(duplicates), 500):
+        StudentTakenCourse.objects.filter(id__in=duplicates[start:start + 500]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_studentrequirementprogress'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_taken_courses, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='studenttakencourse',
+            constraint=models.UniqueConstraint(fields=('student', 'semester', 'course'), name='unique_student_semester_course'),
+        ),
+        migrations.AlterField(
+            model_name='studenttakencourse',
+            name='student',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='taken_courses', to='courses.student'),
+        ),
+        # the through tables are indexed by (requirement or prerequisite set, course), these index
+        # the lookups from a course: the requirements it counts for and the courses it unlocks
+        migrations.RunSQL(
+            'CREATE INDEX courses_requirement_course_idx ON courses_majorrequirement_courses (course_id, majorrequirement_id)',
+            'DROP INDEX courses_requirement_course_idx',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX courses_prereq_course_idx ON courses_courseprereq_prereqs (course_id, courseprereq_id)',
+            'DROP INDEX courses_prereq_course_idx',
+        ),
+    ]
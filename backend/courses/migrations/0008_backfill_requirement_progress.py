@@ -0,0 +1,60 @@
+from django.db import migrations
+
+
+def backfill_progress(apps, schema_editor):
+    """Build the progress of the students from the courses they took before the progress was kept."""
+    Course = apps.get_model('courses', 'Course')
+    MajorRequirement = apps.get_model('courses', 'MajorRequirement')
+    Student = apps.get_model('courses', 'Student')
+    StudentRequirementProgress = apps.get_model('courses', 'StudentRequirementProgress')
+    StudentTakenCourse = apps.get_model('courses', 'StudentTakenCourse')
+
+    # the cores are audited for every student, the other requirements for the students of their major
+    cores, by_major = set(), {}
+    for requirement_id, major_id, is_major in MajorRequirement.objects.values_list('id', 'major_id', 'major__is_major'):
+        if is_major:
+            by_major.setdefault(major_id, set()).add(requirement_id)
+        else:
+            cores.add(requirement_id)
+    if not cores and not by_major:
+        return
+    requirement_courses = {}
+    for requirement_id, course_id in MajorRequirement.courses.through.objects.values_list('majorrequirement_id', 'course_id'):
+        requirement_courses.setdefault(requirement_id, set()).add(course_id)
+    credits = dict(Course.objects.filter(major_requirements__isnull=False).values_list('id', 'credit'))
+
+    student_ids = list(Student.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(student_ids), 500):
+        batch = student_ids[start:start + 500]
+        requirements = {student_id: set(cores) for student_id in batch}
+        majors = Student.major.through.objects.filter(student_id__in=batch, major_id__in=by_major)
+        for student_id, major_id in majors.values_list('student_id', 'major_id'):
+            requirements[student_id] |= by_major[major_id]
+        taken = {student_id: set() for student_id in batch}
+        for student_id, course_id in StudentTakenCourse.objects.filter(student_id__in=batch).values_list('student_id', 'course_id'):
+            taken[student_id].add(course_id)
+
+        progress = []
+        for student_id, requirement_ids in requirements.items():
+            for requirement_id in requirement_ids:
+                courses = taken[student_id] & requirement_courses.get(requirement_id, set())
+                progress.append(StudentRequirementProgress(
+                    student_id=student_id, requirement_id=requirement_id, satisfied=len(courses),
+                    credits=sum(credits[course_id] for course_id in courses), courses=sorted(courses),
+                ))
+        # the rows written since the progress is kept are computed again as well
+        StudentRequirementProgress.objects.bulk_create(
+            progress, batch_size=1000, update_conflicts=True,
+            unique_fields=['student', 'requirement'], update_fields=['satisfied', 'credits', 'courses'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_taken_course_and_join_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_progress, migrations.RunPython.noop),
+    ]
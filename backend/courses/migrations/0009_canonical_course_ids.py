@@ -0,0 +1,113 @@
+from django.db import migrations
+
+from courses.course_id import canonical_course_id
+
+
+def _merge_links(Through, field, renamed):
+    """Point the rows of a many-to-many table at the canonical courses, dropping those linked already."""
+    rows = Through.objects.filter(course_id__in=renamed).values_list('id', field, 'course_id')
+    if not rows:
+        return
+    linked = set(Through.objects.filter(course_id__in=set(renamed.values())).values_list(field, 'course_id'))
+    duplicates = []
+    for row_id, owner_id, course_id in rows:
+        key = (owner_id, renamed[course_id])
+        if key in linked:
+            duplicates.append(row_id)
+        else:
+            linked.add(key)
+    for start in range(0, len(duplicates), 500):
+        Through.objects.filter(id__in=duplicates[start:start + 500]).delete()
+    for course_id, canonical in renamed.items():
+        Through.objects.filter(course_id=course_id).update(course_id=canonical)
+
+
+def canonicalize_course_ids(apps, schema_editor):
+    """Make the course numbers stored before they were canonicalized canonical, eg. 'CSCI-SHU - 220'.
+
+    A course whose canonical number exists already is merged into it: its
+    taken courses, requirements and prerequisites move to the canonical
+    course, those the canonical course has already are dropped.
+    """
+    Course = apps.get_model('courses', 'Course')
+    CoursePrereq = apps.get_model('courses', 'CoursePrereq')
+    MajorRequirement = apps.get_model('courses', 'MajorRequirement')
+    Student = apps.get_model('courses', 'Student')
+    StudentRequirementProgress = apps.get_model('courses', 'StudentRequirementProgress')
+    StudentTakenCourse = apps.get_model('courses', 'StudentTakenCourse')
+
+    renamed = {}
+    for course_id in Course.objects.values_list('id', flat=True).iterator():
+        canonical = canonical_course_id(course_id)
+        if canonical != course_id:
+            renamed[course_id] = canonical
+
+    if renamed:
+        existing = set(Course.objects.filter(id__in=set(renamed.values())).values_list('id', flat=True))
+        new_courses = []
+        for course in Course.objects.filter(id__in=renamed).order_by('id'):
+            if renamed[course.id] not in existing:
+                existing.add(renamed[course.id])
+                new_courses.append(Course(
+                    id=renamed[course.id], name=course.name, credit=course.credit, description=course.description,
+                ))
+        Course.objects.bulk_create(new_courses)
+
+        # a course taken in the same semester under both numbers is kept once
+        students = set(StudentTakenCourse.objects.filter(course_id__in=renamed).values_list('student_id', flat=True))
+        taken = set()
+        rows = StudentTakenCourse.objects.filter(student_id__in=students, course_id__in=set(renamed.values()))
+        taken.update(rows.values_list('student_id', 'semester', 'course_id'))
+        duplicates = []
+        rows = StudentTakenCourse.objects.filter(course_id__in=renamed).order_by('id')
+        for taken_id, student_id, semester, course_id in rows.values_list('id', 'student_id', 'semester', 'course_id'):
+            key = (student_id, semester, renamed[course_id])
+            if key in taken:
+                duplicates.append(taken_id)
+            else:
+                taken.add(key)
+        for start in range(0, len(duplicates), 500):
+            StudentTakenCourse.objects.filter(id__in=duplicates[start:start + 500]).delete()
+        for course_id, canonical in renamed.items():
+            StudentTakenCourse.objects.filter(course_id=course_id).update(course_id=canonical)
+            CoursePrereq.objects.filter(course_id=course_id).update(course_id=canonical)
+
+        _merge_links(MajorRequirement.courses.through, 'majorrequirement_id', renamed)
+        _merge_links(CoursePrereq.prereqs.through, 'courseprereq_id', renamed)
+        Course.objects.filter(id__in=renamed).delete()
+
+    # the histories the taken courses are synchronized from
+    changed = []
+    for student in Student.objects.only('id', 'course_dict').order_by('id').iterator():
+        course_dict = {
+            semester: [[canonical_course_id(course[0]), *course[1:]] for course in courses]
+            for semester, courses in student.course_dict.items()
+        }
+        if course_dict != student.course_dict:
+            student.course_dict = course_dict
+            changed.append(student)
+    Student.objects.bulk_update(changed, ['course_dict'], batch_size=500)
+
+    if renamed:
+        credits = dict(Course.objects.filter(id__in=set(renamed.values())).values_list('id', 'credit'))
+        credits.update(Course.objects.filter(major_requirements__isnull=False).values_list('id', 'credit'))
+        changed = []
+        for progress in StudentRequirementProgress.objects.order_by('id').iterator():
+            if not any(course_id in renamed for course_id in progress.courses):
+                continue
+            courses = sorted({renamed.get(course_id, course_id) for course_id in progress.courses})
+            progress.courses, progress.satisfied = courses, len(courses)
+            progress.credits = sum(credits.get(course_id, 0) for course_id in courses)
+            changed.append(progress)
+        StudentRequirementProgress.objects.bulk_update(changed, ['courses', 'satisfied', 'credits'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_backfill_requirement_progress'),
+    ]
+
+    operations = [
+        migrations.RunPython(canonicalize_course_ids, migrations.RunPython.noop),
+    ]
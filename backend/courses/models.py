@@ -3,6 +3,20 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.db.models import Sum
 
+from .course_id import canonical_course_id
+
+# the credits of a course created from a history without readable credits
+DEFAULT_CREDIT = 4
+
+
+def parse_credit(credits):
+    """Get the credits of a course from a history, where they are text and may be empty."""
+    try:
+        return int(float(credits))
+    except (TypeError, ValueError):
+        return DEFAULT_CREDIT
+
+
 # Create your models here.
 
 class Major(models.Model):
@@ -15,11 +29,34 @@ class Major(models.Model):
         return f'{self.name} - {"major" if self.is_major else "core"}'
     
     def get_all_reqs(self):
-        """Get all requirements associated with the major."""
-        major_requirements = self.requirement.all()
-        for req in major_requirements:
-            print(req)
-        return major_requirements
+        """Get all requirements associated with the major, with their courses prefetched."""
+        return self.requirement.order_by('id').prefetch_related(
+            models.Prefetch('courses', queryset=Course.objects.order_by('id'))
+        )
+
+
+class CourseQuerySet(models.QuerySet):
+    """ Course queries """
+    def eligible_for(self, student):
+        """Keep the courses whose prerequisites the student completed.
+
+        A course is eligible when each of its prerequisite sets has a course
+        the student took. The prerequisites of every course in the queryset
+        are read at once, so the queries do not depend on the number of
+        courses or of prerequisite sets.
+
+        Args:
+            student (Student): The student, by its taken courses.
+
+        Returns:
+            QuerySet: The eligible courses.
+        """
+        taken = set(student.taken_courses.values_list('course_id', flat=True))
+        # (course, prerequisite set, course of the set) rows, the course of an empty set is None
+        rows = list(CoursePrereq.objects.filter(course__in=self.values('pk')).values_list('course_id', 'id', 'prereqs'))
+        met = {prereq_id for course_id, prereq_id, required_id in rows if required_id in taken}
+        unmet = {course_id for course_id, prereq_id, required_id in rows if prereq_id not in met}
+        return self.exclude(pk__in=unmet)
 
 
 class Course(models.Model):
@@ -29,6 +66,8 @@ class Course(models.Model):
     credit = models.IntegerField(default=4)
     description = models.TextField(max_length=255, blank=True)
 
+    objects = CourseQuerySet.as_manager()
+
     def __str__(self) -> str:
         """Return string representation of the course."""
         return f'{self.id} - {self.name}'
@@ -39,13 +78,7 @@ class Course(models.Model):
 
     def validate_student(self, student):
         """Validate if a student has completed prerequisites for the course."""
-        prereqs = self.get_prereqs()
-
-        for prereq_set in prereqs:
-            if not student.taken_courses.filter(course__in=prereq_set.prereqs.all()).exists():
-                print(prereq_set)
-                return False
-        return True 
+        return Course.objects.filter(pk=self.pk).eligible_for(student).exists()
     
     def get_fulfill_majors(self):
         """Get majors for which the course fulfills requirements."""
@@ -79,12 +112,35 @@ class CoursePrereq(models.Model):
 
 # Student related classes
 
+class StudentTakenCourseQuerySet(models.QuerySet):
+    """ Taken course queries """
+    def bulk_delete(self):
+        """Delete the taken courses in one query, without the per-row signals of `delete`.
+
+        The progress listens to the deletion of every taken course, `delete`
+        would read the rows first; the writers of many taken courses refresh
+        the progress once themselves instead.
+
+        Returns:
+            int: The number of deleted taken courses.
+        """
+        return self._raw_delete(self.db)
+
+
 class StudentTakenCourse(models.Model):
     """ Student taken course model """
-    student = models.ForeignKey('Student', related_name='taken_courses', on_delete=models.CASCADE)
+    # the lookups by student use the unique (student, semester, course) index
+    student = models.ForeignKey('Student', related_name='taken_courses', on_delete=models.CASCADE, db_index=False)
     course = models.ForeignKey('Course', related_name='course', on_delete=models.CASCADE)
     semester = models.TextField(max_length=20)
 
+    objects = StudentTakenCourseQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'semester', 'course'], name='unique_student_semester_course'),
+        ]
+
 
 class Student(models.Model):
     """ Student model """
@@ -111,27 +167,111 @@ class Student(models.Model):
         return f"{self.user.username}, major: {major_str}, level: {self.get_level_id_display()}"
     
     def sync_courses(self):
-        """Synchronize courses taken by the student."""
-        current_courses = {(tc.course.id, tc.semester): tc for tc in self.taken_courses.all()}
+        """Synchronize courses taken by the student.
+
+        The taken courses are made those of `course_dict`, the courses missing
+        from the catalog are created. The number of queries does not depend on
+        the history: one for the taken courses, one for the courses and one
+        per kind of change, created courses, created or deleted taken courses.
+        The requirement progress of the courses taken or no longer taken is
+        refreshed.
+        """
+        from .progress import refresh_progress
+
+        # (canonical course number, semester) -> (name, credits) in the history
+        wanted = {}
         for semester, courses in self.course_dict.items():
-            for course_data in courses:
-                course_id, course_name, course_credit = course_data
-                course_key = (course_id.strip(), semester)
-                course, created = Course.objects.get_or_create(
-                    id=course_id, defaults={'name': course_name, 'credit': course_credit, 'description': "Added from submitted histories"}
+            for course_id, course_name, course_credit in courses:
+                wanted.setdefault((canonical_course_id(course_id), semester), (course_name, course_credit))
+
+        kept, stale, was_taken = set(), [], set()
+        for taken_id, course_id, semester in self.taken_courses.values_list('id', 'course_id', 'semester'):
+            was_taken.add(course_id)
+            key = (course_id, semester)
+            if key in wanted and key not in kept:
+                kept.add(key)
+            else:
+                stale.append(taken_id)
+
+        credits = dict(Course.objects.filter(id__in={course_id for course_id, semester in wanted}).values_list('id', 'credit'))
+        new_courses = {}
+        for (course_id, semester), (course_name, course_credit) in wanted.items():
+            if course_id not in credits and course_id not in new_courses:
+                new_courses[course_id] = Course(
+                    id=course_id, name=course_name, credit=parse_credit(course_credit),
+                    description="Added from submitted histories",
                 )
-                if created: print("Added new course from client submission")
-                if course_key in current_courses:
-                    del current_courses[course_key]
-                else:
-                    StudentTakenCourse.objects.create(student=self, course=course, semester=semester)
-        for tc in current_courses.values():
-            tc.delete()
-        self.calc_taken_credit()
+        if new_courses:
+            Course.objects.bulk_create(new_courses.values(), ignore_conflicts=True)
+            credits.update((course.id, course.credit) for course in new_courses.values())
+
+        new_taken = [
+            StudentTakenCourse(student=self, course_id=course_id, semester=semester)
+            for course_id, semester in wanted if (course_id, semester) not in kept
+        ]
+        if new_taken:
+            # a course saved by a concurrent sync of the same history is kept
+            StudentTakenCourse.objects.bulk_create(new_taken, ignore_conflicts=True)
+        if stale:
+            StudentTakenCourse.objects.filter(id__in=stale).bulk_delete()
+        self.credit = sum(credits[course_id] for course_id, semester in wanted)
         self.level_id = len(self.course_dict)
-        
+        changed = was_taken ^ {course_id for course_id, semester in wanted}
+        if changed:
+            refresh_progress([self.pk], changed)
+
     def calc_taken_credit(self):
         """Calculate total credits taken by the student."""
         self.credit = self.taken_courses.aggregate(total_credits=Sum('course__credit'))['total_credits'] or 0
 
+class StudentRequirementProgress(models.Model):
+    """ Progress of a student towards a major or core requirement, kept up to date by `courses.progress` """
+    student = models.ForeignKey('Student', related_name='progress', on_delete=models.CASCADE)
+    requirement = models.ForeignKey('MajorRequirement', related_name='progress', on_delete=models.CASCADE)
+    # the number of distinct courses of the requirement taken and their credits
+    satisfied = models.PositiveSmallIntegerField(default=0)
+    credits = models.PositiveIntegerField(default=0)
+    courses = models.JSONField(default=list)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'requirement'], name='unique_student_requirement_progress'),
+        ]
+
+    def __str__(self) -> str:
+        """Return string representation of the progress."""
+        return f'{self.student_id} - requirement {self.requirement_id}: {self.satisfied} courses'
 
+
+class UploadJob(models.Model):
+    """ Course history upload parsed in the background """
+    class Status(models.TextChoices):
+        PENDING = 'pending', "pending"
+        RUNNING = 'running', "running"
+        DONE = 'done', "done"
+        FAILED = 'failed', "failed"
+
+    user = models.ForeignKey(User, related_name='upload_jobs', on_delete=models.CASCADE)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    # the uploaded page, emptied once parsed
+    page = models.TextField(blank=True)
+    update_course = models.BooleanField(default=False)
+    skipped = models.BooleanField(null=True)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(null=True)
+    finished = models.DateTimeField(null=True)
+
+    def __str__(self) -> str:
+        """Return string representation of the upload job."""
+        return f'upload {self.id} of {self.user.username}: {self.status}'
+
+
+class CatalogVersion(models.Model):
+    """ Version of the catalog (majors, courses, requirements, prerequisites), one row """
+    version = models.PositiveBigIntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        """Return string representation of the catalog version."""
+        return f'catalog version {self.version}'
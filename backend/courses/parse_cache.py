@@ -0,0 +1,126 @@
+import codecs
+import hashlib
+
+from django.core.cache import caches
+
+from . import course_id, parse_course_history as parser_module
+from .parse_course_history import CourseHistoryParser, parse_course_history
+
+
+# the cache alias in settings.CACHES
+PARSE_CACHE = 'parses'
+
+
+def parser_version(*modules):
+    """Get the version of a parser, a hash of the source of its modules.
+
+    Args:
+        *modules (module): The modules of the parser.
+
+    Returns:
+        str: The version, it changes whenever the source of a module does.
+    """
+    digest = hashlib.sha256()
+    for module in modules:
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+# part of the cache keys, so that the results of an older parser are not served
+PARSER_VERSION = parser_version(parser_module, course_id)
+
+
+class PageFingerprint():
+    """Hash of a course history page, fed in chunks.
+
+    The page is normalized first, the blanks at its start and end are dropped
+    and its line breaks are '\\n', so the same page saved on another system or
+    pasted with an extra line break has the same fingerprint.
+    """
+    def __init__(self):
+        self._hash = hashlib.sha256()
+        self._started = False
+        # the blanks at the end of what was fed, hashed only when more text follows
+        self._blanks = ''
+
+    def update(self, chunk):
+        """Hash a chunk of the page.
+
+        Args:
+            chunk (str): The chunk, cut anywhere.
+        """
+        data = self._blanks + chunk
+        if not self._started:
+            data = data.lstrip()
+            if not data:
+                return
+            self._started = True
+        content = data.rstrip()
+        self._blanks = data[len(content):]
+        self._hash.update(content.replace('\r\n', '\n').encode())
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+
+def page_fingerprint(text):
+    """Get the fingerprint of a whole course history page, see `PageFingerprint`."""
+    fingerprint = PageFingerprint()
+    fingerprint.update(text)
+    return fingerprint.hexdigest()
+
+
+def parse_key(fingerprint):
+    return f'parse:{PARSER_VERSION}:{fingerprint}'
+
+
+def parse_page(text):
+    """Parse a course history page, or get the result of the same page parsed before.
+
+    Args:
+        text (str): The page.
+
+    Returns:
+        dict: The parsed course history.
+    """
+    cache = caches[PARSE_CACHE]
+    key = parse_key(page_fingerprint(text))
+    course_dict = cache.get(key)
+    if course_dict is None:
+        course_dict = parse_course_history(text)
+        cache.set(key, course_dict)
+    return course_dict
+
+
+def parse_upload(upload, encoding='utf-8'):
+    """Parse an uploaded course history page, or get the result of the same page parsed before.
+
+    The upload is read a first time to be fingerprinted and a second time,
+    chunk by chunk, only when it was never parsed.
+
+    Args:
+        upload (UploadedFile): The page.
+        encoding (str): The encoding of the page, undecodable bytes are replaced.
+
+    Returns:
+        dict: The parsed course history.
+    """
+    cache = caches[PARSE_CACHE]
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    fingerprint = PageFingerprint()
+    for chunk in upload.chunks():
+        fingerprint.update(decoder.decode(chunk))
+    fingerprint.update(decoder.decode(b'', final=True))
+    key = parse_key(fingerprint.hexdigest())
+    course_dict = cache.get(key)
+    if course_dict is None:
+        upload.seek(0)
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        parser = CourseHistoryParser()
+        for chunk in upload.chunks():
+            parser.feed(decoder.decode(chunk))
+        parser.feed(decoder.decode(b'', final=True))
+        course_dict = parser.close()
+        cache.set(key, course_dict)
+    return course_dict
@@ -1,108 +1,289 @@
-def parse_semester(semester, content):
-    """parse a semester.
+from typing import NamedTuple
+
+from .course_id import canonical_course_id
+
+
+# every semester starts with its name in a <h3> on its own line
+SEMESTER_START = '\n<h3>'
+SEMESTER_END = '</table>'
+# a course row of a semester table, the header row is a 'hidden-accordion-row'
+COURSE_ROW = '" accordion-row'
+GRADES_END = 'End target:'
+CUMULATIVE_GPA = 'Cumulative GPA:'
+TERM_GPA = 'Term GPA:'
+# the grades come after the menu bar
+MENU = 'class="IS_BB_LINKS_MENU_DESKTOP"'
+
+# the data-label attributes of the cells of a course row, in the order of `TranscriptCourse`
+COURSE_LABELS = (
+    'data-label="Catalog Number"', 'data-label="Title"', 'data-label="Credits"', 'data-label="Final Grade"',
+)
+
+# the lines `parse_course_history_lines` gathers before parsing them, in characters
+FEED_SIZE = 1 << 16
+
+# parser states
+SEARCH_MENU, SEARCH_GPA, COURSES, DONE = range(4)
+
+
+class TranscriptCourse(NamedTuple):
+    """A course of a semester, the grade is '' until it is given."""
+    num: str
+    name: str
+    credits: str
+    grade: str
+
+
+class TranscriptSemester(NamedTuple):
+    """A semester of the transcript, its GPA is None when not calculated."""
+    name: str
+    gpa: float
+    courses: list
+
+
+class Transcript(NamedTuple):
+    """The grades part of the course history page."""
+    gpa: float
+    semesters: list
+
+    def course_dict(self):
+        """Get the course history, {semester: [[num, name, credits], ...]}."""
+        return {
+            semester.name: [[course.num, course.name, course.credits] for course in semester.courses]
+            for semester in self.semesters
+        }
+
+
+def parse_gpa(value):
+    """Get a GPA from its text, None when it is not a number, e.g. 'Not Calculated'."""
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def cell_values(row, labels=COURSE_LABELS):
+    """Get the content of the cells of a course row by their data-label.
 
     Args:
-        semester (str): The semester.
-        content (list): The content of the semester.
-    
+        row (str): The text of the row.
+        labels (tuple): The data-label attributes of the cells.
+
     Returns:
-        list: The parsed semester.
+        list: The content of every cell, '' when the row has no such cell.
     """
+    find = row.find
+    values = []
+    position = 0
+    for label in labels:
+        # the cells are usually in the order of `labels`, the row is read once then
+        location = find(label, position)
+        if location == -1:
+            location = find(label, 0, position)
+            if location == -1:
+                values.append('')
+                continue
+        # the content starts after the start tag of the cell
+        location += len(label)
+        if row[location:location + 1] != '>':
+            location = find('>', location)
+            if location == -1:
+                values.append('')
+                continue
+        cell_end = find('</td>', location)
+        if cell_end == -1:
+            values.append('')
+        else:
+            values.append(row[location + 1:cell_end])
+            position = cell_end
+    return values
 
-    semester_lst = []
-
-    # iterate through lines
-    for line in range(len(content)):
-        if '" accordion-row' in content[line]:
-            course_num, course_name, course_credits, course_grade = '', '', '', ''
-
-            cumu_info = 0
-            # get the course number
-            if 'Catalog Number' in content[line+1]:
-                course_num = content[line+1][88+len(semester)-1:-5]
-                cumu_info += 1
-                # course_num = course_num[:course_num.find("<")]
-            
-            # get the course name
-            if 'Title' in content[line+2-(1-cumu_info)]:
-                course_name = content[line+2-(1-cumu_info)][71+len(semester)-1:-5]
-                cumu_info += 1
-                # course_name = course_name[:course_name.find("<")]
-            
-            # get the credits
-            if 'Credits' in content[line+4-(2-cumu_info)]:
-                course_credits = content[line+4-(2-cumu_info)][75+len(semester)-1:-5]
-                cumu_info += 1
-                # course_credits = course_credits[:course_credits.find("<")]
-
-            # get the Grade
-            if 'Final Grade' in content[line+6-(3-cumu_info)]:
-                course_grade = content[line+6-(3-cumu_info)][77+len(semester)-1:-5]
-                cumu_info += 1
-                # course_grade = course_grade[:course_grade.find("<")]
-
-            semester_lst.append([course_num, course_name, course_credits])
-
-    return semester_lst
 
-
-def parse_course_history(text):
-    """parse course history.
+def parse_semester(text, start, end):
+    """Parse a semester, from its <h3> to the end of its table.
 
     Args:
-        text (str): The text of the course history.
+        text (str): The text of the page.
+        start (int): The position of the <h3> of the semester.
+        end (int): The end of the semester table.
 
     Returns:
-        dict: The parsed course history.
+        TranscriptSemester: The semester.
+    """
+    start += len('<h3>')
+    name_end = text.find('</', start, end)
+    if name_end == -1:
+        name_end = end
+    semester = text[start:name_end]
+
+    # the heading of the table, then its course rows
+    heading, *rows = text[name_end:end].split(COURSE_ROW)
+    gpa = None
+    location = heading.find(TERM_GPA)
+    if location != -1:
+        location += len(TERM_GPA)
+        gpa = parse_gpa(heading[location:heading.find('<', location)])
+
+    courses = []
+    for row in rows:
+        num, name, credits, grade = cell_values(row)
+        if '&' in grade:
+            grade = grade.replace('&nbsp;', '').strip()
+        courses.append(TranscriptCourse(canonical_course_id(num), name, credits, grade))
+    return TranscriptSemester(semester, gpa, courses)
+
+
+class CourseHistoryParser():
+    """Incremental parser of the course history page.
+
+    The page is fed in chunks cut anywhere. Every semester is parsed with
+    `parse_semester` once its table is complete, only the text of an
+    unfinished semester is kept, so any number of semesters is parsed in one
+    pass keeping one semester in memory. `close` gives the course history,
+    `close_transcript` the grades and GPAs too.
     """
-    lst = text.split("\n")
+    def __init__(self):
+        self.state = SEARCH_MENU
+        self.line_breaks = 0
+        self.gpa = None
+        self.semesters = []
+        # the text fed but not parsed yet
+        self._text = ''
+
+    def feed(self, text):
+        """Consume a chunk of the page.
+
+        Args:
+            text (str): The next characters of the page.
+        """
+        # only the first lines are counted, to tell a page from invalid input
+        location = -1
+        while self.line_breaks < 4:
+            location = text.find('\n', location + 1)
+            if location == -1:
+                break
+            self.line_breaks += 1
+        text = self._text + text
+        self._text = text[self._parse(text, False):]
+
+    def _parse(self, text, final):
+        """Parse the semesters complete in `text`.
+
+        Args:
+            text (str): The text not parsed yet.
+            final (bool): Whether the page ends with `text`, an unfinished
+                semester then ends with it too.
+
+        Returns:
+            int: The position of the text left for the next chunk.
+        """
+        position = 0
+        if self.state == SEARCH_MENU:
+            location = text.find(MENU)
+            if location == -1:
+                return max(0, len(text) - len(MENU) + 1)
+            self.state, position = SEARCH_GPA, location
+        if self.state == SEARCH_GPA:
+            location = text.find('Cumulative', position)
+            if location == -1:
+                return max(position, len(text) - len('Cumulative') + 1)
+            if text.startswith(CUMULATIVE_GPA, location):
+                gpa_end = text.find('<', location)
+                if gpa_end == -1:
+                    if not final:
+                        # wait for the rest of the GPA
+                        return location
+                    gpa_end = len(text)
+                self.gpa = parse_gpa(text[location + len(CUMULATIVE_GPA):gpa_end])
+            self.state, position = COURSES, location
+        if self.state == DONE:
+            return len(text)
 
-    # invalid input
-    if len(lst) < 5:
-        return {}
+        find = text.find
+        start = find(SEMESTER_START, position)
+        while True:
+            # the grades end between two semesters
+            if find(GRADES_END, position, len(text) if start == -1 else start) != -1:
+                self.state = DONE
+                return len(text)
+            if start == -1:
+                break
+            table_end = find(SEMESTER_END, start)
+            if table_end == -1:
+                if not final:
+                    # wait for the rest of the semester
+                    return start
+                table_end = len(text)
+            self.semesters.append(parse_semester(text, start + 1, table_end))
+            position = table_end
+            start = find(SEMESTER_START, table_end)
+        # keep what may be the start of a semester or of the end of the grades
+        return max(position, len(text) - len(GRADES_END) + 1)
 
-    # find the name
-    rough_location = text.find('class="IS_BB_LINKS_MENU_DESKTOP"')
-    rough_name_parse = text[rough_location+38:rough_location+38+20]
-    student_name = rough_name_parse[:rough_name_parse.find('<')]
+    def close(self):
+        """Finish the parse.
 
-    # update text
-    text = text[rough_location:]
+        Returns:
+            dict: The parsed course history.
+        """
+        return self.close_transcript().course_dict()
 
-    # parse GPA
-    text = text[text.find("Cumulative"):]  # update text
-    gpa = text[len("Cumulative GPA: "):text.find('<')]
+    def close_transcript(self):
+        """Finish the parse, keeping the grades and the GPAs.
 
-    # find the courses
-    text = text[:text.find("End target:")].split("\n")
+        Returns:
+            Transcript: The transcript, without semesters for invalid input.
+        """
+        self._parse(self._text, True)
+        self._text = ''
+        # invalid input, fewer than 5 lines
+        if self.line_breaks < 4:
+            return Transcript(None, [])
+        return Transcript(self.gpa, self.semesters)
 
-    # every <h3> is a semester indication, so we count the size
-    semester_dict = {}
-    semester = None
 
-    # go through the lines
-    i = 0
-    while i < len(text):
-        line = text[i]
+def parse_course_history_lines(lines):
+    """parse course history from an iterable of lines, e.g. an uploaded file.
 
-        # parse each semester
-        if line[:4] == '<h3>':
-            increment = 1
-            semester = line[4:line.find('</')]
-            
-            # get the semester
-            end = False
-            while not end:
-                if "</table>" in text[increment+i]:
-                    end = True
-                increment += 1
-            
-            semester_content = text[i:increment+i]
+    Args:
+        lines (iterable): The lines of the course history page, with their line breaks.
 
-            semester_dict[semester] = parse_semester(semester, semester_content)
+    Returns:
+        dict: The parsed course history.
+    """
+    parser = CourseHistoryParser()
+    chunk, size = [], 0
+    for line in lines:
+        chunk.append(line)
+        size += len(line)
+        if size >= FEED_SIZE:
+            parser.feed(''.join(chunk))
+            chunk, size = [], 0
+    parser.feed(''.join(chunk))
+    return parser.close()
 
-            i += increment
 
-        i += 1
+def parse_transcript(text):
+    """Parse the grades part of the course history page.
+
+    Args:
+        text (str): The text of the course history.
 
-    return semester_dict
\ No newline at end of file
+    Returns:
+        Transcript: The semesters with their courses and grades, and the GPAs.
+    """
+    parser = CourseHistoryParser()
+    parser.feed(text)
+    return parser.close_transcript()
+
+
+def parse_course_history(text):
+    """parse course history.
+
+    Args:
+        text (str): The text of the course history.
+
+    Returns:
+        dict: The parsed course history.
+    """
+    return parse_transcript(text).course_dict()
@@ -0,0 +1,234 @@
+import threading
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from .models import MajorRequirement, Student, StudentRequirementProgress, StudentTakenCourse
+
+
+# the fields of a progress row derived from the taken courses
+PROGRESS_FIELDS = ('satisfied', 'credits', 'courses')
+
+# the students refreshed at once when the courses of a requirement change
+REFRESH_BATCH_SIZE = 500
+
+_state = threading.local()
+
+
+def student_requirements(student_ids, course_ids=None, requirement_ids=None):
+    """Get the requirements students are audited against: the cores and those of their majors.
+
+    Args:
+        student_ids (list): The students.
+        course_ids (iterable): Only the requirements listing one of these
+            courses, all of them by default.
+        requirement_ids (iterable): Only these requirements, all of them by default.
+
+    Returns:
+        dict: student id -> set of requirement ids.
+    """
+    requirements = MajorRequirement.objects.all()
+    if course_ids is not None:
+        requirements = requirements.filter(courses__in=course_ids)
+    if requirement_ids is not None:
+        requirements = requirements.filter(id__in=requirement_ids)
+    cores, by_major = set(), {}
+    for requirement_id, major_id, is_major in set(requirements.values_list('id', 'major_id', 'major__is_major')):
+        if is_major:
+            by_major.setdefault(major_id, set()).add(requirement_id)
+        else:
+            cores.add(requirement_id)
+
+    result = {student_id: set(cores) for student_id in student_ids}
+    if by_major:
+        majors = Student.major.through.objects.filter(student_id__in=student_ids, major_id__in=by_major)
+        for student_id, major_id in majors.values_list('student_id', 'major_id'):
+            result[student_id] |= by_major[major_id]
+    return result
+
+
+def build_progress(student_ids, course_ids=None, requirement_ids=None):
+    """Compute the progress of students from their taken courses, in at most 3 queries.
+
+    Args:
+        student_ids (list): The students.
+        course_ids (iterable): Only the requirements listing one of these
+            courses, all of them by default.
+        requirement_ids (iterable): Only these requirements, all of them by default.
+
+    Returns:
+        dict: (student id, requirement id) -> unsaved `StudentRequirementProgress`,
+            for every requirement of every student, taken courses or not.
+    """
+    requirements = student_requirements(student_ids, course_ids, requirement_ids)
+    taken = {key: set() for key in (
+        (student_id, requirement_id) for student_id, ids in requirements.items() for requirement_id in ids
+    )}
+    if not taken:
+        return {}
+    credits = {}
+    rows = StudentTakenCourse.objects.filter(
+        student_id__in=student_ids, course__major_requirements__in=set().union(*requirements.values()),
+    ).values_list('student_id', 'course__major_requirements', 'course_id', 'course__credit')
+    for student_id, requirement_id, course_id, credit in rows:
+        courses = taken.get((student_id, requirement_id))
+        if courses is not None:
+            courses.add(course_id)
+            credits[course_id] = credit
+    return {
+        (student_id, requirement_id): StudentRequirementProgress(
+            student_id=student_id, requirement_id=requirement_id, satisfied=len(courses),
+            credits=sum(credits[course_id] for course_id in courses), courses=sorted(courses),
+        )
+        for (student_id, requirement_id), courses in taken.items()
+    }
+
+
+def refresh_progress(student_ids, course_ids=None, requirement_ids=None):
+    """Write the progress of students, after their taken courses or majors changed.
+
+    Only the requirements listing one of `course_ids` are computed again when
+    they are given, the courses taken or no longer taken; the number of
+    queries does not depend on the number of students or courses.
+
+    Args:
+        student_ids (iterable): The students.
+        course_ids (iterable): The courses that changed, None to compute all
+            the requirements again and remove those the students no longer have.
+        requirement_ids (iterable): Only compute these requirements again, eg.
+            after their courses changed.
+    """
+    student_ids = list(student_ids)
+    if not student_ids:
+        return
+    progress = build_progress(student_ids, course_ids, requirement_ids)
+    if not progress and (course_ids is not None or requirement_ids is not None):
+        # the courses are in no requirement, or the students do not have the requirements
+        return
+    with transaction.atomic():
+        if course_ids is None and requirement_ids is None:
+            stored = StudentRequirementProgress.objects.filter(student_id__in=student_ids)
+            stale = [
+                progress_id for progress_id, student_id, requirement_id
+                in stored.values_list('id', 'student_id', 'requirement_id')
+                if (student_id, requirement_id) not in progress
+            ]
+            if stale:
+                StudentRequirementProgress.objects.filter(id__in=stale).delete()
+        if progress:
+            StudentRequirementProgress.objects.bulk_create(
+                progress.values(), batch_size=1000, update_conflicts=True,
+                unique_fields=['student', 'requirement'], update_fields=PROGRESS_FIELDS,
+            )
+
+
+def check_progress(student_ids):
+    """Find the students whose stored progress is not that of their taken courses.
+
+    Args:
+        student_ids (iterable): The students.
+
+    Returns:
+        list: The ids of the students with a missing, extra or wrong progress row.
+    """
+    student_ids = list(student_ids)
+    expected = build_progress(student_ids)
+    stored = {
+        (progress.student_id, progress.requirement_id): progress
+        for progress in StudentRequirementProgress.objects.filter(student_id__in=student_ids)
+    }
+    wrong = set()
+    for key in expected.keys() | stored.keys():
+        if key not in expected or key not in stored or any(
+            getattr(expected[key], field) != getattr(stored[key], field) for field in PROGRESS_FIELDS
+        ):
+            wrong.add(key[0])
+    return sorted(wrong)
+
+
+def refresh_requirements(requirement_ids):
+    """Write the progress of every student having requirements, after their courses changed.
+
+    Args:
+        requirement_ids (iterable): The requirements.
+    """
+    requirement_ids = set(requirement_ids)
+    majors = MajorRequirement.objects.filter(id__in=requirement_ids).values_list('major_id', 'major__is_major')
+    if not majors:
+        return
+    students = Student.objects.order_by('id')
+    if all(is_major for major_id, is_major in majors):
+        # the cores are audited for every student
+        students = students.filter(major__in={major_id for major_id, is_major in majors}).distinct()
+    student_ids = list(students.values_list('id', flat=True))
+    for start in range(0, len(student_ids), REFRESH_BATCH_SIZE):
+        refresh_progress(student_ids[start:start + REFRESH_BATCH_SIZE], requirement_ids=requirement_ids)
+
+
+def _refresh_taken_courses():
+    pending, _state.pending = getattr(_state, 'pending', {}), {}
+    if not pending:
+        return
+    # the students deleted with their taken courses have no progress
+    student_ids = list(Student.objects.filter(id__in=pending).values_list('id', flat=True))
+    refresh_progress(
+        [student_id for student_id in student_ids if pending[student_id] is not None],
+        set().union(*(courses for courses in pending.values() if courses is not None)),
+    )
+    refresh_progress(student_id for student_id in student_ids if pending[student_id] is None)
+
+
+def _taken_course_changed(sender, instance, created=True, **kwargs):
+    if kwargs.get('raw'):
+        # fixtures loading
+        return
+    pending = getattr(_state, 'pending', None)
+    if pending is None:
+        pending = _state.pending = {}
+    if not created:
+        # the course of the row may have changed, every requirement of the student is computed again
+        pending[instance.student_id] = None
+    elif pending.get(instance.student_id, ()) is not None:
+        pending.setdefault(instance.student_id, set()).add(instance.course_id)
+    # after the commit, when a deleted student no longer has taken courses nor progress
+    transaction.on_commit(_refresh_taken_courses)
+
+
+def _requirement_courses_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # the requirements of the course are unknown once cleared
+        instance._cleared_requirements = list(instance.major_requirements.values_list('id', flat=True))
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        refresh_requirements([instance.pk])
+    elif action == 'post_clear':
+        refresh_requirements(getattr(instance, '_cleared_requirements', ()))
+    else:
+        refresh_requirements(pk_set)
+
+
+def _majors_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        refresh_progress([instance.pk])
+    elif action == 'post_clear':
+        # the major has no students left
+        StudentRequirementProgress.objects.filter(requirement__major=instance).delete()
+    else:
+        refresh_progress(pk_set)
+
+
+def connect_signals():
+    """Refresh the progress when the majors or the taken courses of students or the courses of requirements change.
+
+    The bulk writes of the taken courses, `bulk_create` and `bulk_delete`, send
+    no signal: `Student.sync_courses` and the imports refresh the progress themselves.
+    """
+    m2m_changed.connect(_majors_changed, sender=Student.major.through, dispatch_uid='progress-majors')
+    m2m_changed.connect(
+        _requirement_courses_changed, sender=MajorRequirement.courses.through, dispatch_uid='progress-requirement-courses',
+    )
+    post_save.connect(_taken_course_changed, sender=StudentTakenCourse, dispatch_uid='progress-taken-course-save')
+    post_delete.connect(_taken_course_changed, sender=StudentTakenCourse, dispatch_uid='progress-taken-course-delete')
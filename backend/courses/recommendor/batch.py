@@ -0,0 +1,135 @@
+import json
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import NamedTuple
+
+from courses.recommendor.catalog import get_catalog, get_major_prereqs
+from courses.recommendor.recommendor import Recommendor
+from courses.models import Student
+
+
+# the chunks of jobs submitted to the pool per worker, one running while the next waits
+CHUNKS_PER_WORKER = 2
+
+
+class BatchJob(NamedTuple):
+    """One student of a batch: the key reported back and the inputs of the recommendor."""
+    key: object
+    course_history: dict
+    identity: str
+    intense: bool
+
+
+def recommend_one(job, major_prereqs=None):
+    """Recommend the courses of one student, failures are reported in the result.
+
+    Args:
+        job (BatchJob): The student to recommend for.
+        major_prereqs (PrereqGraph): The graph between the major course groups, see `get_major_prereqs`.
+
+    Returns:
+        dict: {'student', 'valid', 'recommend_courses'} or {'student', 'error'}.
+    """
+    try:
+        if job.course_history is None:
+            raise LookupError("student or course_dict does not exist")
+        if not isinstance(job.course_history, dict):
+            raise ValueError("course history must be a mapping of semester -> courses")
+        result = Recommendor(job.course_history, job.identity, job.intense, major_prereqs=major_prereqs).recommend()
+        # the student already has all 8 semesters
+        valid, recommend_courses = result if result is not None else (None, {})
+        return {'student': job.key, 'valid': valid, 'recommend_courses': recommend_courses}
+    except Exception as exc:
+        return {'student': job.key, 'error': f'{type(exc).__name__}: {exc}'}
+
+
+def _recommend_chunk(jobs, major_prereqs):
+    """Recommend the courses of a chunk of jobs in a worker."""
+    return [recommend_one(job, major_prereqs) for job in jobs]
+
+
+def student_jobs(student_ids, identity, intense, batch_size=1000):
+    """Build the jobs of stored students, fetching their histories in batches.
+
+    Args:
+        student_ids (list): The `Student` ids.
+        identity (str): The identity used for every student.
+        intense (bool): The intense mode used for every student.
+        batch_size (int): The number of students fetched per query.
+
+    Yields:
+        BatchJob: One job per id, unknown students get no course history.
+    """
+    for start in range(0, len(student_ids), batch_size):
+        ids = student_ids[start:start + batch_size]
+        histories = dict(Student.objects.filter(id__in=ids).values_list('id', 'course_dict'))
+        for student_id in ids:
+            yield BatchJob(student_id, histories.get(student_id), identity, intense)
+
+
+def _init_worker():
+    """Make sure the catalog is loaded before the worker takes jobs."""
+    get_catalog()
+
+
+def _pool_context():
+    """Fork the workers where possible so they share the parent's preloaded catalog."""
+    try:
+        return multiprocessing.get_context('fork')
+    except ValueError:
+        return None
+
+
+def recommend_batch(jobs, workers=None, chunksize=8):
+    """Recommend the courses of many students in parallel.
+
+    The catalog is loaded before the pool starts, forked workers inherit it
+    instead of reading the catalog files again. The jobs are read from `jobs`
+    as the workers need them, at most `CHUNKS_PER_WORKER` chunks per worker
+    are waiting or running.
+
+    Args:
+        jobs (iterable): The `BatchJob`s.
+        workers (int): The number of worker processes, one per core by default;
+            1 runs the batch in this process.
+        chunksize (int): The number of jobs sent to a worker at once.
+
+    Yields:
+        dict: The result of every job, in the order of `jobs` (see `recommend_one`).
+    """
+    get_catalog()
+    # read from the database once here, the workers do not query it
+    major_prereqs = get_major_prereqs()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from (recommend_one(job, major_prereqs) for job in jobs)
+        return
+
+    jobs = iter(jobs)
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context(), initializer=_init_worker) as executor:
+        while True:
+            while len(pending) < workers * CHUNKS_PER_WORKER:
+                chunk = list(islice(jobs, chunksize))
+                if not chunk:
+                    break
+                pending.append(executor.submit(_recommend_chunk, chunk, major_prereqs))
+            if not pending:
+                return
+            yield from pending.popleft().result()
+
+
+def to_ndjson(results):
+    """Encode results as newline delimited JSON.
+
+    Args:
+        results (iterable): The result dicts.
+
+    Yields:
+        str: One JSON document per line.
+    """
+    for result in results:
+        yield json.dumps(result) + '\n'
@@ -0,0 +1,185 @@
+import hashlib
+import json
+
+from django.core.cache import caches
+
+from courses.catalog_version import get_catalog_version
+from courses.course_id import canonical_course_id
+from courses.recommendor.catalog import get_catalog, get_major_prereqs
+from courses.recommendor.recommendor import Recommendor
+from courses.recommendor.requirements import RequirementState
+
+
+# the cache alias in settings.CACHES, it picks the backend (local memory, file, memcached)
+RECOMMENDATION_CACHE = 'recommendations'
+
+# the planners a recommendation can be made with
+PLANNERS = ('greedy', 'search')
+
+HITS_KEY = 'rec-stats:hits'
+MISSES_KEY = 'rec-stats:misses'
+
+
+def history_fingerprint(course_history):
+    """Stable hash of a course history.
+
+    Only what the recommendor looks at is hashed: the semesters and the
+    canonical course numbers, in a canonical order.
+
+    Args:
+        course_history (dict): The course history of the student.
+
+    Returns:
+        str: The hex digest.
+    """
+    normalized = {
+        semester: sorted(canonical_course_id(course[0]) for course in courses)
+        for semester, courses in course_history.items()
+    }
+    encoded = json.dumps(normalized, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def recommendation_key(course_history, identity, intense, catalog_version, plans=None, seed=None, planner='greedy'):
+    """Cache key of a recommendation.
+
+    Args:
+        course_history (dict): The course history of the student.
+        identity (str): The identity of the student.
+        intense (bool): Whether the intense mode is on.
+        catalog_version (str): The version of the course catalog.
+        plans (int): The number of plans asked for, None for a single recommendation.
+        seed (int): The seed of the recommendor.
+        planner (str): 'greedy' or 'search', see `PLANNERS`.
+
+    Returns:
+        str: The cache key.
+    """
+    mode = 'intense' if intense else 'normal'
+    key = f'rec:{catalog_version}:{identity}:{mode}:{history_fingerprint(course_history)}'
+    if plans is not None or seed is not None or planner != 'greedy':
+        key += f':{plans}:{seed}:{planner}'
+    return key
+
+
+class RecommendationCache():
+    """Cache in front of the recommendor.
+
+    Results are shared by every student with the same history, identity and
+    mode; the last key served to a student is remembered so the entry can be
+    dropped when the student's history changes.
+    """
+    def __init__(self, alias=RECOMMENDATION_CACHE):
+        """Initialize the RecommendationCache class.
+
+        Args:
+            alias (str): The cache alias in settings.CACHES.
+        """
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _count(self, key):
+        # add() is a no-op when the counter exists, incr() needs it to exist
+        self.cache.add(key, 0, timeout=None)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            # evicted between add() and incr()
+            self.cache.set(key, 1, timeout=None)
+
+    def get_or_compute(self, student_id, course_history, identity, intense, plans=None, seed=None, planner='greedy'):
+        """Get the recommendation of a student, computing it on a miss.
+
+        Args:
+            student_id (int): The student, to invalidate the entry later.
+            course_history (dict): The course history of the student.
+            identity (str): The identity of the student.
+            intense (bool): Whether the intense mode is on.
+            plans (int): The number of distinct plans wanted, None for a single recommendation.
+            seed (int): The seed of the recommendor.
+            planner (str): 'greedy' or 'search', `plans` is only supported by the greedy planner.
+
+        Returns:
+            tuple: Whether the student can graduate and the recommended courses,
+                or a list of them when `plans` is given.
+        """
+        catalog = get_catalog()
+        # the major courses are ordered by the prerequisites of the database, see `get_major_prereqs`
+        catalog_version = f'{catalog.version}.{get_catalog_version()}'
+        key = recommendation_key(course_history, identity, intense, catalog_version, plans, seed, planner)
+        result = self.cache.get(key)
+        if result is None:
+            self._count(MISSES_KEY)
+            requirements = self.requirement_state(student_id, course_history, catalog)
+            recommendor = Recommendor(
+                course_history, identity, intense, catalog=catalog, seed=seed, requirements=requirements,
+                major_prereqs=get_major_prereqs(catalog),
+            )
+            if plans is not None:
+                result = recommendor.recommend_plans(plans)
+            else:
+                result = recommendor.recommend_search() if planner == 'search' else recommendor.recommend()
+                # the student already has all 8 semesters
+                if result is None:
+                    result = (None, {})
+            self.cache.set(key, result)
+        else:
+            self._count(HITS_KEY)
+        self.cache.set(self._student_key(student_id), key)
+        return result
+
+    def requirement_state(self, student_id, course_history, catalog):
+        """Get the requirement state of a student's history.
+
+        The state saved for the student is updated with the courses added or
+        removed since, it is built from the whole history only the first time
+        or when the catalog changed.
+
+        Args:
+            student_id (int): The student.
+            course_history (dict): The current course history of the student.
+            catalog (CourseCatalog): The course catalog.
+
+        Returns:
+            RequirementState: The state of `course_history`.
+        """
+        state_key = self._state_key(student_id)
+        state = self.cache.get(state_key)
+        if state is None or state.catalog_version != catalog.version:
+            state = RequirementState.from_history(catalog, course_history)
+        elif not state.update(catalog, course_history):
+            return state
+        self.cache.set(state_key, state, timeout=None)
+        return state
+
+    def invalidate_student(self, student_id):
+        """Drop the recommendation last served to a student."""
+        student_key = self._student_key(student_id)
+        key = self.cache.get(student_key)
+        if key is not None:
+            self.cache.delete_many([key, student_key])
+
+    def stats(self):
+        """Get the hit/miss counters.
+
+        Returns:
+            dict: The hits, misses and hit rate.
+        """
+        counters = self.cache.get_many([HITS_KEY, MISSES_KEY])
+        hits, misses = counters.get(HITS_KEY, 0), counters.get(MISSES_KEY, 0)
+        total = hits + misses
+        return {'hits': hits, 'misses': misses, 'hit_rate': hits / total if total else 0.0}
+
+    @staticmethod
+    def _student_key(student_id):
+        return f'rec-student:{student_id}'
+
+    @staticmethod
+    def _state_key(student_id):
+        return f'rec-state:{student_id}'
+
+
+recommendation_cache = RecommendationCache()
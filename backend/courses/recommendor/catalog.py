@@ -0,0 +1,377 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from types import MappingProxyType
+from typing import NamedTuple
+
+from courses.course_id import canonical_course_id, course_id_aliases, split_course_title
+from courses.recommendor.prereq_graph import PrereqCycleError, PrereqGraph
+
+
+CATALOG_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CATALOG_FILES = {
+    'cs_major_courses': 'cs_major_courses.json',
+    'cs_major_prereqs': 'cs_major_prereqs.json',
+    'ny_core_courses': 'ny_core_courses.json',
+    'sh_core_courses': 'sh_core_courses.json',
+    'ny_elective_courses': 'ny_elective_courses.json',
+    'sh_elective_courses': 'sh_elective_courses.json',
+}
+CATALOG_PATHS = {key: os.path.join(CATALOG_DIR, name) for key, name in CATALOG_FILES.items()}
+
+# shanghai core courses are not listed with credits, they always have 4
+SH_CORE_CREDITS = 4
+
+class CatalogError(ValueError):
+    """Raised when a catalog file is missing or malformed."""
+
+
+class CoreCourse(NamedTuple):
+    """A core course: (course_num, course_name, credits)."""
+    id: str
+    name: str
+    credits: int
+
+
+class NYElectiveCourse(NamedTuple):
+    """A NY elective course: (course_num, course_name, credits)."""
+    id: str
+    name: str
+    credits: int
+
+
+class EncodedDocument(NamedTuple):
+    """A JSON document rendered once: (body, gzip), the UTF-8 bytes and their gzip compression."""
+    body: bytes
+    gzip: bytes
+
+
+def encode_document(document):
+    """Render a JSON document as the API renders it, compact and not ASCII-escaped.
+
+    Args:
+        document: The JSON-serializable document.
+
+    Returns:
+        EncodedDocument: The body and its gzip compression, without timestamp
+            so that the same document always compresses to the same bytes.
+    """
+    body = json.dumps(document, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return EncodedDocument(body, gzip.compress(body, mtime=0))
+
+
+class Requirement(NamedTuple):
+    """What a course counts towards: (kind, category, credits).
+
+    `kind` is one of REQUIREMENT_KINDS, `category` is the core category for
+    cores, the major course group index for majors and None for electives.
+    """
+    kind: str
+    category: object
+    credits: int
+
+
+REQUIREMENT_KINDS = ('ny_core', 'sh_core', 'major', 'ny_elective', 'sh_elective')
+
+
+class SHElectiveCourse(NamedTuple):
+    """A SH elective course: (course_num, course_name, pre_reqs, credits).
+
+    `pre_reqs` keeps the catalog strings ("A OR B"), `prereq_groups` holds the
+    same groups pre-split into course ids.
+    """
+    id: str
+    name: str
+    pre_reqs: tuple
+    credits: int
+    prereq_groups: tuple
+
+
+def _split_title(title):
+    """Split a catalog title, reporting malformed titles as catalog errors."""
+    try:
+        return split_course_title(title)
+    except ValueError as exc:
+        raise CatalogError(str(exc)) from exc
+
+
+def _prereq_groups(pre_reqs):
+    """Split catalog prerequisite strings ("A OR B") into groups of course ids."""
+    return tuple(tuple(_split_title(option)[0] for option in pre_req.split(' OR ')) for pre_req in pre_reqs)
+
+
+def _load_documents(paths):
+    """Read and decode every catalog file."""
+    documents = {}
+    digest = hashlib.sha1()
+    for key, path in paths.items():
+        try:
+            with open(path, 'rb') as json_file:
+                raw = json_file.read()
+        except OSError as exc:
+            raise CatalogError(f"Cannot read catalog file {path}: {exc}") from exc
+        try:
+            documents[key] = json.loads(raw)
+        except ValueError as exc:
+            raise CatalogError(f"Invalid JSON in catalog file {path}: {exc}") from exc
+        digest.update(raw)
+    return documents, digest.hexdigest()[:16]
+
+
+def _expect(condition, message):
+    if not condition:
+        raise CatalogError(message)
+
+
+class CourseCatalog():
+    """Immutable in-memory view of the recommendor catalogs.
+
+    Built once per process by `get_catalog` and shared by every request, so
+    nothing here may be mutated by callers.
+    """
+    def __init__(self, documents, version):
+        """Validate the decoded catalog documents and build the indexes.
+
+        Args:
+            documents (dict): The decoded JSON documents keyed by catalog name.
+            version (str): Digest of the catalog files.
+        """
+        self.version = version
+
+        # cs major courses: groups of interchangeable 'num name' strings
+        cs_major_courses = documents['cs_major_courses']
+        _expect(isinstance(cs_major_courses, list), "cs_major_courses must be a list of groups")
+        groups = []
+        for group in cs_major_courses:
+            _expect(isinstance(group, list) and group, f"Invalid major course group {group!r}")
+            groups.append(tuple(group))
+        self.cs_major_courses = tuple(groups)
+        self.major_groups = tuple(
+            tuple(_split_title(title)[0] for title in group) for group in self.cs_major_courses
+        )
+        # cs major course prerequisites: course number -> "A OR B" strings, imported as `CoursePrereq` rows
+        cs_major_prereqs = documents['cs_major_prereqs']
+        _expect(isinstance(cs_major_prereqs, dict), "cs_major_prereqs must map course numbers to prerequisites")
+        major_course_prereqs = {}
+        for num, pre_reqs in cs_major_prereqs.items():
+            _expect(isinstance(pre_reqs, list), f"Invalid prerequisites for {num!r}")
+            major_course_prereqs[canonical_course_id(num)] = _prereq_groups(pre_reqs)
+        self.major_course_prereqs = MappingProxyType(major_course_prereqs)
+
+        self.ny_core_courses = self._build_core(documents['ny_core_courses'], 'ny_core_courses', with_credits=True)
+        self.sh_core_courses = self._build_core(documents['sh_core_courses'], 'sh_core_courses', with_credits=False)
+        # the core course files as the API serves them, unchanged: NY credits are strings,
+        # SH rows have no credits and the course numbers are not canonicalized
+        self.core_course_lists = MappingProxyType({
+            'ny': documents['ny_core_courses'], 'sh': documents['sh_core_courses'],
+        })
+        # the core courses responses, rendered once per catalog rather than per request
+        self.core_documents = MappingProxyType({
+            loc: encode_document({'course_lists': course_lists}) for loc, course_lists in self.core_course_lists.items()
+        })
+
+        ny_electives = documents['ny_elective_courses']
+        _expect(isinstance(ny_electives, list), "ny_elective_courses must be a list")
+        self.ny_elective_courses = tuple(
+            NYElectiveCourse(canonical_course_id(num), name.strip(), int(credits))
+            for num, name, credits in (self._row(row, 3, 'ny_elective_courses') for row in ny_electives)
+        )
+
+        sh_electives = documents['sh_elective_courses']
+        _expect(isinstance(sh_electives, list), "sh_elective_courses must be a list")
+        courses = []
+        for row in sh_electives:
+            num, name, pre_reqs, credits = self._row(row, 4, 'sh_elective_courses')
+            _expect(isinstance(pre_reqs, list), f"Invalid prerequisites for {num!r}")
+            courses.append(SHElectiveCourse(
+                canonical_course_id(num), name.strip(), tuple(pre_reqs), int(credits), _prereq_groups(pre_reqs),
+            ))
+        self.sh_elective_courses = tuple(courses)
+
+        # hash indexes
+        self.ny_electives_by_id = MappingProxyType({course.id: course for course in self.ny_elective_courses})
+        self.sh_electives_by_id = MappingProxyType({course.id: course for course in self.sh_elective_courses})
+        # topics courses share a number, they are one elective: the NY electives grouped by number
+        ny_elective_groups = {}
+        for course in self.ny_elective_courses:
+            ny_elective_groups.setdefault(course.id, []).append(course)
+        self.ny_elective_groups = tuple(tuple(group) for group in ny_elective_groups.values())
+        self.requirement_index = self._build_requirement_index()
+
+        # the prerequisites of the files, a SH elective may be a major course too
+        course_prereqs = {course.id: list(course.prereq_groups) for course in self.sh_elective_courses}
+        for course_id, prereq_groups in self.major_course_prereqs.items():
+            groups = course_prereqs.setdefault(course_id, [])
+            groups += [group for group in prereq_groups if group not in groups]
+        self.course_prereqs = MappingProxyType({course_id: tuple(groups) for course_id, groups in course_prereqs.items()})
+
+        # prerequisite graphs: courses for the SH electives, group indices for the major courses
+        # ordered by the files, `get_major_prereqs` orders them by the database
+        try:
+            self.elective_prereqs = PrereqGraph.from_electives(self.sh_elective_courses)
+            self.major_prereqs = self.major_graph(PrereqGraph(self.course_prereqs))
+        except PrereqCycleError as exc:
+            raise CatalogError(str(exc)) from exc
+
+    def major_graph(self, course_prereqs):
+        """Build the graph between the major course groups.
+
+        Args:
+            course_prereqs (PrereqGraph): The prerequisites between the courses.
+
+        Returns:
+            PrereqGraph: The graph whose nodes are the indices of `major_groups`.
+
+        Raises:
+            PrereqCycleError: If the major course groups require each other.
+        """
+        return course_prereqs.between_groups(self.major_groups)
+
+    def _build_requirement_index(self):
+        """Build the course number -> requirements inverted index.
+
+        Requirements are listed in the order the recommendor checks them:
+        NY cores, SH cores, major groups, NY electives and SH electives.
+        """
+        index = {}
+
+        def add(course_num, requirement):
+            # cross-listed courses ('INFO-UB 23/TECH-UB 23') are indexed under every number
+            for alias in course_id_aliases(course_num):
+                entries = index.setdefault(alias, [])
+                if requirement not in entries:
+                    entries.append(requirement)
+
+        for kind, core_courses in (('ny_core', self.ny_core_courses), ('sh_core', self.sh_core_courses)):
+            for category, courses in core_courses.items():
+                for course in courses:
+                    add(course.id, Requirement(kind, category, course.credits))
+        for group_idx, group in enumerate(self.major_groups):
+            for course_num in group:
+                add(course_num, Requirement('major', group_idx, 4))
+        for course in self.ny_elective_courses:
+            add(course.id, Requirement('ny_elective', None, course.credits))
+        for course in self.sh_elective_courses:
+            add(course.id, Requirement('sh_elective', None, course.credits))
+
+        return MappingProxyType({course_num: tuple(entries) for course_num, entries in index.items()})
+
+    def classify(self, course_num):
+        """Get the requirements a course counts towards.
+
+        Args:
+            course_num (str): The canonical course number.
+
+        Returns:
+            tuple: The matching `Requirement` entries, empty if the course is not in the catalog.
+        """
+        return self.requirement_index.get(course_num, ())
+
+    @staticmethod
+    def _row(row, size, name):
+        _expect(isinstance(row, list) and len(row) == size, f"Invalid row in {name}: {row!r}")
+        return row
+
+    def _build_core(self, document, name, with_credits):
+        """Build the read-only core category -> courses mapping."""
+        _expect(isinstance(document, dict), f"{name} must map core categories to courses")
+        core = {}
+        for category, rows in document.items():
+            _expect(isinstance(rows, list), f"Invalid course list for {category!r} in {name}")
+            courses = []
+            for row in rows:
+                if with_credits:
+                    num, course_name, credits = self._row(row, 3, name)
+                else:
+                    num, course_name = self._row(row, 2, name)
+                    credits = SH_CORE_CREDITS
+                courses.append(CoreCourse(canonical_course_id(num), course_name.strip(), int(credits)))
+            core[category] = tuple(courses)
+        return MappingProxyType(core)
+
+    def core_courses(self, loc):
+        """Get the core courses of a location.
+
+        Args:
+            loc (str): 'ny' or 'sh'.
+
+        Returns:
+            Mapping: The core category -> courses mapping, None for unknown locations.
+        """
+        return {'ny': self.ny_core_courses, 'sh': self.sh_core_courses}.get(loc)
+
+
+_catalog = None
+_catalog_signature = None
+_catalog_lock = threading.Lock()
+
+
+def _signature(paths):
+    """Modification times of the catalog files."""
+    try:
+        return tuple(os.stat(path).st_mtime_ns for path in paths.values())
+    except OSError as exc:
+        raise CatalogError(f"Cannot stat catalog files: {exc}") from exc
+
+
+def get_catalog():
+    """Get the process-wide course catalog.
+
+    The catalog files are read once and only re-read when one of their
+    modification times changes.
+
+    Returns:
+        CourseCatalog: The shared catalog.
+    """
+    global _catalog, _catalog_signature
+    signature = _signature(CATALOG_PATHS)
+    if _catalog is None or signature != _catalog_signature:
+        with _catalog_lock:
+            if _catalog is None or signature != _catalog_signature:
+                documents, version = _load_documents(CATALOG_PATHS)
+                _catalog = CourseCatalog(documents, version)
+                _catalog_signature = signature
+    return _catalog
+
+
+_major_prereqs = None
+_major_prereqs_lock = threading.Lock()
+
+
+def get_major_prereqs(catalog=None):
+    """Get the process-wide graph between the major course groups.
+
+    The groups are ordered by the `CoursePrereq` rows of their courses, read
+    again when the catalog version or the catalog files change. Until the
+    catalog is imported, without such rows, they are ordered by the files.
+
+    Args:
+        catalog (CourseCatalog): The catalog of the major course groups, the process-wide one by default.
+
+    Returns:
+        PrereqGraph: The graph whose nodes are the indices of `catalog.major_groups`.
+    """
+    from courses.catalog_version import get_catalog_version
+
+    global _major_prereqs
+    catalog = catalog if catalog is not None else get_catalog()
+    version = (catalog.version, get_catalog_version())
+    if _major_prereqs is None or _major_prereqs[0] != version:
+        with _major_prereqs_lock:
+            if _major_prereqs is None or _major_prereqs[0] != version:
+                from courses.models import CoursePrereq
+
+                major_courses = [course_num for group in catalog.major_groups for course_num in group]
+                course_prereqs = PrereqGraph.from_models(CoursePrereq.objects.filter(course__in=major_courses))
+                if not course_prereqs.order:
+                    # the catalog is not imported
+                    _major_prereqs = (version, catalog.major_prereqs)
+                else:
+                    try:
+                        _major_prereqs = (version, catalog.major_graph(course_prereqs))
+                    except PrereqCycleError as exc:
+                        raise CatalogError(str(exc)) from exc
+    return _major_prereqs[1]
@@ -0,0 +1,279 @@
+import time
+from itertools import combinations
+from typing import NamedTuple
+
+
+# the default time budget of one search, in seconds
+PLANNER_TIME_BUDGET = 0.2
+
+# the most courses taken in a semester
+SEMESTER_COURSE_CAP = 4
+
+# the deadline is checked every this many visited states
+DEADLINE_CHECK_INTERVAL = 64
+
+
+class PlanItem(NamedTuple):
+    """A required course to schedule.
+
+    `major` is the major course group the course belongs to (None for a plain
+    core course) and `core` the core type it also fulfills (None for a plain
+    major course), Calculus and ICP fulfill both.
+    """
+    major: object
+    core: object
+    bits: int
+
+
+class PlanState(NamedTuple):
+    """The state before a semester.
+
+    `remaining` has the bits of the `PlanItem`s left, `completed` the bits of
+    the completed courses in the course graph, `ny_electives` and
+    `sh_electives` the number of NY and SH electives already planned.
+    """
+    index: int
+    remaining: int
+    electives_left: int
+    completed: int
+    ny_electives: int
+    sh_electives: int
+
+
+class PlanSemester(NamedTuple):
+    """A rest semester: its name, whether it is in NY and the template courses taking slots."""
+    name: str
+    ny: bool
+    template: tuple
+
+
+class PlannerResult(NamedTuple):
+    """The best plan found.
+
+    `semesters` holds the items and the number of electives of every rest
+    semester, `unmet` the number of requirements left after the plan and
+    `optimal` whether the search finished within its budget.
+    """
+    semesters: tuple
+    unmet: int
+    optimal: bool
+    visited: int
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+class SearchPlanner():
+    """Degree planner searching every way to spread the requirements over the rest semesters.
+
+    The state before a semester is the set of requirements left (one bit per
+    core type and major course group), the number of electives left and the
+    courses completed, which unlock the SH electives. The states are explored
+    depth first and memoized, so a state reached again by another ordering of
+    the same courses is solved once. A branch stops as soon as it reaches the
+    lower bound of its state, the whole search stops when it runs out of time
+    and returns the best complete plan seen.
+    """
+    def __init__(self, semesters, untaken_cores, untaken_majors, electives_needed, major_prereqs,
+                 completed_majors, completed, offered_course, ny_elective_capacity, sh_elective_capacity,
+                 time_budget=PLANNER_TIME_BUDGET):
+        """Initialize the SearchPlanner class.
+
+        Args:
+            semesters (list): The `PlanSemester`s left, in order.
+            untaken_cores (list): The core types left, 'MATH' and 'AT' are taken with
+                major course groups 1 and 0 when those are left too.
+            untaken_majors (list): The major course groups left.
+            electives_needed (int): The number of electives left.
+            major_prereqs (PrereqGraph): The graph between the major course groups.
+            completed_majors (int): The bitset of the major course groups already done.
+            completed (int): The bitset of the courses already done in the course graph.
+            offered_course (callable): offered_course(item, ny) gives the course graph
+                bitset of the course taken for a `PlanItem` in NY (or SH), None when
+                the item is not offered there.
+            ny_elective_capacity (int): The number of NY electives that can be taken.
+            sh_elective_capacity (callable): sh_elective_capacity(completed) gives the
+                number of SH electives that can be taken once `completed` are done.
+            time_budget (float): The time limit of the search, in seconds.
+        """
+        self.semesters = tuple(semesters)
+        self.electives_needed = max(0, electives_needed)
+        self.major_prereqs = major_prereqs
+        self.completed_majors = completed_majors
+        self.completed = completed
+        self.ny_elective_capacity = ny_elective_capacity
+        self.sh_elective_capacity = sh_elective_capacity
+        self.time_budget = time_budget
+
+        items = []
+        merged_cores = {'MATH': 1, 'AT': 0}
+        for major in untaken_majors:
+            core = next((core for core, group in merged_cores.items()
+                         if group == major and core in untaken_cores), None)
+            items.append((major, core))
+        for core in untaken_cores:
+            if merged_cores.get(core) not in untaken_majors:
+                items.append((None, core))
+        self.items = tuple(PlanItem(major, core, 1 << i) for i, (major, core) in enumerate(items))
+
+        # the items that can be taken in each semester with their courses, prerequisites aside
+        self._offered = []
+        for semester in self.semesters:
+            offered = []
+            for item in self.items:
+                course = offered_course(item, semester.ny)
+                if course is not None:
+                    offered.append((item, course))
+            self._offered.append(tuple(offered))
+        self._slots = tuple(SEMESTER_COURSE_CAP - len(semester.template) for semester in self.semesters)
+        # slots left from each semester on
+        self._slots_left = tuple(sum(self._slots[i:]) for i in range(len(self.semesters) + 1))
+        self._sh_capacity = {}
+
+    def _lower_bound(self, state):
+        """The fewest requirements that can still be left unmet from a state."""
+        capacity_bound = bin(state.remaining).count('1') + state.electives_left - self._slots_left[state.index]
+
+        # a major course group needs one semester per group left in its prerequisite chain
+        semesters_left = len(self.semesters) - state.index
+        left_majors = {item.major for item in self.items if item.bits & state.remaining and item.major is not None}
+        depths = {}
+        chain_bound = sum(
+            self._chain_length(major, left_majors, depths) > semesters_left for major in left_majors
+        )
+        return max(0, capacity_bound, chain_bound)
+
+    def _chain_length(self, major, left_majors, depths):
+        if major not in depths:
+            length = 0
+            for group in self.major_prereqs.prereqs(major):
+                # a group with a member done (or not required) does not wait
+                if all(prereq in left_majors for prereq in group):
+                    length = max(length, min(self._chain_length(prereq, left_majors, depths) for prereq in group))
+            depths[major] = length + 1
+        return depths[major]
+
+    def _completed_majors(self, remaining):
+        done = [item.major for item in self.items if item.major is not None and not item.bits & remaining]
+        return self.completed_majors | self.major_prereqs.mask(done)
+
+    def _elective_capacity(self, state):
+        """The most electives that can be planned in the semester of a state."""
+        if self.semesters[state.index].ny:
+            return max(0, min(state.electives_left, self.ny_elective_capacity - state.ny_electives))
+        if state.completed not in self._sh_capacity:
+            self._sh_capacity[state.completed] = self.sh_elective_capacity(state.completed)
+        return max(0, min(state.electives_left, self._sh_capacity[state.completed] - state.sh_electives))
+
+    def _choices(self, state):
+        """The ways to fill the semester of a state, fullest first.
+
+        Leaving a slot empty while a requirement could take it never helps, so
+        only the choices using as many slots as possible are returned.
+
+        Yields:
+            tuple: The chosen (item, course) pairs and the number of electives.
+        """
+        completed_majors = self._completed_majors(state.remaining)
+        candidates = [
+            (item, course) for item, course in self._offered[state.index]
+            if item.bits & state.remaining
+            and (item.major is None or self.major_prereqs.is_unlocked(item.major, completed_majors))
+        ]
+        slots = self._slots[state.index]
+        elective_capacity = self._elective_capacity(state)
+        usable = min(slots, len(candidates) + elective_capacity)
+        for size in range(min(slots, len(candidates)), -1, -1):
+            electives = min(elective_capacity, slots - size)
+            if size + electives < usable:
+                break
+            for chosen in combinations(candidates, size):
+                yield chosen, electives
+
+    def _next_state(self, state, chosen, electives):
+        return PlanState(
+            state.index + 1,
+            state.remaining & ~sum(item.bits for item, _ in chosen),
+            state.electives_left - electives,
+            state.completed | sum(course for _, course in chosen),
+            state.ny_electives + (electives if self.semesters[state.index].ny else 0),
+            state.sh_electives + (0 if self.semesters[state.index].ny else electives),
+        )
+
+    def plan(self):
+        """Search for the plan leaving the fewest requirements unmet.
+
+        Returns:
+            PlannerResult: The best plan found within the time budget.
+        """
+        self._deadline = time.perf_counter() + self.time_budget
+        self._visited = 0
+        self._memo = {}
+        self._path = []
+        self._best = None
+        self._best_unmet = None
+        start = PlanState(0, sum(item.bits for item in self.items), self.electives_needed, self.completed, 0, 0)
+
+        # the first descent is the greedy plan, it is always completed so there is a plan to return
+        self._greedy(start)
+        optimal = True
+        try:
+            if self._best_unmet > self._lower_bound(start):
+                self._search(start)
+        except _BudgetExceeded:
+            optimal = False
+        return PlannerResult(self._best, self._best_unmet, optimal, self._visited)
+
+    @staticmethod
+    def _unmet(state):
+        return bin(state.remaining).count('1') + state.electives_left
+
+    def _greedy(self, state):
+        path = []
+        while state.index < len(self.semesters):
+            chosen, electives = next(self._choices(state))
+            path.append((tuple(item for item, _ in chosen), electives))
+            state = self._next_state(state, chosen, electives)
+        self._record(tuple(path), self._unmet(state))
+
+    def _record(self, semesters, unmet):
+        if self._best_unmet is None or unmet < self._best_unmet:
+            self._best, self._best_unmet = semesters, unmet
+
+    def _search(self, state):
+        """Solve a state.
+
+        Returns:
+            tuple: The fewest unmet requirements from the state and the semesters reaching it.
+        """
+        if state.index == len(self.semesters):
+            unmet = self._unmet(state)
+            self._record(tuple(self._path), unmet)
+            return unmet, ()
+
+        if state in self._memo:
+            unmet, rest = self._memo[state]
+            self._record(tuple(self._path) + rest, unmet)
+            return unmet, rest
+
+        self._visited += 1
+        if self._visited % DEADLINE_CHECK_INTERVAL == 0 and time.perf_counter() > self._deadline:
+            raise _BudgetExceeded
+
+        bound = self._lower_bound(state)
+        best = None
+        for chosen, electives in self._choices(state):
+            semester = (tuple(item for item, _ in chosen), electives)
+            self._path.append(semester)
+            unmet, rest = self._search(self._next_state(state, chosen, electives))
+            self._path.pop()
+            if best is None or unmet < best[0]:
+                best = (unmet, (semester,) + rest)
+                if unmet == bound:
+                    break
+            if self._best_unmet == 0:
+                break
+
+        self._memo[state] = best
+        return best
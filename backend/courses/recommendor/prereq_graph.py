@@ -0,0 +1,175 @@
+from courses.course_id import canonical_course_id
+
+
+class PrereqCycleError(ValueError):
+    """Raised when the prerequisites are not a DAG."""
+
+
+class PrereqGraph():
+    """Prerequisite DAG evaluated with bitsets.
+
+    Every node (a course number or a major course group) gets one bit. A node
+    requires all of its groups, a group is satisfied by any of its members, so
+    with `completed` being the bitset of the finished nodes a node is unlocked
+    when `group & completed` is non-zero for each of its group masks.
+    """
+    def __init__(self, prereqs):
+        """Compile the prerequisites.
+
+        Args:
+            prereqs (dict): node -> list of prerequisite groups, each group is a
+                list of interchangeable nodes ("A OR B").
+
+        Raises:
+            PrereqCycleError: If the prerequisites contain a cycle.
+        """
+        bits = {}
+        for node, groups in prereqs.items():
+            bits.setdefault(node, 1 << len(bits))
+            for group in groups:
+                for prereq in group:
+                    bits.setdefault(prereq, 1 << len(bits))
+        self._bits = bits
+
+        self._prereqs = {
+            node: tuple(tuple(group) for group in groups if group)
+            for node, groups in prereqs.items()
+        }
+        self._groups = {node: tuple(self.mask(group) for group in groups) for node, groups in self._prereqs.items()}
+        self.order = self._topological_order(prereqs)
+
+    def _topological_order(self, prereqs):
+        """Order the nodes so every node comes after all its prerequisites."""
+        depends_on = {node: set() for node in self._bits}
+        required_by = {node: set() for node in self._bits}
+        for node, groups in prereqs.items():
+            for group in groups:
+                for prereq in group:
+                    depends_on[node].add(prereq)
+                    required_by[prereq].add(node)
+
+        order = [node for node in self._bits if not depends_on[node]]
+        for node in order:
+            for dependent in required_by[node]:
+                depends_on[dependent].discard(node)
+                if not depends_on[dependent]:
+                    order.append(dependent)
+
+        if len(order) != len(self._bits):
+            cycle = sorted(str(node) for node, left in depends_on.items() if left)
+            raise PrereqCycleError(f"Prerequisite cycle between {', '.join(cycle)}")
+        return tuple(order)
+
+    def __contains__(self, node):
+        return node in self._bits
+
+    def prereqs(self, node):
+        """Get the prerequisite groups of a node.
+
+        Args:
+            node: The node.
+
+        Returns:
+            tuple: The groups, each a tuple of interchangeable nodes.
+        """
+        return self._prereqs.get(node, ())
+
+    def mask(self, nodes):
+        """Get the bitset of some nodes, unknown nodes are ignored.
+
+        Args:
+            nodes (iterable): The nodes.
+
+        Returns:
+            int: The bitset.
+        """
+        bits = self._bits
+        mask = 0
+        for node in nodes:
+            mask |= bits.get(node, 0)
+        return mask
+
+    def is_unlocked(self, node, completed):
+        """Check whether every prerequisite group of a node is satisfied.
+
+        Args:
+            node: The node, nodes without prerequisites are always unlocked.
+            completed (int): The bitset of the completed nodes.
+
+        Returns:
+            bool: Whether the node can be taken.
+        """
+        for group in self._groups.get(node, ()):
+            if not group & completed:
+                return False
+        return True
+
+    def unlocked(self, completed, nodes=None):
+        """Get all the nodes that can be taken.
+
+        Args:
+            completed (int): The bitset of the completed nodes.
+            nodes (iterable): The candidates, every node of the graph by default.
+
+        Returns:
+            list: The unlocked candidates, in the order given (topological by default).
+        """
+        groups = self._groups
+        unlocked = []
+        for node in (self.order if nodes is None else nodes):
+            for group in groups.get(node, ()):
+                if not group & completed:
+                    break
+            else:
+                unlocked.append(node)
+        return unlocked
+
+    def between_groups(self, groups):
+        """Build the graph between groups of nodes, eg. the major course groups.
+
+        A group requires another when a node of the first has a prerequisite
+        group with nodes of the second, "A OR B" groups spanning several
+        groups stay one group.
+
+        Args:
+            groups (list): The groups, each a list of nodes.
+
+        Returns:
+            PrereqGraph: The graph whose nodes are the indices of the groups.
+        """
+        group_of = {node: group_idx for group_idx, group in enumerate(groups) for node in group}
+        prereqs = {}
+        for group_idx, group in enumerate(groups):
+            group_prereqs = prereqs.setdefault(group_idx, [])
+            for node in group:
+                for prereq_group in self.prereqs(node):
+                    required = sorted({group_of[prereq] for prereq in prereq_group if prereq in group_of} - {group_idx})
+                    if required and required not in group_prereqs:
+                        group_prereqs.append(required)
+        return PrereqGraph(prereqs)
+
+    @classmethod
+    def from_models(cls, queryset=None):
+        """Build the course graph from the `CoursePrereq` rows.
+
+        Args:
+            queryset (QuerySet): The `CoursePrereq`s to use, all of them by default.
+        """
+        from courses.models import CoursePrereq
+
+        if queryset is None:
+            queryset = CoursePrereq.objects.all()
+        prereqs = {}
+        for course_prereq in queryset.prefetch_related('prereqs'):
+            group = [canonical_course_id(course.id) for course in course_prereq.prereqs.all()]
+            prereqs.setdefault(canonical_course_id(course_prereq.course_id), []).append(group)
+        return cls(prereqs)
+
+    @classmethod
+    def from_electives(cls, sh_elective_courses):
+        """Build the course graph from the SH electives' "A OR B" prerequisites.
+
+        Args:
+            sh_elective_courses (iterable): The catalog's `SHElectiveCourse`s.
+        """
+        return cls({course.id: course.prereq_groups for course in sh_elective_courses})
@@ -1,70 +1,108 @@
-import json
 import random
-from django.conf import settings
 import os, sys
+from typing import NamedTuple
 sys.path.append('../../backend')
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'se_project.settings')
 
 import django
 django.setup()
 
+from courses.course_id import canonical_course_id
+from courses.recommendor.catalog import get_catalog
+from courses.recommendor.planner import PLANNER_TIME_BUDGET, SEMESTER_COURSE_CAP, PlanSemester, SearchPlanner
+
+
+# the label of the cores taken with the major courses
+CORE_LABELS = {'MATH': 'Math', 'AT': 'AT'}
+
+# a plan is drawn at most this many times per requested plan when looking for distinct plans
+PLAN_ATTEMPTS = 10
+
+
+class SemesterSchedule(NamedTuple):
+    """The fixed part of a rest semester: template, core types and major course groups."""
+    name: str
+    ny: bool
+    template: list
+    cores: list
+    majors: list
+
+
+class ElectivePool():
+    """The NY electives left to recommend, drawn at random without replacement.
+
+    Every draw takes O(1): the drawn group is swapped with the last one and
+    popped, so a plan can never draw an elective twice and drawing from an
+    exhausted pool returns None instead of retrying.
+    """
+    def __init__(self, groups):
+        """Initialize the ElectivePool class.
+
+        Args:
+            groups (iterable): The electives left, grouped by course number.
+        """
+        self.groups = list(groups)
+
+    def __len__(self):
+        return len(self.groups)
+
+    def copy(self):
+        return ElectivePool(self.groups)
+
+    def draw(self, rng):
+        """Draw an elective.
+
+        Args:
+            rng (random.Random): The random source.
+
+        Returns:
+            NYElectiveCourse: The elective, one of the topics for a shared number,
+                None if the pool is empty.
+        """
+        if not self.groups:
+            return None
+        index = rng.randrange(len(self.groups))
+        self.groups[index], self.groups[-1] = self.groups[-1], self.groups[index]
+        return rng.choice(self.groups.pop())
+
 
 class RecommendorPreparer():
     """The RecommendorPreparer class to prepare the courses for the students.
 
     """
-    def __init__(self):
+    def __init__(self, catalog=None):
         """Initialize the RecommendorPreparer class.
+
+        Args:
+            catalog (CourseCatalog): The course catalog, the process-wide one by default.
         """
-        pass
+        self.catalog = catalog if catalog is not None else get_catalog()
     
-    def check_core_taken(self, course_num, course_name, ny_core_courses, sh_core_courses, taken_map):
+    def check_core_taken(self, course_num, taken_map):
         """ Check whether the core course is taken.
 
         Args:
-            course_num (str): The course number.
-            course_name (str): The course name.
-            ny_core_courses (dict): The NY core courses.
-            sh_core_courses (dict): The SH core courses.
+            course_num (str): The canonical course number.
             taken_map (dict): The taken map.
 
         Returns:
             int: The credits of the course.
         """
-        # clean the course number
-        course_num_idx = course_num.find('-')
-        course_num_idx = course_num[course_num_idx+1:].find('-') + course_num_idx
-
-        course_num = course_num[:course_num_idx] + course_num[course_num_idx+2:]
-        
-        find = False
-        # find through ny core courses
-        for core, core_courses in ny_core_courses.items():
-            for core_course in core_courses:
-                if course_num in core_course[0]:
-                    taken_map[core] += 1
-                    find = True
-                    return int(core_course[2])
-        
-        # find through sh core courses
-        if not find:
-            for core, core_courses in sh_core_courses.items():
-                for core_course in core_courses:
-                    if course_num in core_course[0]:
-                        taken_map[core] += 1
-                        find = True
-                        # shanghai core always has 4 credits
-                        return 4
+        # the first core entry wins: NY cores are indexed before SH cores
+        for requirement in self.catalog.classify(course_num):
+            if requirement.kind == 'ny_core' or requirement.kind == 'sh_core':
+                # Language and the NY Math core are not tracked
+                if requirement.category in taken_map:
+                    taken_map[requirement.category] += 1
+                return requirement.credits
 
         return 0
 
-    def filter_core_courses(self, course_history, ny_core_courses, sh_core_courses):
+    def filter_core_courses(self, course_history):
         """Filter out the left core courses that need to be taken.
 
         Args:
             course_history (dict): The course history of the student.
-            ny_core_courses (dict): The NY core courses.
-            sh_core_courses (dict): The SH core courses.
         
         Returns:
             list: The untaken core courses.
@@ -87,14 +125,16 @@ class RecommendorPreparer():
         total_credits = 0
         for _, taken_courses in course_history.items():
             for taken_course in taken_courses:
-                if 'math' in taken_course[0].lower() and taken_map['MATH'] == 0:
+                course_num = canonical_course_id(taken_course[0])
+                # any math course fulfills the math core, it can still count
+                # towards the core it is listed in, so the order of the history does not matter
+                if 'math' in course_num.lower() and taken_map['MATH'] == 0:
                     total_credits += 4
                     taken_map['MATH'] = 1
-                    continue
                 # check if the taken course in the required courses
                 # do not use the course name to search because the course name may be different
                 # eg. in course history the `Computer Science Senior Project` is 
-                total_credits += self.check_core_taken(taken_course[0], taken_course[1], ny_core_courses, sh_core_courses, taken_map)
+                total_credits += self.check_core_taken(course_num, taken_map)
 
         untaken_core_courses = []
 
@@ -109,47 +149,26 @@ class RecommendorPreparer():
 
         return untaken_core_courses
 
-    def check_elective_taken(self, course_num, course_name, ny_elective_courses, sh_elective_courses, taken_elective):
+    def check_elective_taken(self, course_num, taken_elective):
         """Check whether the elective course is taken.
 
         Args:
-            course_num (str): The course number.
-            course_name (str): The course name.
-            ny_elective_courses (list): The NY elective courses.
-            sh_elective_courses (list): The SH elective courses.
+            course_num (str): The canonical course number.
             taken_elective (list): The taken electives.
 
         Returns:
             None
         """
+        for requirement in self.catalog.classify(course_num):
+            if requirement.kind == 'ny_elective' or requirement.kind == 'sh_elective':
+                taken_elective.append(course_num)
+                return
 
-
-        # clean the course number
-        course_num_idx = course_num.find('-')
-        course_num_idx = course_num[course_num_idx+1:].find('-') + course_num_idx
-
-        course_num = course_num[:course_num_idx] + course_num[course_num_idx+2:]
-
-        # find through sh electives
-        if course_num[course_num.find('-')+1:course_num.find('-')+4] == 'SHU':
-            # SH courses: (course_num, course_name, pre_reqs, credits)
-            for elective_course in sh_elective_courses:
-                if course_num == elective_course[0]:
-                    taken_elective.append(course_num)
-        else:
-            # find through ny core courses
-            # NY courses: (course_num, course_name, credits)
-            for elective_course in ny_elective_courses:
-                if course_num == elective_course[0]:
-                    taken_elective.append(course_num)
-
-    def filter_elective_courses(self, course_history, ny_electives, sh_electives):
+    def filter_elective_courses(self, course_history):
         """Filter out the left elective courses that need to be taken.
 
         Args:
             course_history (dict): The course history of the student.
-            ny_electives (list): The NY elective courses.
-            sh_electives (list): The SH elective courses.
 
         Returns:
             list: The taken electives.
@@ -160,26 +179,15 @@ class RecommendorPreparer():
             for taken_course in taken_courses:
                 # check if the taken course in the required courses
                 # course_num: taken_course[0], course_name: taken_course[1]
-                self.check_elective_taken(
-                    taken_course[0], taken_course[1],
-                    ny_electives, sh_electives,
-                    taken_electives
-                )
+                self.check_elective_taken(canonical_course_id(taken_course[0]), taken_electives)
         
         return taken_electives
 
-    def general_prepare(self, course_history, cs_major_courses, 
-                        ny_core_courses, sh_core_courses,
-                        ny_elective_courses, sh_elective_courses):
+    def general_prepare(self, course_history):
         """General prepare the courses for the students.
 
         Args:
             course_history (dict): The course history of the student.
-            cs_major_courses (list): The CS major courses.
-            ny_core_courses (dict): The NY core courses.
-            sh_core_courses (dict): The SH core courses.
-            ny_elective_courses (list): The NY elective courses.
-            sh_elective_courses (list): The SH elective courses.
 
         Returns:
             tuple: The untaken core courses and taken electives.
@@ -190,14 +198,14 @@ class RecommendorPreparer():
         sample untaken_core_courses:
         ['ED', 'HPC']
         """
-        untaken_core_courses = self.filter_core_courses(course_history, ny_core_courses, sh_core_courses)
+        untaken_core_courses = self.filter_core_courses(course_history)
 
         # filter out the left elective courses that need be taken
         """
         sample taken_electives:
         ['CSCI-SHU 360', 'DATS-SHU 240']
         """
-        taken_electives = self.filter_elective_courses(course_history, ny_elective_courses, sh_elective_courses)
+        taken_electives = self.filter_elective_courses(course_history)
 
         return untaken_core_courses, taken_electives
 
@@ -205,19 +213,31 @@ class RecommendorPreparer():
 class Recommendor():
     """Recommendor class to recommend the courses for the students.
     """
-    def __init__(self, course_history, identity, tense=False):
+    def __init__(self, course_history, identity, tense=False, catalog=None, seed=None, requirements=None,
+                 major_prereqs=None):
         """Initialize the Recommendor class.
 
         Args:
             course_history (dict): The course history of the student.
             identity (str): The identity of the student.
             tense (bool): Whether the student is in the tense mode (take as much electives as possible).
+            catalog (CourseCatalog): The course catalog, the process-wide one by default.
+            seed (int): Seed of the random picks, the same seed gives the same recommendation.
+            requirements (RequirementState): The saved state of `course_history`, the
+                requirements are then not derived from the history again.
+            major_prereqs (PrereqGraph): The graph between the major course groups, e.g.
+                from `get_major_prereqs`, the one of the catalog files by default.
         
         Returns:
             None
         """
+        self.random = random.Random(seed)
+
+        # the catalog is loaded once per process and shared by all the recommendors
+        self.catalog = catalog if catalog is not None else get_catalog()
+
         # initialize the RecommendorPreparer
-        self.recommendor_preparer = RecommendorPreparer()
+        self.recommendor_preparer = RecommendorPreparer(self.catalog)
 
         # identity: ['chinese', 'inter']
         # general framework for the courses
@@ -239,13 +259,32 @@ class Recommendor():
 
         # 0: icp, 1: calculus, 2: ics. 3: prob and stat, 4: discrete, 5: arch, 6: data structure, 7: os, 8: algo
         self.semesters = ['freshmen_1st', 'freshmen_2nd', 'sophomore_1st', 'sophomore_2nd', 'junior_1st', 'junior_2nd', 'senior_1st', 'senior_2nd']
-        self.course_history = course_history
+        if requirements is not None:
+            # the saved state already holds what the history counts towards
+            self.course_history = dict(course_history)
+        else:
+            # course numbers are canonicalized once here, the hot loops below compare them as is
+            self.course_history = {
+                semester: [[canonical_course_id(course[0]), *course[1:]] for course in courses]
+                for semester, courses in course_history.items()
+            }
 
-        with open(os.path.join(settings.BASE_DIR, 'courses/recommendor/cs_major_courses.json'), 'r') as json_file:
-            self.cs_major_courses = json.load(json_file)
+        self.cs_major_courses = self.catalog.cs_major_courses
 
         self.major_course_list = [0, 1, 2, 3, 4, 5, 6, 7, 8]
-        self.major_course_pre_reqs = {0: [], 1: [], 2: [0], 3: [1], 4: [1], 5: [2], 6: [2], 7: [5], 8: [6, 4]}
+        # prerequisites between the major course groups and between courses, compiled once per catalog
+        self.major_prereqs = major_prereqs if major_prereqs is not None else self.catalog.major_prereqs
+        self.elective_prereqs = self.catalog.elective_prereqs
+
+        self.requirements = requirements
+
+        # bitset of the courses taken so far, updated after every recommended semester
+        if requirements is not None:
+            self.completed = requirements.completed
+        else:
+            self.completed = self.elective_prereqs.mask(
+                taken_course[0] for courses in self.course_history.values() for taken_course in courses
+            )
 
         # whether open the JuanWang mode
         self.tense = tense
@@ -258,25 +297,15 @@ class Recommendor():
             idx of ['CSCI-SHU 420 Computer Science Senior Project']
         ]
         """
-        self.untaken_major_courses = self._init_recommend()
-
-    def clean_course_number(self, course_number):
-        """Clean the course number.
-
-        Args:
-            course_number (str): The course number.
-        
-        Returns:
-            str: The cleaned course number.
-        """
-        if course_number.count('-') == 1:
-            return course_number
-
-        # clean the course number
-        course_num_idx = course_number.find('-')
-        course_num_idx = course_number[course_num_idx+1:].find('-') + course_num_idx
+        if requirements is not None:
+            self.untaken_major_courses = requirements.untaken_major_courses(self.major_course_list)
+        else:
+            self.untaken_major_courses = self._init_recommend()
 
-        return course_number[:course_num_idx] + course_number[course_num_idx+2:]
+        # bitset of the major course groups that are no longer to be taken
+        self.completed_majors = self.major_prereqs.mask(
+            set(self.major_course_list) - set(self.untaken_major_courses)
+        )
 
     def _init_recommend(self):
         """Initialize the recommendor.
@@ -294,11 +323,9 @@ class Recommendor():
             # get the each taken course
             for taken_course in self.course_history[semester]:
                 # find whether the course is in the major course list
-                for major_courses_idx in range(len(self.cs_major_courses)):
-                    for major_course in self.cs_major_courses[major_courses_idx]:
-                        if self.clean_course_number(taken_course[0]) in major_course:
-                            taken_major_courses.append(major_courses_idx)
-                            break
+                for requirement in self.catalog.classify(taken_course[0]):
+                    if requirement.kind == 'major':
+                        taken_major_courses.append(requirement.category)
 
         taken_major_courses.sort()
         untaken_major_courses = list(set(self.major_course_list) - set(taken_major_courses))
@@ -306,71 +333,67 @@ class Recommendor():
         
         return untaken_major_courses
 
-    def validate_elective(self, elective):
-        """ Validate the elective course.
+    def _prepare(self):
+        """Prepare the untaken core courses, taken electives and NY electives left, shared by every plan."""
+        if self.requirements is not None:
+            self.untaken_core_courses = self.requirements.untaken_core_courses()
+            self.taken_electives = self.requirements.taken_electives()
+        else:
+            self.untaken_core_courses, self.taken_electives = self.recommendor_preparer.general_prepare(self.course_history)
+        taken_electives = set(self.taken_electives)
+        self.ny_elective_pool = ElectivePool(
+            group for group in self.catalog.ny_elective_groups if group[0].id not in taken_electives
+        )
+
+    def _pick_electives(self, ny, elective_num, taken_electives, ny_electives, completed, rng):
+        """Pick the electives of a semester.
 
         Args:
-            elective (list): The elective course.
-        
+            ny (bool): Whether the semester is in NY.
+            elective_num (int): The most electives wanted.
+            taken_electives (list): The electives taken or recommended so far.
+            ny_electives (ElectivePool): The NY electives left in this plan, drawn from.
+            completed (int): The bitset of the courses completed before the semester.
+            rng (random.Random): The random source.
+
         Returns:
-            bool: Whether the elective course is valid.
+            list: The electives, fewer than `elective_num` when no more can be taken.
         """
-        pre_reqs = elective[2]
-        is_valid = True
-
-        # find each prerequite
-        for pre_req in pre_reqs:
-            find = False
-            # find through the taken courses
-            for semester in self.course_history.keys():
-                for taken_course in self.course_history[semester]:
-                    if self.clean_course_number(taken_course[0]) in pre_req:
-                        find = True
-
-            # update the is_valid for each prerequite
-            is_valid = is_valid and find
-
-        return is_valid
-
-    def recommend(self):
-        """Recommend the courses for the students.
+        if elective_num <= 0:
+            return []
+        if ny:
+            # we can't get the prerequite courses of the NY electives, so we randomly choose them
+            electives = []
+            while len(electives) < elective_num and len(ny_electives) > 0:
+                electives.append(ny_electives.draw(rng))
+            return electives
+
+        # the first SH electives, in catalog order, not taken and with all prerequisites completed
+        taken_electives = set(taken_electives)
+        electives = []
+        for course in self.catalog.sh_elective_courses:
+            if course[0] not in taken_electives and self.elective_prereqs.is_unlocked(course[0], completed):
+                electives.append(course)
+                if len(electives) == elective_num:
+                    break
+        return electives
+
+    def _schedule(self):
+        """Sequence the core and major courses of the rest semesters.
+
+        Nothing here is random: the core types and the major courses of every
+        semester only depend on the requirements left, so the schedule is
+        computed once and shared by every plan. `self.untaken_core_courses`
+        and `self.untaken_major_courses` are updated with what is scheduled.
 
         Returns:
-            bool: Whether the student can graduate.
+            list: The `SemesterSchedule` of each rest semester.
         """
-        # load the ny core courses
-        with open(os.path.join(settings.BASE_DIR, 'courses/recommendor/ny_core_courses.json'), 'r') as json_file:
-            ny_core_courses = json.load(json_file)
-    
-        # load the ny elective courses
-        with open(os.path.join(settings.BASE_DIR,'courses/recommendor/ny_elective_courses.json'), 'r') as json_file:
-            ny_elective_courses = json.load(json_file)
-
-        # load the sh elective courses
-        with open(os.path.join(settings.BASE_DIR,'courses/recommendor/sh_elective_courses.json'), 'r') as json_file:
-            sh_elective_courses = json.load(json_file)
-
-        # load sh core courses
-        with open(os.path.join(settings.BASE_DIR, 'courses/recommendor/sh_core_courses.json'), 'r') as json_file:
-            sh_core_courses = json.load(json_file)
-
-        # prepare the untaken core courses and taken electives
-        self.untaken_core_courses, self.taken_electives = self.recommendor_preparer.general_prepare(
-            self.course_history, self.cs_major_courses, ny_core_courses, sh_core_courses, ny_elective_courses, sh_elective_courses
-        )
-
-        if len(self.course_history.keys()) == 8:
-            return None
-
-        recommend = {}
+        schedule = []
         rest_semesters = self.semesters[len(self.course_history.keys()):]
         for rest_semester in rest_semesters:
             # first try to find through the recommend template
-            try:
-                recommend_courses = self.recommend_template[rest_semester]
-            except:
-                recommend_courses = []
-            # recommend append type: f'{course num} {course name}'
+            template = list(self.recommend_template.get(rest_semester, []))
 
             # indicate whether enroll in the NY courses
             if rest_semester == 'junior_1st' or rest_semester == 'junior_2nd':
@@ -378,190 +401,317 @@ class Recommendor():
             else:
                 ny = False
 
+            # core types of this semester: 'MATH' and 'AT' are taken with the major courses
+            cores = []
+
             # we simply recommend half of the courses be the core courses
             # half of the courses be the major courses
-            core_recommend_limit = int((4 - len(recommend_courses)) / 2)
-            core_recommend_count = 0
+            core_recommend_limit = int((4 - len(template)) / 2)
 
             # special care for the case that we didn't take the Math and AT
             if 'MATH' in self.untaken_core_courses and 'AT' in self.untaken_core_courses:
-                if core_recommend_limit == 1 and len(recommend_courses) + core_recommend_limit <= 4:
+                if core_recommend_limit == 1 and len(template) + core_recommend_limit <= 4:
                     core_recommend_limit = 2
 
             # recommend the core courses
             if len(self.untaken_core_courses) > 0:
                 # top core pirority: Math: Calculus and AT: ICP
-                if 'MATH' in self.untaken_core_courses and core_recommend_count < core_recommend_limit:
-                    if ny:
-                        # find in ny courses
-                        for course in self.cs_major_courses[1]:
-                            if 'UA' in course:
-                                recommend_courses.append(f'{course} | Math core')
-                                break
-                    else:
-                        # find in sh courses
-                        for course in self.cs_major_courses[1]:
-                            if 'SHU' in course:
-                                recommend_courses.append(f'{course} | Math core')
-                                break
-                    
+                if 'MATH' in self.untaken_core_courses and len(cores) < core_recommend_limit:
                     # update the untakne core courses
                     self.untaken_core_courses.remove('MATH')
-
-                    core_recommend_count += 1
+                    cores.append('MATH')
 
                     # update the untakne major courses
                     self.untaken_major_courses.remove(1)
+                    self.completed_majors |= self.major_prereqs.mask([1])
 
-                if 'AT' in self.untaken_core_courses and core_recommend_count < core_recommend_limit:
-                    if ny:
-                        # find in ny courses
-                        for course in self.cs_major_courses[1]:
-                            if 'UA' in course:
-                                recommend_courses.append(f'{course} | AT core')
-                                break
-                    else:
-                        # find in sh courses
-                        for course in self.cs_major_courses[1]:
-                            if 'SHU' in course:
-                                recommend_courses.append(f'{course} | AT core')
-                                break
-                    
+                if 'AT' in self.untaken_core_courses and len(cores) < core_recommend_limit:
                     # update the untakne core courses
                     self.untaken_core_courses.remove('AT')
-
-                    core_recommend_count += 1
+                    cores.append('AT')
 
                     # update the untakne major courses
                     self.untaken_major_courses.remove(0)
+                    self.completed_majors |= self.major_prereqs.mask([0])
 
                 # recomend one more core courses
-                if core_recommend_count < core_recommend_limit:
+                if len(cores) < core_recommend_limit and len(self.untaken_core_courses) > 0:
                     # extract the core type and update the self.untaken_core_courses
-                    core_type = self.untaken_core_courses.pop(0)
-
-                    # randomly choose the course to add diversity
-                    # no worries of the repeat courses, we recommend the untaken core
-                    if ny:
-                        # find in ny courses
-                        course = random.choice(ny_core_courses[core_type])
-                    else:
-                        # find in sh courses
-                        course = random.choice(sh_core_courses[core_type])
-
-                    recommend_courses.append(f'{course[0]} {course[1]} | {core_type} core')
+                    cores.append(self.untaken_core_courses.pop(0))
 
             # recommend the major courses
             # we do this by a greedy way by giving the major course the proper indices
-            if len(self.untaken_major_courses) > 0 and len(recommend_courses) < 4:
-                current_semester_majors = []
+            majors = []
+            if len(self.untaken_major_courses) > 0 and len(template) + len(cores) < 4:
                 # we simply recommend half of the courses be the major courses
-                major_recommend_num = min(4 - len(recommend_courses), len(self.untaken_major_courses))
+                major_recommend_num = min(4 - len(template) - len(cores), len(self.untaken_major_courses))
 
                 for i in range(major_recommend_num):
                     # extract the major idx and update the self.untaken_major_courses
                     major_type_idx = self.untaken_major_courses[0]
 
-                    # check the major requirement
-                    valid = True
-                    for i in self.major_course_pre_reqs[major_type_idx]:
-                        if i in self.untaken_major_courses or i in current_semester_majors:
-                            valid = False
-
-                    if not valid:
+                    # check the major requirement, majors of this semester do not count yet
+                    if not self.major_prereqs.is_unlocked(major_type_idx, self.completed_majors):
                         break
 
                     # update the untakne major courses only when this type is valid
                     self.untaken_major_courses.pop(0)
-                    current_semester_majors.append(major_type_idx)
-
-                    # randomly choose the course to add diversity
-                    if ny:
-                        # find in NY courses
-                        for courses in self.cs_major_courses[major_type_idx]:
-                            if 'UA' in courses:
-                                recommend_courses.append(courses)
-                                break
-                    else:
-                        # find in SH courses
-                        for courses in self.cs_major_courses[major_type_idx]:
-                            if 'SHU' in courses:
-                                recommend_courses.append(courses)
-                                break
+                    majors.append(major_type_idx)
+
+            self.completed_majors |= self.major_prereqs.mask(majors)
+            schedule.append(SemesterSchedule(rest_semester, ny, template, cores, majors))
+
+        return schedule
+
+    def _major_course(self, major_type_idx, ny):
+        """Get the major course of a group offered at the location.
+
+        Returns:
+            tuple: The course number and the 'num name' string.
+        """
+        for course_num, course in zip(self.catalog.major_groups[major_type_idx], self.cs_major_courses[major_type_idx]):
+            if (ny and 'UA' in course) or (not ny and 'SHU' in course):
+                return course_num, course
+        return None, None
+
+    def _fill(self, schedule, rng):
+        """Pick the actual courses of a schedule.
+
+        Args:
+            schedule (list): The `SemesterSchedule`s from `_schedule`.
+            rng (random.Random): The random source of the core and NY elective picks.
+
+        Returns:
+            tuple: The recommended courses of each semester and the taken electives after them.
+        """
+        taken_electives = list(self.taken_electives)
+        ny_electives = self.ny_elective_pool.copy()
+        completed = self.completed
+
+        recommend = {}
+        for semester in schedule:
+            ny = semester.ny
+            # recommend append type: f'{course num} {course name}'
+            recommend_courses = list(semester.template)
+
+            # course numbers of this semester, they are completed after the semester
+            semester_course_nums = []
+
+            # recommend the core courses
+            for core_type in semester.cores:
+                if core_type == 'MATH' or core_type == 'AT':
+                    # Math: Calculus is major course 1, AT: ICP is major course 0
+                    course_num, course = self._major_course(1 if core_type == 'MATH' else 0, ny)
+                    if course is not None:
+                        recommend_courses.append(f'{course} | {CORE_LABELS[core_type]} core')
+                        semester_course_nums.append(course_num)
+                    continue
+
+                # randomly choose the course to add diversity
+                # no worries of the repeat courses, we recommend the untaken core
+                course = rng.choice(self._core_courses(core_type, ny))
+
+                recommend_courses.append(f'{course[0]} {course[1]} | {core_type} core')
+                semester_course_nums.append(course[0])
+
+            # recommend the major courses
+            for major_type_idx in semester.majors:
+                course_num, course = self._major_course(major_type_idx, ny)
+                if course is not None:
+                    recommend_courses.append(course)
+                    semester_course_nums.append(course_num)
 
             # recommend the electives
-            if len(recommend_courses) < 4 and len(self.taken_electives) < 5:
-                for i in range(4 - len(recommend_courses)):
-                    # randomly choose the course to add diversity
-                    if ny:
-                        # find in NY courses, we can't get the prerequite courses
-                        # so we randomly choose the course
-                        find = False
-                        while not find:
-                            course = random.choice(ny_elective_courses)
-                            # check if the course is already taken
-                            if course[0] in self.taken_electives:
-                                find = False
-                            else:
-                                find = True
-
-                            recommend_courses.append(f'{course[0]} {course[1]}')
-                            # update the taken electives
-                            self.taken_electives.append(course[0])
-                    else:
-                        # find in SH courses
-                        for course in sh_elective_courses:
-                            if course[0] not in self.taken_electives and self.validate_elective(course):
-                                recommend_courses.append(f'{course[0]} {course[1]}')
-                                # update the taken electives
-                                self.taken_electives.append(course[0])
-                                break
-            elif len(recommend_courses) < 4:
-                if not self.tense:
-                    elective_num = 1
-                else:
-                    # if the tense is True, all left courses are filled with elective courses
-                    elective_num = 4 - len(recommend_courses)
-
-                for i in range(elective_num):
-                    # only recommend one elective per semester
-                    if ny:
-                        # find in NY courses, we can't get the prerequite courses
-                        # so we randomly choose the course
-                        find = False
-                        while not find:
-                            course = random.choice(ny_elective_courses)
-                            # check if the course is already taken
-                            if course[0] in self.taken_electives:
-                                find = False
-                            else:
-                                find = True
-
-                            # update the taken electives
-                            self.taken_electives.append(course[0])
-                    else:
-                        # find in SH courses
-                        for course in sh_elective_courses:
-                            if course[0] not in self.taken_electives and self.validate_elective(course):
-                                recommend_courses.append(f'{course[0]} {course[1]}')
-                                # update the taken electives
-                                self.taken_electives.append(course[0])
-                                break
-            
+            if len(recommend_courses) < 4 and len(taken_electives) < 5:
+                elective_num = 4 - len(recommend_courses)
+            elif len(recommend_courses) < 4 and not self.tense:
+                # only recommend one elective per semester
+                elective_num = 1
+            else:
+                # if the tense is True, all left courses are filled with elective courses
+                elective_num = 4 - len(recommend_courses)
+
+            for course in self._pick_electives(ny, elective_num, taken_electives, ny_electives, completed, rng):
+                recommend_courses.append(f'{course[0]} {course[1]}')
+                semester_course_nums.append(course[0])
+                # update the taken electives
+                taken_electives.append(course[0])
+
             # if there are still left spaces for recommendation
             # fill with 'Your Choice'
             if len(recommend_courses) < 4:
                 for i in range(4 - len(recommend_courses)):
                     recommend_courses.append('Your Choice')
 
-            recommend[rest_semester] = recommend_courses
+            recommend[semester.name] = recommend_courses
+            completed |= self.elective_prereqs.mask(semester_course_nums)
 
-            # update the course_history
-            self.course_history[rest_semester] = recommend_courses
+        return recommend, taken_electives
 
+    def _can_graduate(self, taken_electives):
         # after recommendation, if there are still left untaken core/major courses, the taken electives are not 4
         # this is not the regular cases and we recommend the user to arange by themselves
-        if len(self.untaken_core_courses) > 0 or len(self.untaken_major_courses) > 0 or len(self.taken_electives) < 4:
-            return False, recommend
-        else:
-            return True, recommend
\ No newline at end of file
+        return not (len(self.untaken_core_courses) > 0 or len(self.untaken_major_courses) > 0 or len(taken_electives) < 4)
+
+    def recommend(self):
+        """Recommend the courses for the students.
+
+        Returns:
+            tuple: Whether the student can graduate and the recommended courses of
+                each rest semester, None if there is no semester left.
+        """
+        self._prepare()
+
+        if len(self.course_history.keys()) == 8:
+            return None
+
+        recommend, self.taken_electives = self._fill(self._schedule(), self.random)
+
+        # update the course_history
+        for semester, recommend_courses in recommend.items():
+            self.course_history[semester] = recommend_courses
+
+        return self._can_graduate(self.taken_electives), recommend
+
+    def recommend_plans(self, plan_num):
+        """Recommend several distinct plans.
+
+        The preparation and the core/major schedule are computed once, only the
+        random picks differ between the plans. With a seeded recommendor the
+        plans are reproducible.
+
+        Args:
+            plan_num (int): The number of plans wanted.
+
+        Returns:
+            list: Up to `plan_num` distinct (can graduate, recommended courses) tuples,
+                fewer when the catalog does not allow that many.
+        """
+        self._prepare()
+
+        if len(self.course_history.keys()) == 8:
+            return []
+
+        schedule = self._schedule()
+        plans = []
+        seen = set()
+        for i in range(plan_num * PLAN_ATTEMPTS):
+            recommend, taken_electives = self._fill(schedule, self.random)
+            key = tuple((semester, tuple(courses)) for semester, courses in recommend.items())
+            if key in seen:
+                continue
+            seen.add(key)
+            plans.append((self._can_graduate(taken_electives), recommend))
+            if len(plans) == plan_num:
+                break
+
+        return plans
+
+    def _core_courses(self, core_type, ny):
+        core_courses = self.catalog.ny_core_courses if ny else self.catalog.sh_core_courses
+        return core_courses.get(CORE_LABELS.get(core_type, core_type), ())
+
+    def _pick_core(self, core_type, ny, picked_cores, rng):
+        """Randomly pick a core course of a type, not one picked before for the same plan.
+
+        Args:
+            core_type (str): The core type.
+            ny (bool): Whether the course is taken in NY.
+            picked_cores (set): The core courses picked so far, updated.
+            rng (random.Random): The random source.
+
+        Returns:
+            CoreCourse: The core course.
+        """
+        core_courses = self._core_courses(core_type, ny)
+        course = rng.choice([course for course in core_courses if course.id not in picked_cores] or core_courses)
+        picked_cores.add(course.id)
+        return course
+
+    def _offered_course(self, item, ny):
+        """Get the course graph bitset of the course taken for a planner item, None if not offered."""
+        if item.major is not None:
+            course_num, course = self._major_course(item.major, ny)
+            return None if course is None else self.elective_prereqs.mask([course_num])
+        return 0 if len(self._core_courses(item.core, ny)) > 0 else None
+
+    def _sh_elective_capacity(self, completed):
+        """Count the SH electives not taken yet that can be taken once `completed` are done."""
+        taken_electives = set(self.taken_electives)
+        return sum(
+            course_num not in taken_electives
+            for course_num in self.elective_prereqs.unlocked(completed, self.catalog.sh_electives_by_id)
+        )
+
+    def recommend_search(self, time_budget=PLANNER_TIME_BUDGET):
+        """Recommend the courses with the search planner.
+
+        Unlike `recommend`, which schedules the major courses greedily and stops
+        at the first one still locked, every way to spread the core and major
+        courses over the rest semesters is searched for the plan leaving the
+        fewest requirements unmet.
+
+        Args:
+            time_budget (float): The time limit of the search, in seconds; the best
+                plan found so far is returned when it runs out.
+
+        Returns:
+            tuple: Whether the student can graduate and the recommended courses of
+                each rest semester, None if there is no semester left.
+        """
+        self._prepare()
+
+        if len(self.course_history.keys()) == 8:
+            return None
+
+        semesters = [
+            PlanSemester(semester, semester in ('junior_1st', 'junior_2nd'), tuple(self.recommend_template.get(semester, [])))
+            for semester in self.semesters[len(self.course_history.keys()):]
+        ]
+        result = SearchPlanner(
+            semesters, self.untaken_core_courses, self.untaken_major_courses,
+            4 - len(self.taken_electives), self.major_prereqs, self.completed_majors, self.completed,
+            self._offered_course, len(self.ny_elective_pool), self._sh_elective_capacity, time_budget,
+        ).plan()
+
+        taken_electives = list(self.taken_electives)
+        ny_electives = self.ny_elective_pool.copy()
+        picked_cores = set()
+        completed = self.completed
+        recommend = {}
+        for semester, (items, elective_num) in zip(semesters, result.semesters):
+            recommend_courses = list(semester.template)
+            semester_course_nums = []
+
+            for item in items:
+                if item.major is not None:
+                    course_num, course = self._major_course(item.major, semester.ny)
+                    if item.core is not None:
+                        course = f'{course} | {CORE_LABELS[item.core]} core'
+                    self.untaken_major_courses.remove(item.major)
+                else:
+                    course_num, name, _ = self._pick_core(item.core, semester.ny, picked_cores, self.random)
+                    course = f'{course_num} {name} | {item.core} core'
+                if item.core is not None:
+                    self.untaken_core_courses.remove(item.core)
+                recommend_courses.append(course)
+                semester_course_nums.append(course_num)
+
+            # the electives wanted, every free slot in the tense mode
+            if self.tense:
+                elective_num = SEMESTER_COURSE_CAP - len(recommend_courses)
+            electives = self._pick_electives(semester.ny, elective_num, taken_electives, ny_electives, completed, self.random)
+            for course in electives:
+                recommend_courses.append(f'{course[0]} {course[1]}')
+                semester_course_nums.append(course[0])
+                taken_electives.append(course[0])
+
+            # fill with 'Your Choice'
+            recommend_courses += ['Your Choice'] * (SEMESTER_COURSE_CAP - len(recommend_courses))
+
+            recommend[semester.name] = recommend_courses
+            self.course_history[semester.name] = recommend_courses
+            completed |= self.elective_prereqs.mask(semester_course_nums)
+
+        self.taken_electives = taken_electives
+        return self._can_graduate(taken_electives), recommend
@@ -0,0 +1,129 @@
+from collections import Counter
+
+from courses.course_id import canonical_course_id
+
+
+# the core types counted from the history, 'MATH' is any math course
+TRACKED_CORES = ('ED', 'STS', 'AT', 'IPC', 'HPC', 'SSPC')
+
+
+class RequirementState():
+    """What a course history counts towards, kept up to date course by course.
+
+    Holds the same information `RecommendorPreparer.general_prepare` and
+    `Recommendor._init_recommend` derive from a whole history, as counters, so
+    removing a course is as cheap as adding one. `update` applies the
+    difference between the history the state was built from and a new one.
+    """
+    def __init__(self, catalog):
+        """Initialize the RequirementState class with an empty history.
+
+        Args:
+            catalog (CourseCatalog): The course catalog, only its version is kept.
+        """
+        self.catalog_version = catalog.version
+        # semester -> canonical course numbers, the history the counters reflect
+        self.history = {}
+        # semester -> course numbers as given
+        self._raw = {}
+        self.math_courses = 0
+        self.cores = Counter()
+        self.majors = Counter()
+        self.electives = Counter()
+        self.courses = Counter()
+        # bitset of the courses in the SH elective prerequisite graph
+        self.completed = 0
+
+    @classmethod
+    def from_history(cls, catalog, course_history):
+        """Build the state of a whole history.
+
+        Args:
+            catalog (CourseCatalog): The course catalog.
+            course_history (dict): The course history of the student.
+
+        Returns:
+            RequirementState: The state.
+        """
+        state = cls(catalog)
+        state.update(catalog, course_history)
+        return state
+
+    def _count(self, catalog, course_num, delta):
+        """Add (delta 1) or remove (delta -1) one canonical course number."""
+        # any math course fulfills the math core
+        if 'math' in course_num.lower():
+            self.math_courses += delta
+
+        core_found = elective_found = False
+        for requirement in catalog.classify(course_num):
+            # the first core entry wins, Language and the NY Math core are not tracked
+            if (requirement.kind == 'ny_core' or requirement.kind == 'sh_core') and not core_found:
+                core_found = True
+                if requirement.category in TRACKED_CORES:
+                    self.cores[requirement.category] += delta
+            elif requirement.kind == 'major':
+                self.majors[requirement.category] += delta
+            elif (requirement.kind == 'ny_elective' or requirement.kind == 'sh_elective') and not elective_found:
+                elective_found = True
+                self.electives[course_num] += delta
+
+        self.courses[course_num] += delta
+        count = self.courses[course_num]
+        if count == 1 and delta == 1:
+            self.completed |= catalog.elective_prereqs.mask([course_num])
+        elif count == 0:
+            self.completed &= ~catalog.elective_prereqs.mask([course_num])
+            del self.courses[course_num]
+
+    def update(self, catalog, course_history):
+        """Apply only the courses added to or removed from the history.
+
+        Args:
+            catalog (CourseCatalog): The course catalog, of the same version as the state.
+            course_history (dict): The new course history of the student.
+
+        Returns:
+            list: The semesters that changed, in the order of `course_history`
+                then the removed semesters.
+        """
+        new_raw, new_history = {}, {}
+        for semester, courses in course_history.items():
+            raw = new_raw[semester] = tuple(course[0] for course in courses)
+            # only the semesters whose course numbers changed are canonicalized again
+            if self._raw.get(semester) == raw:
+                new_history[semester] = self.history[semester]
+            else:
+                new_history[semester] = tuple(canonical_course_id(course_num) for course_num in raw)
+        changed = []
+        for semester in list(new_history) + [semester for semester in self.history if semester not in new_history]:
+            old, new = self.history.get(semester, ()), new_history.get(semester, ())
+            if old == new:
+                continue
+            changed.append(semester)
+            old_counts, new_counts = Counter(old), Counter(new)
+            for course_num, count in (old_counts - new_counts).items():
+                for i in range(count):
+                    self._count(catalog, course_num, -1)
+            for course_num, count in (new_counts - old_counts).items():
+                for i in range(count):
+                    self._count(catalog, course_num, 1)
+        self.history, self._raw = new_history, new_raw
+        return changed
+
+    def untaken_core_courses(self):
+        """Get the core types left, as `RecommendorPreparer.filter_core_courses`."""
+        untaken_core_courses = [core for core in ('ED', 'STS', 'AT') if self.cores[core] == 0]
+        if self.math_courses == 0:
+            untaken_core_courses.append('MATH')
+        if self.cores['IPC'] + self.cores['HPC'] + self.cores['SSPC'] < 2:
+            untaken_core_courses.append('HPC')
+        return untaken_core_courses
+
+    def untaken_major_courses(self, major_course_list):
+        """Get the major course groups left, as `Recommendor._init_recommend`."""
+        return [major for major in major_course_list if self.majors[major] == 0]
+
+    def taken_electives(self):
+        """Get the taken electives, as `RecommendorPreparer.filter_elective_courses` up to the order."""
+        return list(self.electives.elements())
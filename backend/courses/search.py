@@ -0,0 +1,311 @@
+import heapq
+import math
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from operator import itemgetter
+from typing import NamedTuple
+
+from .catalog_version import get_catalog_version
+from .models import Course
+
+
+_WORD_RE = re.compile(r'[^\W_]+')
+
+# the fields of a course searched, by weight of a match
+ID, NAME, DESCRIPTION = range(3)
+FIELD_WEIGHTS = (4.0, 2.0, 1.0)
+
+# words found in too many descriptions to tell courses apart
+STOP_WORDS = frozenset('a an and as at by for from in into is of on or the to with'.split())
+
+# the least trigram similarity of a misspelled word to a catalog word, and its weight
+MIN_SIMILARITY = 0.45
+# the weight of a catalog word the query word is a prefix of
+PREFIX_WEIGHT = 0.8
+# the catalog words a query word is expanded to at most, by prefix and by similarity
+MAX_EXPANSIONS = 8
+# a word of more courses than this only adds to the score of the courses the rarer words found
+COMMON_WORD_COURSES = 1000
+# the score of a query that is a course id, or the start of one
+EXACT_ID_SCORE = 100.0
+ID_PREFIX_SCORE = 50.0
+
+
+class SearchHit(NamedTuple):
+    """A course found: (id, name, credit, score)."""
+    id: str
+    name: str
+    credit: int
+    score: float
+
+
+def words(text):
+    """Split a text into lower case words, punctuation dropped."""
+    return _WORD_RE.findall(text.lower())
+
+
+def trigrams(word):
+    """Get the trigrams of a word, padded as pg_trgm does so that its start counts more."""
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CourseSearchIndex():
+    """In-memory index of the course ids, names and descriptions.
+
+    Every word of the catalog has the sets of the courses it is in, by
+    field. A query word matches the catalog words
+    equal to it, starting with it, or, when it is not found, the words with
+    the most trigrams in common, which makes the search typo tolerant
+    without a scan of the courses. Built once per catalog version by
+    `get_search_index`, nothing here may be mutated by callers.
+    """
+    def __init__(self, version, courses):
+        """Index the courses.
+
+        Args:
+            version (int): The catalog version the courses were read at.
+            courses (iterable): (id, name, description, credit) of every course.
+        """
+        self.version = version
+        self.courses = []
+        self.word_ids = {}
+        postings = []
+        # the compact form of every course id: 'CSCI-SHU 210' -> 'cscishu210'
+        self.codes = {}
+        for doc, (course_id, name, description, credit) in enumerate(courses):
+            self.courses.append((course_id, name, credit))
+            self.codes.setdefault(''.join(words(course_id)), []).append(doc)
+            for field, text in ((ID, course_id), (NAME, name), (DESCRIPTION, description)):
+                for word in words(text or ''):
+                    if field == DESCRIPTION and word in STOP_WORDS:
+                        continue
+                    word_id = self.word_ids.get(word)
+                    if word_id is None:
+                        word_id = self.word_ids[word] = len(postings)
+                        postings.append((set(), set(), set()))
+                    postings[word_id][field].add(doc)
+        # the courses of every word by field, sets so that the courses of a query are combined in C
+        self.postings = [tuple(frozenset(docs) for docs in fields) for fields in postings]
+        self.sizes = [len(set().union(*fields)) for fields in self.postings]
+        self.words = list(self.word_ids)
+        self.idf = [1 + math.log(len(self.courses) / size) for size in self.sizes]
+        self.sorted_words = sorted(self.words)
+        self.sorted_codes = sorted(self.codes)
+
+        # the words by trigram, numbers are only matched exactly or by prefix
+        by_trigram = {}
+        self.trigram_counts = array('b', bytes(len(self.words)))
+        for word_id, word in enumerate(self.words):
+            if len(word) < 3 or word.isdigit():
+                continue
+            grams = trigrams(word)
+            self.trigram_counts[word_id] = min(len(grams), 127)
+            for gram in grams:
+                by_trigram.setdefault(gram, array('l')).append(word_id)
+        self.by_trigram = by_trigram
+
+    def expand(self, word):
+        """Get the catalog words a query word matches.
+
+        Args:
+            word (str): The query word, in lower case.
+
+        Returns:
+            list: (word id, weight) pairs, at most `MAX_EXPANSIONS` + 1.
+        """
+        expansions = []
+        word_id = self.word_ids.get(word)
+        if word_id is not None:
+            expansions.append((word_id, 1.0))
+        # the shortest words starting with it
+        start = bisect_left(self.sorted_words, word)
+        longer = []
+        for other in self.sorted_words[start:start + 4 * MAX_EXPANSIONS]:
+            if not other.startswith(word):
+                break
+            if other != word:
+                longer.append(other)
+        longer.sort(key=len)
+        expansions += [(self.word_ids[other], PREFIX_WEIGHT) for other in longer[:MAX_EXPANSIONS]]
+        if expansions or len(word) < 3 or word.isdigit():
+            return expansions
+
+        # a misspelled word: the words with the highest trigram similarity
+        grams = trigrams(word)
+        shared = {}
+        for gram in grams:
+            for other_id in self.by_trigram.get(gram, ()):
+                shared[other_id] = shared.get(other_id, 0) + 1
+        counts = self.trigram_counts
+        similar = heapq.nlargest(MAX_EXPANSIONS, (
+            (2 * count / (len(grams) + counts[other_id]), other_id) for other_id, count in shared.items()
+        ))
+        return [(other_id, similarity) for similarity, other_id in similar if similarity >= MIN_SIMILARITY]
+
+    def search(self, query, offset=0, limit=20):
+        """Find the courses matching a query, best first.
+
+        The score of a course is, for every query word, the best weight of
+        the catalog words it matches times their rarity and the weight of the
+        field they are in. A query that is a course id, in any case and
+        punctuation, gives that course first, and the start of course ids the
+        courses it starts.
+
+        Args:
+            query (str): The query.
+            offset (int): The number of results skipped.
+            limit (int): The number of results returned at most.
+
+        Returns:
+            tuple: The number of courses found and the `SearchHit`s from `offset`.
+        """
+        query_words = words(query)
+        meaningful = [word for word in query_words if word not in STOP_WORDS]
+        expansions = [self.expand(word) for word in dict.fromkeys(meaningful or query_words)]
+        # the rarest words first, the common ones then score the courses already found
+        expansions.sort(key=lambda matches: sum(self.sizes[word_id] for word_id, weight in matches))
+
+        # a query that is a course id, or its start: 'csci-shu 2' for the CSCI-SHU 2xx courses
+        code = ''.join(query_words)
+        id_scores = []
+        if len(code) >= 3:
+            start = bisect_left(self.sorted_codes, code)
+            for other in self.sorted_codes[start:start + COMMON_WORD_COURSES]:
+                if not other.startswith(code):
+                    break
+                id_scores += [(doc, EXACT_ID_SCORE if other == code else ID_PREFIX_SCORE) for doc in self.codes[other]]
+
+        if len(expansions) <= 1:
+            # one word: its scores are already grouped and ordered
+            scored = self._word_scores(expansions[0]) if expansions else []
+            if id_scores:
+                scored = self._add_id_scores(scored, id_scores)
+            return self._page(scored, offset, limit)
+
+        scores, found = {}, set()
+        for matches in expansions:
+            common = scores and sum(self.sizes[word_id] for word_id, weight in matches) > COMMON_WORD_COURSES
+            for score, docs in self._word_scores(matches, found if common else None):
+                if scores:
+                    again = docs & found
+                    for doc in again:
+                        scores[doc] += score
+                    docs = docs - again
+                scores.update(dict.fromkeys(docs, score))
+                found |= docs
+        for doc, score in id_scores:
+            scores[doc] = scores.get(doc, 0.0) + score
+
+        # the scores of the page and above, ties are broken by course id, the order of the courses
+        if not scores:
+            return 0, []
+        size = offset + limit
+        lowest = heapq.nlargest(size, scores.values())[-1]
+        top = sorted((-score, doc) for doc, score in scores.items() if score > lowest)
+        top += [(-lowest, doc) for doc in heapq.nsmallest(size - len(top), (
+            doc for doc, score in scores.items() if score == lowest
+        ))]
+        return len(scores), [SearchHit(*self.courses[doc], round(-score, 3)) for score, doc in top[offset:]]
+
+    @staticmethod
+    def _add_id_scores(scored, id_scores):
+        """Add the scores of a course id query to the courses of one word, see `_word_scores`."""
+        bonus = dict(id_scores)
+        ids = bonus.keys()
+        for score, docs in scored:
+            for doc in docs & ids:
+                bonus[doc] += score
+        levels = {}
+        for doc, score in bonus.items():
+            levels.setdefault(score, set()).add(doc)
+        for score, docs in scored:
+            levels.setdefault(score, set()).update(docs - ids)
+        return [(score, levels[score]) for score in sorted(levels, reverse=True) if levels[score]]
+
+    def _page(self, scored, offset, limit):
+        """Get a page of courses grouped by score, see `_word_scores`."""
+        hits = []
+        for score, docs in scored:
+            if len(hits) == limit:
+                break
+            if offset >= len(docs):
+                offset -= len(docs)
+                continue
+            hits += [SearchHit(*self.courses[doc], round(score, 3)) for doc in sorted(docs)[offset:offset + limit - len(hits)]]
+            offset = 0
+        return sum(len(docs) for score, docs in scored), hits
+
+    def _word_scores(self, matches, within=None):
+        """Score the courses of one query word: the best weight of the catalog words it matches.
+
+        Args:
+            matches (list): The (word id, weight) pairs of the word, see `expand`.
+            within (set): Only score these courses, all of them by default.
+
+        Returns:
+            list: (score, courses) pairs, best first, every course in the pair of its best score.
+        """
+        levels = sorted((
+            (weight * self.idf[word_id] * FIELD_WEIGHTS[field], docs)
+            for word_id, weight in matches
+            for field, docs in enumerate(self.postings[word_id]) if docs
+        ), key=itemgetter(0), reverse=True)
+        seen = set()
+        scored = []
+        for score, docs in levels:
+            docs = (docs if within is None else docs & within) - seen
+            if not docs:
+                continue
+            seen |= docs
+            if scored and scored[-1][0] == score:
+                scored[-1] = (score, scored[-1][1] | docs)
+            else:
+                scored.append((score, docs))
+        return scored
+
+
+def build_search_index(version):
+    """Read the courses and index them, in 1 query.
+
+    Args:
+        version (int): The catalog version the courses are read at.
+
+    Returns:
+        CourseSearchIndex: The index.
+    """
+    return CourseSearchIndex(version, Course.objects.order_by('id').values_list('id', 'name', 'description', 'credit'))
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index():
+    """Get the search index of this process, built again when the catalog version changes.
+
+    While a thread builds the index of a new version the other threads keep
+    searching the previous one rather than waiting.
+
+    Returns:
+        CourseSearchIndex: The shared index.
+    """
+    global _index
+    version = get_catalog_version()
+    index = _index
+    if index is not None and index.version == version:
+        return index
+    if index is None:
+        with _index_lock:
+            if _index is None or _index.version != version:
+                _index = build_search_index(version)
+            return _index
+    if _index_lock.acquire(blocking=False):
+        try:
+            if _index.version != version:
+                _index = build_search_index(version)
+        finally:
+            _index_lock.release()
+    return _index
@@ -0,0 +1,249 @@
+import fnmatch
+import json
+import multiprocessing
+import os
+import tarfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import NamedTuple
+
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from .course_id import canonical_course_id
+from .models import Course, Major, Student, StudentTakenCourse, parse_credit
+from .parse_course_history import parse_course_history
+from .progress import refresh_progress
+
+
+# the chunks of files submitted to the pool per worker, one parsed while the next waits
+CHUNKS_PER_WORKER = 2
+
+
+class ParsedFile(NamedTuple):
+    """The result of parsing one transcript file, `error` is None when it was parsed."""
+    name: str
+    username: str
+    course_dict: dict
+    error: object
+
+
+def username_of(name):
+    """Get the username of the student of a transcript file: its name without folders and extension."""
+    return os.path.splitext(os.path.basename(name))[0]
+
+
+def iter_transcripts(path, pattern='*', skip=()):
+    """Read the transcript files of a folder, searched recursively, or of a tarball.
+
+    Args:
+        path (str): The folder or the tarball.
+        pattern (str): Only the files whose name matches this glob pattern are read.
+        skip (container): The names of the files not to read, eg. already imported.
+
+    Yields:
+        tuple: The name of every file relative to `path` and its content as bytes,
+            in a stable order.
+    """
+    if os.path.isdir(path):
+        for folder, folders, files in os.walk(path):
+            folders.sort()
+            for file in sorted(files):
+                name = os.path.relpath(os.path.join(folder, file), path)
+                if file.startswith('.') or not fnmatch.fnmatch(file, pattern) or name in skip:
+                    continue
+                with open(os.path.join(folder, file), 'rb') as f:
+                    yield name, f.read()
+        return
+
+    with tarfile.open(path) as tar:
+        for member in tar:
+            file = os.path.basename(member.name)
+            if not member.isfile() or file.startswith('.') or not fnmatch.fnmatch(file, pattern) or member.name in skip:
+                continue
+            yield member.name, tar.extractfile(member).read()
+
+
+def parse_transcript_file(item):
+    """Parse one transcript file, failures are reported in the result.
+
+    Args:
+        item (tuple): The name and the content of the file.
+
+    Returns:
+        ParsedFile: The parsed history or the error.
+    """
+    name, data = item
+    try:
+        course_dict = parse_course_history(data.decode('utf-8', errors='replace'))
+        if not course_dict:
+            raise ValueError("no course history found")
+        return ParsedFile(name, username_of(name), course_dict, None)
+    except Exception as exc:
+        return ParsedFile(name, username_of(name), None, f'{type(exc).__name__}: {exc}')
+
+
+def _pool_context():
+    """Fork the workers where possible so they start without importing Django again."""
+    try:
+        return multiprocessing.get_context('fork')
+    except ValueError:
+        return None
+
+
+def _parse_chunk(chunk):
+    """Parse a chunk of transcript files in a worker."""
+    return [parse_transcript_file(item) for item in chunk]
+
+
+def parse_transcript_files(items, workers=None, chunksize=16):
+    """Parse many transcript files in parallel.
+
+    The files are read from `items` as the workers need them: at most
+    `CHUNKS_PER_WORKER` chunks per worker are waiting or being parsed, so the
+    memory does not grow with the number of files.
+
+    Args:
+        items (iterable): The names and contents of the files, see `iter_transcripts`.
+        workers (int): The number of worker processes, one per core by default;
+            1 parses the files in this process.
+        chunksize (int): The number of files sent to a worker at once.
+
+    Yields:
+        ParsedFile: The result of every file, in the order of `items`.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from map(parse_transcript_file, items)
+        return
+
+    items = iter(items)
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as executor:
+        while True:
+            while len(pending) < workers * CHUNKS_PER_WORKER:
+                chunk = list(islice(items, chunksize))
+                if not chunk:
+                    break
+                pending.append(executor.submit(_parse_chunk, chunk))
+            if not pending:
+                return
+            yield from pending.popleft().result()
+
+
+def import_histories(parsed_files):
+    """Write the students of parsed transcripts, in one transaction.
+
+    The user of a student is found by username and created without a usable
+    password when missing. The history of an existing student is replaced,
+    its taken courses with it. Courses not in the catalog are created from
+    the histories, as `Student.sync_courses` does. Every kind of row is
+    written with one `bulk_create`, the requirement progress of the students
+    is then computed again.
+
+    Args:
+        parsed_files (list): The `ParsedFile`s, without errors, a username
+            given twice keeps the last history.
+    """
+    histories = {parsed.username: parsed.course_dict for parsed in parsed_files}
+    if not histories:
+        return
+
+    with transaction.atomic():
+        users = User.objects.in_bulk(histories, field_name='username')
+        password = make_password(None)
+        User.objects.bulk_create(
+            User(username=username, password=password) for username in histories if username not in users
+        )
+        if len(users) < len(histories):
+            users = User.objects.in_bulk(histories, field_name='username')
+
+        # the courses of every history, canonical id -> (name, credits), and the
+        # (canonical id, semester) pairs of every student, a course listed twice in a semester is taken once
+        taken, pairs = {}, {}
+        for username, course_dict in histories.items():
+            student_pairs = pairs[username] = {}
+            for semester, courses in course_dict.items():
+                for course_num, name, course_credits in courses:
+                    course_id = canonical_course_id(course_num)
+                    taken.setdefault(course_id, (name, course_credits))
+                    student_pairs[course_id, semester] = None
+        credits = dict(Course.objects.filter(id__in=taken).values_list('id', 'credit'))
+        new_courses = [
+            Course(id=course_id, name=name, credit=parse_credit(course_credits), description="Added from submitted histories")
+            for course_id, (name, course_credits) in taken.items() if course_id not in credits
+        ]
+        Course.objects.bulk_create(new_courses, ignore_conflicts=True)
+        credits.update((course.id, course.credit) for course in new_courses)
+
+        students = {student.user_id: student for student in Student.objects.filter(user__in=users.values())}
+        new_students, old_students = [], []
+        for username, course_dict in histories.items():
+            user = users[username]
+            student = students.get(user.id)
+            if student is None:
+                student = Student(user=user)
+                new_students.append(student)
+            else:
+                old_students.append(student)
+            student.course_dict = course_dict
+            student.level_id = len(course_dict)
+            student.credit = sum(credits[course_id] for course_id, semester in pairs[username])
+            students[user.id] = student
+        Student.objects.bulk_update(old_students, ['course_dict', 'level_id', 'credit'])
+        StudentTakenCourse.objects.filter(student__in=old_students).bulk_delete()
+        Student.objects.bulk_create(new_students)
+        if new_students and new_students[0].pk is None:
+            # the database does not return the keys of the created rows
+            created = dict(Student.objects.filter(
+                user__in=[student.user_id for student in new_students]).values_list('user_id', 'id'))
+            for student in new_students:
+                student.pk = created[student.user_id]
+
+        # new students are in the CS major, as when they post their history
+        cs = Major.objects.filter(name__iexact="cs").first()
+        if cs is not None:
+            Student.major.through.objects.bulk_create(
+                Student.major.through(student_id=student.pk, major_id=cs.pk) for student in new_students
+            )
+        # a course saved meanwhile by a sync of the same student is kept
+        StudentTakenCourse.objects.bulk_create((
+            StudentTakenCourse(student=students[users[username].id], course_id=course_id, semester=semester)
+            for username, student_pairs in pairs.items()
+            for course_id, semester in student_pairs
+        ), ignore_conflicts=True)
+        refresh_progress(student.pk for student in students.values())
+
+
+class ImportCheckpoint():
+    """The files already imported, saved to resume an import after a failure.
+
+    The file is replaced atomically, so it is never left half written.
+    """
+    def __init__(self, path):
+        """Initialize the ImportCheckpoint class, reading the saved checkpoint.
+
+        Args:
+            path (str): The checkpoint file, None to keep no checkpoint.
+        """
+        self.path = path
+        self.done = set()
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                self.done = set(json.load(f)['done'])
+
+    def add(self, names):
+        """Mark files as imported and save the checkpoint.
+
+        Args:
+            names (iterable): The names of the files.
+        """
+        self.done.update(names)
+        if self.path is None:
+            return
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w') as f:
+            json.dump({'done': sorted(self.done)}, f)
+        os.replace(temporary, self.path)
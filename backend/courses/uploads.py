@@ -0,0 +1,145 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Major, Student, UploadJob
+from .parse_cache import parse_page
+from .recommendor.cache import recommendation_cache
+
+
+def save_course_dict(user, course_dict, update_course):
+    """Save the course history of a user's student, created when missing.
+
+    The taken courses and the requirement progress follow the history.
+    Nothing is written or recomputed when the history did not change, or when
+    an existing history is not to be updated.
+
+    Args:
+        user (User): The user.
+        course_dict (dict): The parsed course history.
+        update_course (bool): Whether an existing history is replaced.
+
+    Returns:
+        tuple: The student and whether the stored history was left as it was.
+    """
+    student, created = Student.objects.get_or_create(user=user)
+    skipped = not created and (not update_course or student.course_dict == course_dict)
+    if skipped:
+        return student, skipped
+    with transaction.atomic():
+        student.course_dict = course_dict
+        student.sync_courses()
+        student.save()
+        if created:
+            cs = Major.objects.filter(name__iexact="cs").first()
+            if cs is not None:
+                student.major.add(cs)
+    recommendation_cache.invalidate_student(student.id)
+    return student, skipped
+
+
+def runnable_jobs():
+    """Get the upload jobs to run.
+
+    They are the pending jobs and the jobs running for more than
+    `settings.UPLOAD_JOB_TIMEOUT` seconds, whose process is taken as lost.
+
+    Returns:
+        QuerySet: The `UploadJob`s.
+    """
+    lost = timezone.now() - timedelta(seconds=settings.UPLOAD_JOB_TIMEOUT)
+    return UploadJob.objects.filter(
+        Q(status=UploadJob.Status.PENDING) | Q(status=UploadJob.Status.RUNNING, started__lt=lost)
+    )
+
+
+def run_upload_job(job_id):
+    """Parse and save an upload job, unless another worker took it.
+
+    Args:
+        job_id (int): The `UploadJob`.
+
+    Returns:
+        bool: Whether the job was run here.
+    """
+    claimed = runnable_jobs().filter(id=job_id).update(status=UploadJob.Status.RUNNING, started=timezone.now())
+    if not claimed:
+        return False
+    job = UploadJob.objects.select_related('user').get(id=job_id)
+    try:
+        course_dict = parse_page(job.page)
+        with transaction.atomic():
+            student, job.skipped = save_course_dict(job.user, course_dict, job.update_course)
+        job.status = UploadJob.Status.DONE
+    except Exception as exc:
+        job.status, job.error = UploadJob.Status.FAILED, f'{type(exc).__name__}: {exc}'
+    job.page, job.finished = '', timezone.now()
+    job.save(update_fields=['status', 'page', 'skipped', 'error', 'finished'])
+    return True
+
+
+def run_pending_jobs(limit=None):
+    """Run the pending upload jobs and the lost ones, oldest first.
+
+    Args:
+        limit (int): The most jobs to run, all of them by default.
+
+    Returns:
+        int: The number of jobs run.
+    """
+    job_ids = runnable_jobs().order_by('id').values_list('id', flat=True)
+    return sum(run_upload_job(job_id) for job_id in job_ids[:limit])
+
+
+class UploadJobQueue():
+    """Pool of background threads running the upload jobs of this process.
+
+    The jobs are rows of `UploadJob` run by the `run_upload_jobs` command, in
+    its own process so that parsing does not compete with the requests.
+    `settings.UPLOAD_JOB_WORKERS` above 0 also runs them in threads of the web
+    process; a job the process could not run (it was stopped) stays pending
+    for the command.
+    """
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def workers(self):
+        return getattr(settings, 'UPLOAD_JOB_WORKERS', 0)
+
+    def submit(self, job_id):
+        """Run a job in the background once the transaction that created it is committed.
+
+        Nothing is done when the web process runs no jobs, the job is pending
+        for the `run_upload_jobs` command.
+
+        Args:
+            job_id (int): The `UploadJob`.
+        """
+        if self.workers == 0:
+            return
+        transaction.on_commit(lambda: self._get_executor().submit(self._run, job_id))
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='upload-job')
+            return self._executor
+
+    @staticmethod
+    def _run(job_id):
+        # every thread has its own connection, it is closed when unusable or too old
+        close_old_connections()
+        try:
+            run_upload_job(job_id)
+        finally:
+            close_old_connections()
+
+
+upload_queue = UploadJobQueue()
@@ -5,8 +5,15 @@ from . import views
 
 urlpatterns = [
     path('api/taken-courses', views.ParseCourseDictAPIView.as_view(), name='taken-courses-api'),
+    path('api/upload-jobs/<int:id>', views.UploadJobAPIView.as_view(), name='upload-job'),
     path('api/core-courses', views.DisplayCoreAPIView.as_view(), name="core-courses-api"),
+    path('api/eligible-courses', views.EligibleCoursesAPIView.as_view(), name='eligible-courses'),
+    path('api/degree-audit', views.DegreeAuditAPIView.as_view(), name='degree-audit'),
+    # before the course ids, 'search' is not one
+    path('api/courses/search', views.CourseSearchAPIView.as_view(), name='course-search'),
     path('api/courses/<str:id>', views.CourseDetailAPIView.as_view(), name='course-detail'),
     path('api/majors/<str:name>', views.MajorDetailAPIView.as_view(), name='major-detail'),
     path('api/rec-courses', views.RecommendCourseAPIView.as_view(), name='rec-courses'),
+    path('api/rec-courses/cache-stats', views.RecommendationCacheStatsAPIView.as_view(), name='rec-courses-cache-stats'),
+    path('api/rec-courses/batch', views.BatchRecommendCourseAPIView.as_view(), name='rec-courses-batch'),
 ]
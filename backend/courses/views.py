@@ -1,16 +1,29 @@
-from .models import Student, StudentTakenCourse, Major, Course
+from .models import Student, Course, UploadJob, StudentRequirementProgress
 from .serializers import StudentSerializer, CourseSerializer, MajorSerializer, PrereqSerializer
 from rest_framework import permissions, status
 from rest_framework.views import APIView
-from rest_framework.exceptions import ValidationError
 
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
 
 from rest_framework.response import Response
-from .parse_course_history import parse_course_history
-from .recommendor.recommendor import Recommendor
+from .parse_cache import parse_page, parse_upload
+from .search import get_search_index
+from .snapshots import major_snapshot
+from .catalog_version import get_catalog_version
+from .uploads import save_course_dict, upload_queue
+from .recommendor.cache import PLANNERS, recommendation_cache
+from .recommendor.catalog import get_catalog
+from .recommendor.batch import BatchJob, recommend_batch, student_jobs, to_ndjson
 
 import json
+import re
+from functools import wraps
 
 class ParseCourseDictAPIView(APIView):
     """
@@ -21,7 +34,6 @@ class ParseCourseDictAPIView(APIView):
     """
     
     permission_classes = [permissions.IsAuthenticated]
-    cs = Major.objects.filter(name__iexact="cs").first()
 
     def get(self, request):
         """
@@ -43,30 +55,89 @@ class ParseCourseDictAPIView(APIView):
         """
         Parse and update the course dictionary for the authenticated student.
 
+        The course history is either `course_dict` (JSON, or the page HTML with
+        `parseCourse`) or the page uploaded as the `course_file` file. With
+        `async` the page is stored and parsed in the background, the response
+        is the upload job to follow with `UploadJobAPIView`.
+
         Args:
             request: The incoming HTTP request.
             *args: Additional positional arguments.
             **kwargs: Additional keyword arguments.
 
         Returns:
-            Response: Response containing the serialized student data.
+            Response: Response containing the serialized student data and
+                `skipped`, whether the stored history was left as it was.
         """
-        update_course = request.data.get("updateCourse")
+        update_course = parse_flag(request.data.get("updateCourse"))
         course_dict = request.data.get('course_dict', '')
-        parse_course = request.data.get('parseCourse', '')
-        if parse_course: course_dict = parse_course_history(course_dict)
+        parse_course = parse_flag(request.data.get('parseCourse', ''))
+        course_file = request.FILES.get('course_file')
+        if parse_flag(request.data.get('async', '')):
+            if course_file is not None: page = course_file.read().decode('utf-8', errors='replace')
+            elif parse_course: page = course_dict
+            else: return Response("'async' needs a page, 'course_file' or 'course_dict' with 'parseCourse'",
+                                  status=status.HTTP_400_BAD_REQUEST)
+            with transaction.atomic():
+                job = UploadJob.objects.create(user=request.user, page=page, update_course=update_course)
+                upload_queue.submit(job.id)
+            return Response(
+                {'job': job.id, 'status': job.status, 'status_url': reverse('upload-job', args=[job.id])},
+                status=status.HTTP_202_ACCEPTED,
+            )
+
+        # a page uploaded or parsed before is not parsed again
+        if course_file is not None: course_dict = parse_upload(course_file)
+        elif parse_course: course_dict = parse_page(course_dict)
         else: course_dict = json.loads(course_dict)        
-        student, created = Student.objects.get_or_create(user=request.user)
-        if created:
-            student.major.add(self.cs)
-            student.course_dict = course_dict
-            student.level_id = len(course_dict)
-        if update_course:
-            student.course_dict = course_dict
-            student.level_id = len(course_dict)
-        student.save()
+        student, skipped = save_course_dict(request.user, course_dict, update_course)
         student_serializr = StudentSerializer(student)
-        return Response({'student': student_serializr.data})
+        return Response({'student': student_serializr.data, 'skipped': skipped})
+
+
+class UploadJobAPIView(APIView):
+    """
+    API endpoint for the status of a course history parsed in the background.
+
+    Permission Classes:
+        - IsAuthenticated: Only authenticated users can access this view.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, id):
+        """
+        Retrieve an upload job of the authenticated user.
+
+        Args:
+            request: The incoming HTTP request.
+            id (int): The ID of the job.
+
+        Returns:
+            Response: Response containing the status of the job, 'pending',
+                'running', 'done' or 'failed', with the student data once done
+                or the error once failed.
+        """
+        job = UploadJob.objects.filter(id=id, user=request.user).first()
+        if job is None:
+            return Response({"error": "Upload job not found"}, status=status.HTTP_404_NOT_FOUND)
+        response_data = {
+            'job': job.id,
+            'status': job.status,
+            'created': job.created,
+            'started': job.started,
+            'finished': job.finished,
+        }
+        if job.status == UploadJob.Status.DONE:
+            response_data['skipped'] = job.skipped
+            response_data['student'] = StudentSerializer(request.user.student).data
+        elif job.status == UploadJob.Status.FAILED:
+            response_data['error'] = job.error
+        return Response(response_data)
+
+
+# the most plans RecommendCourseAPIView returns at once
+MAX_PLANS = 10
 
 
 class RecommendCourseAPIView(APIView):
@@ -83,17 +154,43 @@ class RecommendCourseAPIView(APIView):
         """
         Retrieve recommended courses based on the authenticated student's course dictionary.
 
+        Optional query parameters:
+            - plans: Return this many distinct plans (1 to MAX_PLANS) instead of one recommendation.
+            - seed: Seed of the random picks, the same seed gives the same plans.
+            - planner: 'greedy' (default) or 'search', the search planner finds a
+              plan in more cases but cannot return several plans.
+
         Returns:
             Response: Response containing the recommended courses.
         """
         try:
-            course_dict = request.user.student.course_dict
+            plans = parse_optional_int(request.query_params.get('plans'))
+            seed = parse_optional_int(request.query_params.get('seed'))
+        except ValueError:
+            return Response("'plans' and 'seed' must be integers", status=status.HTTP_400_BAD_REQUEST)
+        if plans is not None and not 1 <= plans <= MAX_PLANS:
+            return Response(f"'plans' must be between 1 and {MAX_PLANS}", status=status.HTTP_400_BAD_REQUEST)
+        planner = request.query_params.get('planner', 'greedy')
+        if planner not in PLANNERS:
+            return Response(f"'planner' must be one of {', '.join(PLANNERS)}", status=status.HTTP_400_BAD_REQUEST)
+        if plans is not None and planner != 'greedy':
+            return Response("'plans' is only supported by the greedy planner", status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            student = request.user.student
             identity = request.query_params.get('identity')
             intense = request.query_params.get('intense')
             if identity is not None and intense is not None:
-                recommendor = Recommendor(course_dict, identity, intense)
-                print(recommendor.recommend())
-                valid, recommend_courses = recommendor.recommend()
+                result = recommendation_cache.get_or_compute(
+                    student.id, student.course_dict, identity, parse_flag(intense),
+                    plans=plans, seed=seed, planner=planner,
+                )
+                if plans is not None:
+                    return Response({'plans': [
+                        {'valid': valid, 'recommend_courses': recommend_courses}
+                        for valid, recommend_courses in result
+                    ]})
+                valid, recommend_courses = result
                 return Response({'valid': valid, 'recommend_courses': recommend_courses})
             else:
                 return Response("Missing 'identity' or 'intense' parameter",
@@ -103,6 +200,167 @@ class RecommendCourseAPIView(APIView):
                              status=status.HTTP_404_NOT_FOUND)
 
 
+def parse_optional_int(value):
+    """Parse an optional integer query parameter, raising ValueError when it is not one."""
+    if value is None or value == '':
+        return None
+    return int(value)
+
+
+def catalog_etag(get_version, encoded=False):
+    """Decorate the get method of a catalog view with a strong ETag from the catalog version.
+
+    A request whose If-None-Match has the current ETag gets a 304 without
+    the view running, so without queries or serializers. `If-None-Match: *`
+    only matches a resource that exists, so the view runs to find it.
+
+    Args:
+        get_version (callable): Get the version of the data the view sends.
+        encoded (bool): Whether the view sends its JSON with `encoded_response`,
+            the gzip and identity bodies then have their own ETags.
+
+    Returns:
+        callable: The decorator.
+    """
+    def decorator(get):
+        @wraps(get)
+        def wrapper(self, request, *args, **kwargs):
+            # the browsable API and the gzip body are other representations of the same data
+            representation = request.accepted_renderer.format
+            if encoded and representation == 'json' and accepts_gzip(request):
+                representation += '-gzip'
+            etag = quote_etag(f'{get_version()}-{representation}')
+            if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+            if etag in if_none_match:
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = get(self, request, *args, **kwargs)
+                if '*' in if_none_match and response.status_code == status.HTTP_200_OK:
+                    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+                response['ETag'] = etag
+                patch_cache_control(response, public=True, max_age=settings.CATALOG_MAX_AGE, must_revalidate=True)
+            if encoded:
+                patch_vary_headers(response, ('Accept-Encoding',))
+            return response
+        return wrapper
+    return decorator
+
+
+_GZIP_RE = re.compile(r'\bgzip\b')
+
+
+def accepts_gzip(request):
+    """Whether the client accepts gzip bodies."""
+    return bool(_GZIP_RE.search(request.headers.get('Accept-Encoding', '')))
+
+
+def encoded_response(request, document):
+    """Send a document rendered in advance, compressed when the client accepts gzip.
+
+    Args:
+        request: The incoming HTTP request.
+        document (EncodedDocument): The JSON document.
+
+    Returns:
+        HttpResponse: The response, varying on Accept-Encoding.
+    """
+    if accepts_gzip(request):
+        response = HttpResponse(document.gzip, content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(document.body, content_type='application/json')
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def json_catalog_version():
+    """Version of the catalog files the core courses are read from."""
+    return get_catalog().version
+
+
+def parse_flag(value):
+    """Parse a boolean flag sent as a JSON boolean or a query string ('true'/'false')."""
+    if isinstance(value, str):
+        return value.strip().lower() in ('true', '1', 'yes')
+    return bool(value)
+
+
+class BatchRecommendCourseAPIView(APIView):
+    """
+    API endpoint for recommending courses to many students at once.
+
+    Recommendations are computed by `settings.BATCH_RECOMMEND_WORKERS`
+    processes and streamed back as newline delimited JSON, one line per
+    student, for at most `settings.BATCH_RECOMMEND_MAX_STUDENTS` students.
+
+    Permission Classes:
+        - IsAdminUser: Only advisors (staff users) can access this view.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        """
+        Recommend courses for stored students and/or raw course histories.
+
+        The body holds `identity`, `intense`, `students` (a list of student ids)
+        and `histories` (a list of {"id": ..., "course_dict": {...}}). Each
+        history may override `identity` and `intense`.
+
+        Returns:
+            StreamingHttpResponse: One JSON line per student, failed students
+            have an `error` instead of the recommendation.
+        """
+        identity = request.data.get('identity')
+        intense = parse_flag(request.data.get('intense', False))
+        student_ids = request.data.get('students', [])
+        histories = request.data.get('histories', [])
+        if not isinstance(student_ids, list) or not isinstance(histories, list):
+            return Response("'students' and 'histories' must be lists", status=status.HTTP_400_BAD_REQUEST)
+        if not all(isinstance(history, dict) for history in histories):
+            return Response("every history must be an object", status=status.HTTP_400_BAD_REQUEST)
+        if identity is None and (student_ids or any('identity' not in history for history in histories)):
+            return Response("Missing 'identity' parameter", status=status.HTTP_400_BAD_REQUEST)
+        if len(student_ids) + len(histories) > settings.BATCH_RECOMMEND_MAX_STUDENTS:
+            return Response(
+                f"At most {settings.BATCH_RECOMMEND_MAX_STUDENTS} students per request, "
+                "recommend for larger cohorts with manage.py recommend_batch",
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+
+        jobs = list(student_jobs(student_ids, identity, intense))
+        jobs += [
+            BatchJob(
+                history.get('id'), history.get('course_dict'),
+                history.get('identity', identity), parse_flag(history.get('intense', intense))
+            )
+            for history in histories
+        ]
+        results = recommend_batch(jobs, workers=settings.BATCH_RECOMMEND_WORKERS)
+        return StreamingHttpResponse(to_ndjson(results), content_type='application/x-ndjson')
+
+
+class RecommendationCacheStatsAPIView(APIView):
+    """
+    API endpoint for the hit/miss counters of the recommendation cache.
+
+    Permission Classes:
+        - IsAdminUser: Only staff users can access this view.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        """
+        Retrieve the recommendation cache counters.
+
+        Returns:
+            Response: Response containing the hits, misses and hit rate.
+        """
+        return Response(recommendation_cache.stats())
+
+
 class CourseDetailAPIView(APIView):
     """
     API endpoint for retrieving details of a specific course.
@@ -113,6 +371,7 @@ class CourseDetailAPIView(APIView):
     
     permission_classes = [permissions.AllowAny]
 
+    @catalog_etag(get_catalog_version)
     def get(self, request, id):
         """
         Retrieve details of a specific course.
@@ -141,6 +400,128 @@ class CourseDetailAPIView(APIView):
             return Response({"error": "Course not found"}, status=status.HTTP_404_NOT_FOUND)
 
 
+class CourseSearchAPIView(APIView):
+    """
+    API endpoint for searching the courses by id, name and description.
+
+    Permission Classes:
+        - AllowAny: No permission required to access this view.
+    """
+
+    permission_classes = [permissions.AllowAny]
+    max_page_size = 100
+
+    @catalog_etag(get_catalog_version)
+    def get(self, request):
+        """
+        Search the courses, misspelled and incomplete words included.
+
+        The courses are searched in an index of this process, built once per
+        catalog version, without queries.
+
+        Args:
+            request: The incoming HTTP request, with the query `q` and the
+                optional `page` (from 1) and `page_size` (20 by default).
+
+        Returns:
+            Response: Response containing the number of courses found and the
+                courses of the page, best first.
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response("Missing 'q' parameter", status=status.HTTP_400_BAD_REQUEST)
+        try:
+            page = parse_optional_int(request.query_params.get('page'))
+            page_size = parse_optional_int(request.query_params.get('page_size'))
+        except ValueError:
+            return Response("'page' and 'page_size' must be integers", status=status.HTTP_400_BAD_REQUEST)
+        page = 1 if page is None else page
+        page_size = 20 if page_size is None else page_size
+        if page < 1 or not 1 <= page_size <= self.max_page_size:
+            return Response(f"'page' must be positive and 'page_size' between 1 and {self.max_page_size}",
+                            status=status.HTTP_400_BAD_REQUEST)
+        count, hits = get_search_index().search(query, offset=(page - 1) * page_size, limit=page_size)
+        return Response({
+            'count': count,
+            'page': page,
+            'page_size': page_size,
+            'results': [hit._asdict() for hit in hits],
+        })
+
+
+class EligibleCoursesAPIView(APIView):
+    """
+    API endpoint for the courses the authenticated student can take now.
+
+    Permission Classes:
+        - IsAuthenticated: Only authenticated users can access this view.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        """
+        Retrieve the courses not taken yet whose prerequisites the student completed.
+
+        The whole catalog is checked in one query.
+
+        Returns:
+            Response: Response containing the eligible courses.
+        """
+        try:
+            student = request.user.student
+        except ObjectDoesNotExist:
+            return Response("student does not exist", status=status.HTTP_404_NOT_FOUND)
+        courses = Course.objects.eligible_for(student).exclude(
+            id__in=student.taken_courses.values('course_id')).order_by('id')
+        return Response({'courses': CourseSerializer(courses, many=True).data})
+
+
+class DegreeAuditAPIView(APIView):
+    """
+    API endpoint for the progress of the authenticated student towards its core and major requirements.
+
+    Permission Classes:
+        - IsAuthenticated: Only authenticated users can access this view.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        """
+        Retrieve the progress of every requirement of the student.
+
+        The progress is kept up to date when the taken courses change, it is
+        read in one query.
+
+        Returns:
+            Response: Response containing the credits of the student and, for
+                every requirement, the courses taken that count towards it.
+        """
+        progress = list(StudentRequirementProgress.objects.filter(student__user=request.user).select_related(
+            'student', 'requirement__major').order_by('requirement__major__name', 'requirement_id'))
+        if not progress:
+            student = Student.objects.filter(user=request.user).first()
+            if student is None:
+                return Response("student does not exist", status=status.HTTP_404_NOT_FOUND)
+        else:
+            student = progress[0].student
+        return Response({
+            'credit': student.credit,
+            'requirements': [{
+                'requirement': row.requirement_id,
+                'major': row.requirement.major.name,
+                'is_major': row.requirement.major.is_major,
+                'elective': row.requirement.elective,
+                'count': row.requirement.count,
+                'satisfied': row.satisfied,
+                'credits': row.credits,
+                'courses': row.courses,
+                'complete': row.satisfied >= row.requirement.count,
+            } for row in progress],
+        })
+
+
 class MajorDetailAPIView(APIView):
     """
     API endpoint for retrieving details of a specific major.
@@ -151,10 +532,14 @@ class MajorDetailAPIView(APIView):
     
     permission_classes = [permissions.AllowAny]
     
+    @catalog_etag(get_catalog_version)
     def get(self, request, name):
         """
         Retrieve details of a specific major.
 
+        The details are built once per catalog version, a request only reads
+        the version.
+
         Args:
             request: The incoming HTTP request.
             name (str): The name of the major to retrieve.
@@ -162,13 +547,10 @@ class MajorDetailAPIView(APIView):
         Returns:
             Response: Response containing the major details.
         """
-        try:
-            major = Major.objects.filter(name__iexact=name).first()
-            requirements = major.get_all_reqs()
-            courses_list = [( req.count, "Elective" if req.elective else "Required", CourseSerializer(req.courses.all(), many=True).data) for req in requirements]
-            return Response({"requirements": courses_list})
-        except Major.DoesNotExist:
+        snapshot = major_snapshot(name)
+        if snapshot is None:
             return Response({"error": "Major not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(snapshot)
         
 
 class DisplayCoreAPIView(APIView):
@@ -181,6 +563,7 @@ class DisplayCoreAPIView(APIView):
     
     permission_classes = [permissions.AllowAny]
     
+    @catalog_etag(json_catalog_version, encoded=True)
     def get(self, request):
         """
         Retrieve core courses based on location.
@@ -189,19 +572,14 @@ class DisplayCoreAPIView(APIView):
             request: The incoming HTTP request.
 
         Returns:
-            Response: Response containing the core courses.
+            Response: Response containing the core courses, rendered when the
+                catalog was loaded and gzipped when the client accepts it.
         """
-        loc = request.query_params.get('loc').lower()
-        try:
-            with open(f"courses/recommendor/{loc}_core_courses.json") as f:
-                course_lists = json.load(f)
-            return Response({'course_lists': course_lists})
-        except FileNotFoundError:
+        loc = (request.query_params.get('loc') or '').lower()
+        catalog = get_catalog()
+        document = catalog.core_documents.get(loc)
+        if document is None:
             return Response({"error": "Location invalid"}, status=status.HTTP_404_NOT_FOUND)
-
-
-
-
-
-
-
+        if request.accepted_renderer.format != 'json':
+            return Response({'course_lists': catalog.core_course_lists[loc]})
+        return encoded_response(request, document)
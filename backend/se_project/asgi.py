@@ -14,3 +14,11 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'se_project.settings')
 
 application = get_asgi_application()
+
+# load and validate the course catalog before the first request, a broken catalog stops the server here,
+# and build the course search index
+from courses.recommendor.catalog import get_catalog  # noqa: E402
+from courses.search import get_search_index  # noqa: E402
+
+get_catalog()
+get_search_index()
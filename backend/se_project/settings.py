@@ -115,6 +115,52 @@ DATABASES = {
 }
 
 
+# Caches
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# The recommendation cache backend is picked with REC_CACHE_BACKEND, eg.
+# django.core.cache.backends.filebased.FileBasedCache (REC_CACHE_LOCATION: a folder) or
+# django.core.cache.backends.memcached.PyMemcacheCache (REC_CACHE_LOCATION: host:port),
+# the parse cache backend the same way with PARSE_CACHE_BACKEND and PARSE_CACHE_LOCATION
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'recommendations': {
+        'BACKEND': os.environ.get('REC_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('REC_CACHE_LOCATION', 'recommendations'),
+        'TIMEOUT': int(os.environ.get('REC_CACHE_TIMEOUT', 24 * 60 * 60)),
+    },
+    # parsed course history pages by the fingerprint of the page
+    'parses': {
+        'BACKEND': os.environ.get('PARSE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('PARSE_CACHE_LOCATION', 'parses'),
+        'TIMEOUT': int(os.environ.get('PARSE_CACHE_TIMEOUT', 7 * 24 * 60 * 60)),
+    },
+}
+
+
+# How long a process uses the catalog version it read before reading it again, in seconds, and
+# the Cache-Control max-age of the catalog responses, revalidated with their ETag once expired.
+CATALOG_VERSION_TIMEOUT = int(os.environ.get('CATALOG_VERSION_TIMEOUT', 5))
+CATALOG_MAX_AGE = int(os.environ.get('CATALOG_MAX_AGE', 0))
+
+
+# The uploads sent with 'async' are parsed by `manage.py run_upload_jobs`, run as its own process.
+# Above 0, every web process also parses them in that many background threads, competing with the
+# requests for the CPU. A job still running after UPLOAD_JOB_TIMEOUT seconds is taken as lost, its
+# process crashed, and is run again.
+UPLOAD_JOB_WORKERS = int(os.environ.get('UPLOAD_JOB_WORKERS', 0))
+UPLOAD_JOB_TIMEOUT = int(os.environ.get('UPLOAD_JOB_TIMEOUT', 600))
+
+
+# The students of one batch recommendation request at most, and the worker processes it uses. More
+# than 1 forks the web process, only do it where the server runs without threads; larger cohorts are
+# recommended with `manage.py recommend_batch`.
+BATCH_RECOMMEND_MAX_STUDENTS = int(os.environ.get('BATCH_RECOMMEND_MAX_STUDENTS', 200))
+BATCH_RECOMMEND_WORKERS = int(os.environ.get('BATCH_RECOMMEND_WORKERS', 1))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -0,0 +1,113 @@
+import os
+import random
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'se_project.settings')
+
+import django
+django.setup()
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from courses.audit import audit_students, compile_rule_set
+from courses.models import Course, CoursePrereq, Major, MajorRequirement, Student, StudentTakenCourse
+
+
+def make_catalog(courses=600, majors=5, cores=3, requirements=10, seed=0):
+    """Create majors and cores of requirements over random courses, with random prerequisites."""
+    rng = random.Random(seed)
+    course_ids = [f'TEST-SHU {i}' for i in range(courses)]
+    Course.objects.bulk_create(Course(id=course_id, name=course_id) for course_id in course_ids)
+    programs = Major.objects.bulk_create(
+        [Major(name=f'Major {i}') for i in range(majors)] + [Major(name=f'Core {i}', is_major=False) for i in range(cores)]
+    )
+    reqs = MajorRequirement.objects.bulk_create(
+        MajorRequirement(major=major, count=rng.randint(1, 3), elective=bool(i % 2))
+        for major in programs for i in range(requirements if major.is_major else 1)
+    )
+    MajorRequirement.courses.through.objects.bulk_create(
+        MajorRequirement.courses.through(majorrequirement_id=req.id, course_id=course_id)
+        for req in reqs for course_id in rng.sample(course_ids, rng.randint(1, 12))
+    )
+    prereqs = CoursePrereq.objects.bulk_create(
+        CoursePrereq(course_id=course_id) for i, course_id in enumerate(course_ids) if i for _ in range(rng.randint(0, 2))
+    )
+    CoursePrereq.prereqs.through.objects.bulk_create(
+        CoursePrereq.prereqs.through(courseprereq_id=prereq.id, course_id=course_id)
+        for prereq in prereqs
+        for course_id in {course_ids[rng.randrange(int(prereq.course_id.split()[1]))] for _ in range(rng.randint(1, 3))}
+    )
+    return course_ids, [major for major in programs if major.is_major]
+
+
+def make_students(count, course_ids, majors, courses_per_student=32, seed=0):
+    """Create students of one major with random taken courses."""
+    rng = random.Random(seed)
+    users = User.objects.bulk_create(User(username=f'bench{i}') for i in range(count))
+    students = Student.objects.bulk_create(Student(user=user) for user in users)
+    if students[0].pk is None:
+        students = list(Student.objects.order_by('id'))
+    Student.major.through.objects.bulk_create(
+        Student.major.through(student_id=student.pk, major_id=rng.choice(majors).pk) for student in students
+    )
+    StudentTakenCourse.objects.bulk_create(
+        StudentTakenCourse(student_id=student.pk, course_id=course_id, semester='Fall 2021')
+        for student in students for course_id in rng.sample(course_ids, courses_per_student)
+    )
+    return [student.pk for student in students]
+
+
+def query_audit(student):
+    """The audit the rule set replaces: the requirements of the student read and counted with queries."""
+    programs = list(student.major.all()) + list(Major.objects.filter(is_major=False))
+    return [
+        [student.taken_courses.filter(course__in=req.courses.all()).values('course').distinct().count() for req in major.get_all_reqs()]
+        for major in programs
+    ]
+
+
+def main(students=2000):
+    course_ids, majors = make_catalog()
+    student_ids = make_students(students, course_ids, majors)
+
+    start = time.perf_counter()
+    rule_set = compile_rule_set(0)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    taken, student_majors = {}, {}
+    for student_id, course_id in StudentTakenCourse.objects.values_list('student_id', 'course_id'):
+        taken.setdefault(student_id, []).append(course_id)
+    for student_id, major_id in Student.major.through.objects.values_list('student_id', 'major_id'):
+        student_majors.setdefault(student_id, []).append(major_id)
+    start = time.perf_counter()
+    for student_id in student_ids:
+        rule_set.audit(rule_set.taken_mask(taken[student_id]), student_majors[student_id])
+    per_audit_us = (time.perf_counter() - start) / len(student_ids) * 10**6
+
+    start = time.perf_counter()
+    batch = list(audit_students(student_ids))
+    batch_rate = len(student_ids) / (time.perf_counter() - start)
+
+    sample = Student.objects.filter(id__in=student_ids[:50]).order_by('id')
+    start = time.perf_counter()
+    expected = [query_audit(student) for student in sample]
+    query_rate = len(expected) / (time.perf_counter() - start)
+    for (student_id, audits), counts in zip(batch, expected):
+        assert sorted(sum(([r.satisfied for r in audit.requirements] for audit in audits), [])) == sorted(sum(counts, []))
+
+    print(f'{len(course_ids)} courses, {MajorRequirement.objects.count()} requirements, {len(student_ids)} students')
+    print(f'compile: {compile_ms:.1f} ms, one audit in memory: {per_audit_us:.1f} us')
+    print(f'students/sec: {query_rate:.0f} with a query per requirement, {batch_rate:.0f} with the rule set '
+          f'({batch_rate / query_rate:.0f}x)')
+
+
+if __name__ == '__main__':
+    setup_test_environment()
+    database = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        main()
+    finally:
+        connection.creation.destroy_test_db(database, verbosity=0)
+        teardown_test_environment()
@@ -0,0 +1,27 @@
+import json
+import os
+import time
+
+from courses.recommendor.batch import BatchJob, recommend_batch
+from django.conf import settings
+
+
+if __name__ == '__main__':
+    with open(os.path.join(settings.BASE_DIR, "test/course_recommend_test/test_course_history.json")) as f:
+        course_history = json.load(f)
+
+    # a cohort mixing juniors and new students
+    jobs = [
+        BatchJob(i, course_history if i % 2 else {}, 'chinese' if i % 3 else 'inter', bool(i % 5))
+        for i in range(4000)
+    ]
+
+    print(f'{"workers":>8} {"seconds":>9} {"students/sec":>13}')
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        for _ in recommend_batch(jobs, workers=workers, chunksize=64):
+            pass
+        elapsed = time.perf_counter() - start
+        print(f'{workers:>8} {elapsed:>9.2f} {len(jobs) / elapsed:>13.1f}')
+        workers *= 2
@@ -0,0 +1,81 @@
+import random
+import timeit
+
+from courses.recommendor.recommendor import RecommendorPreparer
+from courses.recommendor.catalog import get_catalog
+
+
+def clean_course_number(course_num):
+    """The course number cleaning used by the linear scans."""
+    course_num_idx = course_num.find('-')
+    course_num_idx = course_num[course_num_idx+1:].find('-') + course_num_idx
+    return course_num[:course_num_idx] + course_num[course_num_idx+2:]
+
+
+def scan_prepare(course_history, catalog):
+    """The linear substring scans the course index replaces."""
+    taken_map = {'ED': 0, 'STS': 0, 'MATH': 0, 'AT': 0, 'IPC': 0, 'HPC': 0, 'SSPC': 0, 'Language': 0, 'Math': 0}
+    taken_electives = []
+    taken_major_courses = []
+    for taken_courses in course_history.values():
+        for taken_course in taken_courses:
+            course_num = clean_course_number(taken_course[0])
+            find = False
+            for core_courses in (catalog.ny_core_courses, catalog.sh_core_courses):
+                for core, courses in core_courses.items():
+                    for core_course in courses:
+                        if course_num in core_course[0]:
+                            taken_map[core] += 1
+                            find = True
+                            break
+                    if find:
+                        break
+                if find:
+                    break
+            for elective_course in catalog.sh_elective_courses + catalog.ny_elective_courses:
+                if course_num == elective_course[0]:
+                    taken_electives.append(course_num)
+            for major_courses_idx in range(len(catalog.cs_major_courses)):
+                for major_course in catalog.cs_major_courses[major_courses_idx]:
+                    if course_num in major_course:
+                        taken_major_courses.append(major_courses_idx)
+                        break
+    return taken_map, taken_electives, taken_major_courses
+
+
+def index_prepare(course_history, preparer):
+    """The course index lookups."""
+    untaken_core_courses, taken_electives = preparer.general_prepare(course_history)
+    taken_major_courses = [
+        requirement.category
+        for taken_courses in course_history.values()
+        for taken_course in taken_courses
+        for requirement in preparer.catalog.classify(taken_course[0].replace(' - ', ' '))
+        if requirement.kind == 'major'
+    ]
+    return untaken_core_courses, taken_electives, taken_major_courses
+
+
+def make_history(catalog, semesters, courses_per_semester, seed=0):
+    """Build a synthetic course history in the transcript format."""
+    rng = random.Random(seed)
+    course_nums = list(catalog.requirement_index) + [f'FAKE-SHU {i}' for i in range(500)]
+    history = {}
+    for semester in range(semesters):
+        history[f'Semester {semester}'] = [
+            [rng.choice(course_nums).replace(' ', ' - ', 1), 'Course', '4'] for _ in range(courses_per_semester)
+        ]
+    return history
+
+
+if __name__ == '__main__':
+    catalog = get_catalog()
+    preparer = RecommendorPreparer(catalog)
+
+    print(f'{"history size":>14} {"scan (ms)":>12} {"index (ms)":>12} {"speedup":>10}')
+    for semesters, courses_per_semester in [(8, 5), (8, 50), (16, 100), (32, 250)]:
+        history = make_history(catalog, semesters, courses_per_semester)
+        number = max(1, 2000 // (semesters * courses_per_semester))
+        scan = min(timeit.repeat(lambda: scan_prepare(history, catalog), number=number, repeat=3)) / number
+        index = min(timeit.repeat(lambda: index_prepare(history, preparer), number=number, repeat=3)) / number
+        print(f'{semesters * courses_per_semester:>14} {scan * 1000:>12.3f} {index * 1000:>12.3f} {scan / index:>9.1f}x')
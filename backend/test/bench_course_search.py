@@ -0,0 +1,118 @@
+import os
+import random
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'se_project.settings')
+
+import django
+django.setup()
+
+from courses.course_id import split_course_title
+from courses.recommendor.catalog import get_catalog
+from courses.search import CourseSearchIndex, words
+
+
+def catalog_courses():
+    """The courses of today's catalog files: (id, name)."""
+    catalog = get_catalog()
+    courses = {}
+    for core_courses in (catalog.ny_core_courses, catalog.sh_core_courses):
+        for category in core_courses.values():
+            for course in category:
+                courses.setdefault(course.id, course.name)
+    for course in catalog.ny_elective_courses + catalog.sh_elective_courses:
+        courses.setdefault(course.id, course.name)
+    for group in catalog.cs_major_courses:
+        for title in group:
+            courses.setdefault(*split_course_title(title))
+    return list(courses.items())
+
+
+def make_catalog(courses, scale, seed=0):
+    """`scale` times the courses: numbers shifted, names mixed and descriptions of catalog words."""
+    rng = random.Random(seed)
+    vocabulary = sorted({word for course_id, name in courses for word in words(name) if len(word) > 2})
+    synthetic = []
+    for copy in range(scale):
+        for course_id, name in courses:
+            subject, _, number = course_id.rpartition(' ')
+            name_words = name.split()
+            if copy:
+                name_words = rng.sample(name_words, len(name_words)) + rng.sample(vocabulary, 2)
+            description = ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(15, 40)))
+            synthetic.append((f'{subject} {copy}{number}', ' '.join(name_words), description, 4))
+    synthetic.sort()
+    return synthetic, vocabulary
+
+
+def typo(word, rng):
+    """The word with a letter dropped, doubled or swapped with the next."""
+    i = rng.randrange(len(word) - 1)
+    kind = rng.randrange(3)
+    if kind == 0:
+        return word[:i] + word[i + 1:]
+    if kind == 1:
+        return word[:i] + word[i] + word[i:]
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def make_queries(courses, vocabulary, count, seed=1):
+    """Queries of words, misspelled words, prefixes, course ids and their starts."""
+    rng = random.Random(seed)
+    long_words = [word for word in vocabulary if len(word) > 5]
+    queries = []
+    for i in range(count):
+        kind = i % 5
+        if kind == 0:
+            queries.append(' '.join(rng.sample(vocabulary, rng.randint(1, 3))))
+        elif kind == 1:
+            queries.append(' '.join(typo(word, rng) for word in rng.sample(long_words, rng.randint(1, 2))))
+        elif kind == 2:
+            queries.append(rng.choice(long_words)[:rng.randint(3, 5)])
+        elif kind == 3:
+            queries.append(rng.choice(courses)[0])
+        else:
+            course_id = rng.choice(courses)[0]
+            queries.append(course_id[:len(course_id) - rng.randint(1, 3)])
+    return queries
+
+
+def scan_search(courses, query, limit=20):
+    """The search the index replaces: a case insensitive substring scan of every field, as icontains."""
+    terms = query.lower().split()
+    found = [course for course in courses
+             if all(term in course[0].lower() or term in course[1].lower() or term in course[2].lower() for term in terms)]
+    return len(found), found[:limit]
+
+
+def percentiles(times):
+    times = sorted(times)
+    return [times[min(len(times) - 1, int(len(times) * p))] * 1000 for p in (0.5, 0.95, 0.99)]
+
+
+def main(scale=100, count=2000):
+    today = catalog_courses()
+    courses, vocabulary = make_catalog(today, scale)
+    start = time.perf_counter()
+    index = CourseSearchIndex(1, courses)
+    build = time.perf_counter() - start
+    queries = make_queries(courses, vocabulary, count)
+
+    index_times, scan_times = [], []
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        index.search(query)
+        index_times.append(time.perf_counter() - start)
+        if i % 10 == 0:
+            start = time.perf_counter()
+            scan_search(courses, query)
+            scan_times.append(time.perf_counter() - start)
+
+    print(f'{len(today)} courses today, {len(courses)} indexed ({scale}x), {len(index.words)} words, built in {build:.2f}s')
+    print(f'{"":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8}')
+    for name, times in (('scan', scan_times), ('index', index_times)):
+        print(f'{name:>8}', *(f'{value:>8.2f}' for value in percentiles(times)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+import os
+import random
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'se_project.settings')
+
+import django
+django.setup()
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from courses.models import Course, CoursePrereq, Student, StudentTakenCourse
+
+
+def per_set_eligible(student, courses):
+    """The check the single query replaces: one query per prerequisite set of every course."""
+    eligible = []
+    for course in courses:
+        for prereq_set in course.get_prereqs():
+            if not student.taken_courses.filter(course__in=prereq_set.prereqs.all()).exists():
+                break
+        else:
+            eligible.append(course)
+    return eligible
+
+
+class QueryCounter():
+    """Count the queries run, as an execute wrapper of the connection."""
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def timed(function):
+    """Run a function, with its time in ms and its number of queries."""
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+    return result, elapsed * 1000, counter.count
+
+
+def make_catalog(size, seed=0):
+    """Create `size` courses, each with up to 3 prerequisite sets of earlier courses."""
+    rng = random.Random(seed)
+    courses = Course.objects.bulk_create(Course(id=f'TEST-SHU {i}', name=f'Test {i}') for i in range(size))
+    prereqs = CoursePrereq.objects.bulk_create(
+        CoursePrereq(course=course) for i, course in enumerate(courses) if i for _ in range(rng.randint(0, 3))
+    )
+    CoursePrereq.prereqs.through.objects.bulk_create(
+        CoursePrereq.prereqs.through(courseprereq_id=prereq.id, course_id=course_id)
+        for prereq in prereqs
+        for course_id in {f'TEST-SHU {rng.randrange(int(prereq.course_id.split()[1]))}' for _ in range(rng.randint(1, 3))}
+    )
+    return courses
+
+
+if __name__ == '__main__':
+    setup_test_environment()
+    database = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        print(f'{"courses":>8} {"per set ms":>11} {"queries":>8} {"at once ms":>11} {"queries":>8}')
+        for size in (250, 1000, 4000):
+            Course.objects.all().delete()
+            User.objects.all().delete()
+            courses = make_catalog(size)
+            student = Student.objects.create(user=User.objects.create_user(username='bench'))
+            StudentTakenCourse.objects.bulk_create(
+                StudentTakenCourse(student=student, course=course, semester='Fall 2021') for course in courses[::3]
+            )
+            catalog = list(Course.objects.all())
+
+            expected, per_set, per_set_queries = timed(lambda: per_set_eligible(student, catalog))
+            eligible, at_once, at_once_queries = timed(lambda: list(Course.objects.eligible_for(student)))
+            assert {course.id for course in eligible} == {course.id for course in expected}
+            print(f'{size:>8} {per_set:>11.1f} {per_set_queries:>8} {at_once:>11.1f} {at_once_queries:>8}')
+    finally:
+        connection.creation.destroy_test_db(database, verbosity=0)
+        teardown_test_environment()
@@ -0,0 +1,35 @@
+import copy
+import timeit
+
+from courses.recommendor.catalog import get_catalog
+from courses.recommendor.recommendor import Recommendor
+from courses.recommendor.requirements import RequirementState
+from test.bench_course_index import make_history
+
+
+def full_recommend(history):
+    return Recommendor(history, 'chinese', seed=0).recommend()
+
+
+def incremental_recommend(state, catalog, history):
+    state.update(catalog, history)
+    return Recommendor(history, 'chinese', seed=0, requirements=state).recommend()
+
+
+if __name__ == '__main__':
+    catalog = get_catalog()
+
+    # the latest semester gets one course swapped, as when a student edits a semester
+    print(f'{"history size":>14} {"full (ms)":>12} {"incremental (ms)":>17} {"speedup":>10}')
+    for semesters, courses_per_semester in [(4, 5), (6, 50), (6, 250), (7, 1000)]:
+        history = make_history(catalog, semesters, courses_per_semester)
+        edited = copy.deepcopy(history)
+        edited[list(edited)[-1]][0] = ['CSCI-SHU - 210', 'Data Structures', '4']
+        state = RequirementState.from_history(catalog, history)
+        assert incremental_recommend(copy.deepcopy(state), catalog, edited) == full_recommend(edited)
+
+        number = max(1, 2000 // (semesters * courses_per_semester))
+        states = [copy.deepcopy(state) for _ in range(number * 3)]
+        full = min(timeit.repeat(lambda: full_recommend(edited), number=number, repeat=3)) / number
+        incremental = min(timeit.repeat(lambda: incremental_recommend(states.pop(), catalog, edited), number=number, repeat=3)) / number
+        print(f'{semesters * courses_per_semester:>14} {full * 1000:>12.3f} {incremental * 1000:>17.3f} {full / incremental:>9.1f}x')
@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+import timeit
+import types
+
+from courses.course_id import canonical_course_id
+from courses.parse_course_history import FEED_SIZE, CourseHistoryParser, parse_course_history
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'course_history_tests')
+
+# the commit of the original parser, before the streaming parser
+BASELINE = 'd4c01a3'
+
+
+def baseline_parser(commit=BASELINE):
+    """Load `parse_course_history` as it was at `commit`, from git."""
+    source = subprocess.run(
+        ['git', 'show', f'{commit}:backend/courses/parse_course_history.py'],
+        cwd=os.path.dirname(__file__), capture_output=True, text=True, check=True,
+    ).stdout
+    module = types.ModuleType(f'parse_course_history_{commit}')
+    exec(compile(source, module.__name__, 'exec'), module.__dict__)
+    return module.parse_course_history
+
+
+def canonical(course_dict):
+    """The course numbers of a parse canonicalized, the baseline kept them as on the page."""
+    return {
+        semester: [[canonical_course_id(num), name, credits] for num, name, credits in courses]
+        for semester, courses in course_dict.items()
+    }
+
+
+def parse_streamed(text):
+    """Parse a page fed in chunks, as an uploaded file is."""
+    parser = CourseHistoryParser()
+    for start in range(0, len(text), FEED_SIZE):
+        parser.feed(text[start:start + FEED_SIZE])
+    return parser.close()
+
+
+def make_page(semesters):
+    """Build a course history page of many semesters from the third fixture."""
+    with open(os.path.join(FIXTURES, 'test_case3.txt')) as f:
+        text = f.read()
+    head, tail = text.split('<h3>Fall 2022</h3>')
+    semester, rest = tail.split('</table>', 1)
+    return head + ''.join(
+        f'<h3>Fall {1000 + i}</h3>{semester}</table>\n</div>\n' for i in range(semesters)
+    ) + rest
+
+
+def best_times(functions, text, number, repeat=15):
+    """The best time of every function, timed in turns so that they share the noise of the machine."""
+    best = [float('inf')] * len(functions)
+    for i in range(repeat):
+        for j, function in enumerate(functions):
+            best[j] = min(best[j], timeit.timeit(lambda: function(text), number=number) / number)
+    return best
+
+
+def main(commit=BASELINE):
+    baseline = baseline_parser(commit)
+    pages = []
+    for i in range(1, 7):
+        with open(os.path.join(FIXTURES, f'test_case{i}.txt')) as f:
+            pages.append((f'test_case{i}', f.read()))
+    for semesters in (50, 200):
+        pages.append((f'{semesters} semesters', make_page(semesters)))
+
+    print(f'{"page":>14} {"size":>9} {commit:>10} {"current":>10} {"speedup":>8} {"streamed":>10} {"speedup":>8}')
+    for name, text in pages:
+        assert parse_course_history(text) == parse_streamed(text) == canonical(baseline(text)), name
+        number = max(3, 200000 // len(text))
+        before, after, streamed = best_times((baseline, parse_course_history, parse_streamed), text, number)
+        print(f'{name:>14} {len(text) // 1024:>7}KB {before * 1000:>8.3f}ms {after * 1000:>8.3f}ms {before / after:>7.2f}x '
+              f'{streamed * 1000:>8.3f}ms {before / streamed:>7.2f}x')
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
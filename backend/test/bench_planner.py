@@ -0,0 +1,80 @@
+import random
+import time
+
+from courses.recommendor.catalog import get_catalog
+from courses.recommendor.recommendor import Recommendor, RecommendorPreparer
+
+
+SEMESTERS = ['freshmen_1st', 'freshmen_2nd', 'sophomore_1st', 'sophomore_2nd', 'junior_1st', 'junior_2nd']
+
+
+def random_history(catalog, rng):
+    """A history of 1 to 6 semesters of major, core, elective and unrelated courses."""
+    courses = [course.split(' ', 2) for group in catalog.cs_major_courses for course in group]
+    courses = [[f'{subject} {number}', name, '4', 'A'] for subject, number, name in courses]
+    for core_courses in list(catalog.sh_core_courses.values()) + list(catalog.ny_core_courses.values()):
+        courses += [[course.id, course.name, '4', 'A'] for course in core_courses]
+    courses += [[course.id, course.name, '4', 'A'] for course in catalog.sh_elective_courses]
+    courses += [['ECON-SHU 1', 'Principles of Macroeconomics', '4', 'A'], ['BUSF-SHU 200', 'Foundations of Finance', '4', 'A']]
+    return {
+        semester: rng.sample(courses, 4)
+        for semester in SEMESTERS[:rng.randint(1, len(SEMESTERS))]
+    }
+
+
+def plan_is_valid(catalog, course_history, identity, recommend):
+    """Check a plan independently of the planners.
+
+    Every requirement must be met and every major course and SH elective must
+    have its prerequisites completed in an earlier semester.
+    """
+    history = {semester: [[course[0]] for course in courses] for semester, courses in course_history.items()}
+    completed_majors = set()
+    completed = catalog.elective_prereqs.mask(course[0] for courses in history.values() for course in courses)
+    for courses in history.values():
+        for course in courses:
+            completed_majors |= {req.category for req in catalog.classify(course[0]) if req.kind == 'major'}
+
+    for semester, courses in recommend.items():
+        course_nums = [' '.join(course.split(' | ')[0].split()[:2]) for course in courses]
+        semester_majors = set()
+        for course_num in course_nums:
+            for req in catalog.classify(course_num):
+                if req.kind == 'major' and req.category not in completed_majors:
+                    if not catalog.major_prereqs.is_unlocked(req.category, catalog.major_prereqs.mask(completed_majors)):
+                        return False
+                    semester_majors.add(req.category)
+                if req.kind == 'sh_elective' and not catalog.elective_prereqs.is_unlocked(course_num, completed):
+                    return False
+        completed_majors |= semester_majors
+        completed |= catalog.elective_prereqs.mask(course_nums)
+        history[semester] = [[course_num] for course_num in course_nums]
+
+    untaken_cores, taken_electives = RecommendorPreparer(catalog).general_prepare(history)
+    return not untaken_cores and completed_majors >= set(range(9)) and len(taken_electives) >= 4
+
+
+def percentile(latencies, q):
+    return sorted(latencies)[int(q * (len(latencies) - 1))] * 1000
+
+
+if __name__ == '__main__':
+    catalog = get_catalog()
+    rng = random.Random(0)
+    histories = [random_history(catalog, rng) for _ in range(500)]
+    cases = [(history, identity, tense) for history in histories for identity in ['chinese', 'inter'] for tense in [False, True]]
+
+    # 'claimed' is the planner's own answer, 'verified' the plans passing plan_is_valid
+    print(f'{"planner":>8} {"claimed":>8} {"verified":>9} {"p50 ms":>8} {"p99 ms":>8} {"max ms":>8}')
+    for planner in ['greedy', 'search']:
+        latencies = []
+        claimed = verified = 0
+        for history, identity, tense in cases:
+            recommendor = Recommendor(history, identity, tense, seed=0)
+            start = time.perf_counter()
+            valid, recommend = recommendor.recommend_search() if planner == 'search' else recommendor.recommend()
+            latencies.append(time.perf_counter() - start)
+            claimed += bool(valid)
+            verified += plan_is_valid(catalog, history, identity, recommend)
+        print(f'{planner:>8} {claimed / len(cases):>8.1%} {verified / len(cases):>9.1%} {percentile(latencies, 0.5):>8.2f} '
+              f'{percentile(latencies, 0.99):>8.2f} {max(latencies) * 1000:>8.2f}')
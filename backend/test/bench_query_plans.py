@@ -0,0 +1,129 @@
+import os
+import random
+import statistics
+import sys
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'se_project.settings')
+
+import django
+django.setup()
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from courses.models import Course, CoursePrereq, MajorRequirement, Student, StudentTakenCourse
+from courses.progress import build_progress
+from test.bench_audit import make_catalog
+
+SEMESTERS = [f'{season} {year}' for year in range(2020, 2024) for season in ('Fall', 'Spring')]
+
+def make_students(count, course_ids, majors, courses_per_semester=4, batch_size=5000, seed=0):
+    """Create students of one major, each with a few courses in every semester."""
+    rng = random.Random(seed)
+    for start in range(0, count, batch_size):
+        users = User.objects.bulk_create(User(username=f'bench{i}') for i in range(start, min(count, start + batch_size)))
+        Student.objects.bulk_create(Student(user=user) for user in users)
+    student_ids = list(Student.objects.order_by('id').values_list('id', flat=True))
+    Student.major.through.objects.bulk_create(
+        (Student.major.through(student_id=student_id, major_id=rng.choice(majors).pk) for student_id in student_ids),
+        batch_size=batch_size,
+    )
+    for start in range(0, count, batch_size):
+        StudentTakenCourse.objects.bulk_create((
+            StudentTakenCourse(student_id=student_id, course_id=course_id, semester=semester)
+            for student_id in student_ids[start:start + batch_size]
+            for semester, course_id in zip(
+                (semester for semester in SEMESTERS for _ in range(courses_per_semester)),
+                rng.sample(course_ids, len(SEMESTERS) * courses_per_semester),
+            )
+        ), batch_size=batch_size)
+    return student_ids
+
+
+def hot_queries(student_ids, course_ids, rng):
+    """The queries timed: name -> function of a random student and course, returning a queryset or a result."""
+    return {
+        'taken courses (sync)': lambda student_id, course_id: list(
+            StudentTakenCourse.objects.filter(student_id=student_id).values_list('id', 'course_id', 'semester')),
+        'taken in a semester': lambda student_id, course_id: list(
+            StudentTakenCourse.objects.filter(student_id=student_id, semester=rng.choice(SEMESTERS)).values_list('course_id')),
+        'requirements of a course': lambda student_id, course_id: list(
+            MajorRequirement.objects.filter(courses=course_id).values_list('id', flat=True)),
+        'courses a course unlocks': lambda student_id, course_id: list(
+            CoursePrereq.objects.filter(prereqs=course_id).values_list('course_id', flat=True)),
+        'eligible courses': lambda student_id, course_id: list(
+            Course.objects.eligible_for(Student(pk=student_id)).values_list('id', flat=True)),
+        'requirement progress': lambda student_id, course_id: build_progress([student_id]),
+    }
+
+
+def plans():
+    """The query plans of the queries by an index, for one student and course."""
+    student_id = Student.objects.order_by('id').values_list('id', flat=True).first()
+    course_id = Course.objects.order_by('id').values_list('id', flat=True).first()
+    return {
+        'taken courses (sync)': StudentTakenCourse.objects.filter(student_id=student_id).values_list('id', 'course_id', 'semester'),
+        'taken in a semester': StudentTakenCourse.objects.filter(student_id=student_id, semester=SEMESTERS[0]).values_list('course_id'),
+        'requirements of a course': MajorRequirement.objects.filter(courses=course_id).values_list('id', flat=True),
+        'courses a course unlocks': CoursePrereq.objects.filter(prereqs=course_id).values_list('course_id', flat=True),
+    }
+
+
+def measure(student_ids, course_ids, repeat, seed=1):
+    """Time every query on random students and courses, the median in ms."""
+    rng = random.Random(seed)
+    pairs = [(rng.choice(student_ids), rng.choice(course_ids)) for _ in range(repeat)]
+    times = {}
+    for name, query in hot_queries(student_ids, course_ids, rng).items():
+        durations = []
+        for student_id, course_id in pairs:
+            start = time.perf_counter()
+            query(student_id, course_id)
+            durations.append(time.perf_counter() - start)
+        times[name] = statistics.median(durations) * 1000
+    return times, {name: queryset.explain() for name, queryset in plans().items()}
+
+
+def migrate(target):
+    """Migrate the courses to `target`, in seconds, and refresh the statistics of the planner."""
+    start = time.perf_counter()
+    call_command('migrate', 'courses', target, verbosity=0)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return time.perf_counter() - start
+
+
+def main(students=100000, repeat=1000):
+    course_ids, majors = make_catalog()
+    start = time.perf_counter()
+    student_ids = make_students(students, course_ids, majors)
+    print(f'{len(student_ids)} students, {StudentTakenCourse.objects.count()} taken courses, '
+          f'{len(course_ids)} courses, seeded in {time.perf_counter() - start:.0f}s ({connection.vendor})')
+
+    # before: the indexes of migration 0007 undone
+    undo = migrate('0006')
+    before, before_plans = measure(student_ids, course_ids, repeat)
+    redo = migrate('0007')
+    after, after_plans = measure(student_ids, course_ids, repeat)
+    print(f'migration 0007 undone in {undo:.1f}s, applied in {redo:.1f}s')
+
+    for name in before_plans:
+        print(f'\n{name}')
+        for label, plan in (('before', before_plans[name]), ('after', after_plans[name])):
+            print(f'  {label}:', plan.replace('\n', '\n    '))
+    print(f'\n{"median ms":<28} {"before":>8} {"after":>8}')
+    for name in before:
+        print(f'{name:<28} {before[name]:>8.3f} {after[name]:>8.3f}')
+
+
+if __name__ == '__main__':
+    setup_test_environment()
+    database = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        main(*(int(arg) for arg in sys.argv[1:]))
+    finally:
+        connection.creation.destroy_test_db(database, verbosity=0)
+        teardown_test_environment()
@@ -0,0 +1,94 @@
+import json
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from courses import audit
+from courses.audit import audit_students, get_rule_set
+from courses.models import Course, CoursePrereq, Major, MajorRequirement, Student, StudentRequirementProgress
+
+
+@override_settings(CATALOG_VERSION_TIMEOUT=3600)
+class AuditTestCase(TestCase):
+    def setUp(self):
+        # the catalog versions of the tests are the same, the rule set of another test must not be used
+        caches['default'].clear()
+        audit._rule_set = None
+        for course_id in ('CSCI-SHU 11', 'CSCI-SHU 210', 'CSCI-SHU 220', 'CSCI-SHU 360', 'MATH-SHU 131', 'MATH-SHU 140'):
+            Course.objects.create(id=course_id, name=course_id)
+        self.cs = Major.objects.create(name='CS')
+        self.math_core = Major.objects.create(name='Math', is_major=False)
+        self.required = MajorRequirement.objects.create(major=self.cs, count=1, elective=False)
+        self.required.courses.set(['CSCI-SHU 11'])
+        self.elective = MajorRequirement.objects.create(major=self.cs, count=2, elective=True)
+        self.elective.courses.set(['CSCI-SHU 210', 'CSCI-SHU 220', 'CSCI-SHU 360', 'MATH-SHU 140'])
+        self.core = MajorRequirement.objects.create(major=self.math_core, count=1, elective=False)
+        self.core.courses.set(['MATH-SHU 131', 'MATH-SHU 140'])
+        # 220 needs 210 and one of 131 or 11, 360 needs 220
+        for course_id, prereq_ids in (('CSCI-SHU 220', ['CSCI-SHU 210']), ('CSCI-SHU 220', ['MATH-SHU 131', 'CSCI-SHU 11']),
+                                      ('CSCI-SHU 360', ['CSCI-SHU 220'])):
+            CoursePrereq.objects.create(course_id=course_id).prereqs.set(prereq_ids)
+
+        self.student = Student.objects.create(user=User.objects.create_user(username='testuser'))
+        self.student.major.add(self.cs)
+        self.student.course_dict = {'Fall 2021': [
+            [course_id, course_id, '4'] for course_id in ('CSCI-SHU 11', 'CSCI-SHU 210', 'MATH-SHU 140', 'ECON-SHU 1')
+        ]}
+        self.student.sync_courses()
+
+    def test_audit(self):
+        rule_set = get_rule_set()
+        taken = rule_set.taken_mask(['CSCI-SHU 11', 'CSCI-SHU 210', 'MATH-SHU 140', 'ECON-SHU 1'])
+        audits = rule_set.audit(taken, [self.cs.id])
+        self.assertEqual([(audit.name, audit.complete) for audit in audits], [('Math', True), ('CS', True)])
+        self.assertEqual([requirement.satisfied for requirement in audits[1].requirements], [1, 2])
+        # the cores only without majors
+        self.assertEqual([audit.name for audit in rule_set.audit(taken)], ['Math'])
+        self.assertFalse(rule_set.audit(rule_set.taken_mask(['CSCI-SHU 11']), [self.cs.id])[1].complete)
+
+    def test_audit_matches_the_progress(self):
+        (student_id, audits), = list(audit_students([self.student.id]))
+        satisfied = {
+            requirement.requirement: requirement.satisfied for audit in audits for requirement in audit.requirements
+        }
+        self.assertEqual(satisfied, dict(
+            StudentRequirementProgress.objects.filter(student=self.student).values_list('requirement_id', 'satisfied')
+        ))
+
+    def test_eligible(self):
+        rule_set = get_rule_set()
+        for taken_ids in ([], ['CSCI-SHU 210'], ['CSCI-SHU 210', 'MATH-SHU 131'], ['CSCI-SHU 210', 'CSCI-SHU 11', 'CSCI-SHU 220']):
+            eligible = rule_set.course_ids_of(rule_set.eligible(rule_set.taken_mask(taken_ids)))
+            self.student.taken_courses.all().delete()
+            for course_id in taken_ids:
+                self.student.taken_courses.create(course_id=course_id, semester='Fall 2021')
+            expected = Course.objects.eligible_for(self.student).filter(major_requirements__isnull=False).exclude(
+                id__in=taken_ids).values_list('id', flat=True).distinct().order_by('id')
+            self.assertEqual(eligible, list(expected), taken_ids)
+
+    def test_compiled_once_per_catalog_version(self):
+        rule_set = get_rule_set()
+        with self.assertNumQueries(0):
+            self.assertIs(get_rule_set(), rule_set)
+        # a major added in the database is audited without code changes
+        data = Major.objects.create(name='Data Science')
+        MajorRequirement.objects.create(major=data, count=1, elective=False).courses.set(['MATH-SHU 131'])
+        rule_set = get_rule_set()
+        audit = rule_set.audit(rule_set.taken_mask(['MATH-SHU 131']), [data.id])[-1]
+        self.assertEqual((audit.name, audit.complete), ('Data Science', True))
+
+    def test_command(self):
+        out, err = StringIO(), StringIO()
+        call_command('audit_students', '--all', stdout=out, stderr=err)
+        result = json.loads(out.getvalue())
+        self.assertEqual(result['student'], self.student.id)
+        self.assertTrue(result['complete'])
+        self.assertEqual([program['major'] for program in result['programs']], ['Math', 'CS'])
+        self.assertIn('students/sec', err.getvalue())
+
+        out = StringIO()
+        call_command('audit_students', str(self.student.id), '--incomplete', stdout=out, stderr=err)
+        self.assertEqual(out.getvalue(), '')
@@ -0,0 +1,98 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from courses.models import Student
+from courses.recommendor.batch import BatchJob, recommend_batch
+
+
+class BatchRecommendTestCase(APITestCase):
+    def setUp(self):
+        with open(os.path.join(settings.BASE_DIR, "test/course_recommend_test/test_course_history.json")) as f:
+            self.course_history = json.load(f)
+        self.advisor = User.objects.create_user(username='advisor', password='advisorpassword', is_staff=True)
+        self.student = Student.objects.create(
+            user=User.objects.create_user(username='student', password='studentpassword'),
+            course_dict=self.course_history,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.advisor)
+        self.url = reverse('rec-courses-batch')
+
+    def test_recommend_batch_in_process_and_pool(self):
+        jobs = [
+            BatchJob('cs', self.course_history, 'chinese', False),
+            BatchJob('broken', {'Fall 2021': 5}, 'chinese', False),
+            BatchJob('new', {}, 'inter', True),
+        ]
+        for workers in (1, 2):
+            results = list(recommend_batch(jobs, workers=workers))
+            self.assertEqual([result['student'] for result in results], ['cs', 'broken', 'new'])
+            self.assertTrue(results[0]['valid'])
+            self.assertIn('error', results[1])
+            self.assertTrue(results[2]['valid'])
+
+    def test_batch_endpoint_streams_ndjson(self):
+        response = self.client.post(self.url, {
+            'identity': 'chinese', 'intense': 'false',
+            'students': [self.student.id, 12345],
+            'histories': [{'id': 'raw', 'course_dict': {}, 'identity': 'inter'}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([line['student'] for line in lines], [self.student.id, 12345, 'raw'])
+        self.assertTrue(lines[0]['valid'])
+        self.assertIn('error', lines[1])
+        self.assertIn('recommend_courses', lines[2])
+
+    def test_jobs_are_read_as_they_are_recommended(self):
+        read = []
+
+        def jobs():
+            for i in range(100):
+                read.append(i)
+                yield BatchJob(i, {}, 'inter', True)
+
+        results = recommend_batch(jobs(), workers=2, chunksize=4)
+        self.assertEqual(next(results)['student'], 0)
+        # two chunks per worker submitted, the rest not read yet
+        self.assertEqual(len(read), 16)
+        self.assertEqual([result['student'] for result in results], list(range(1, 100)))
+
+    @override_settings(BATCH_RECOMMEND_MAX_STUDENTS=2)
+    def test_batch_endpoint_too_many_students(self):
+        response = self.client.post(self.url, {
+            'identity': 'chinese',
+            'students': [self.student.id, 12345],
+            'histories': [{'id': 'raw', 'course_dict': {}}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+    def test_batch_endpoint_requires_advisor(self):
+        self.client.force_authenticate(user=self.student.user)
+        response = self.client.post(self.url, {'identity': 'chinese', 'students': [self.student.id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_batch_endpoint_missing_identity(self):
+        response = self.client.post(self.url, {'students': [self.student.id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_recommend_batch_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump({'raw': {}}, f)
+        self.addCleanup(os.remove, f.name)
+        out, err = StringIO(), StringIO()
+        call_command('recommend_batch', str(self.student.id), '--histories', f.name, '--workers', '1', stdout=out, stderr=err)
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([line['student'] for line in lines], [self.student.id, 'raw'])
+        self.assertIn('2 students, 0 failed', err.getvalue())
@@ -0,0 +1,112 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from courses.recommendor import catalog as catalog_module
+from courses.recommendor.catalog import CATALOG_PATHS, CatalogError, get_catalog
+
+
+class CourseCatalogTestCase(SimpleTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        paths = {}
+        for key, path in catalog_module.CATALOG_PATHS.items():
+            paths[key] = shutil.copy(path, self.tmp_dir)
+        self.paths = paths
+        patcher = patch.dict(catalog_module.CATALOG_PATHS, paths)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        # force a fresh load from the temporary copies
+        catalog_module._catalog = None
+
+    def tearDown(self):
+        catalog_module._catalog = None
+
+    def _touch(self, key, document):
+        path = self.paths[key]
+        stat = os.stat(path)
+        with open(path, 'w') as f:
+            json.dump(document, f)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def test_catalog_is_loaded_once(self):
+        catalog = get_catalog()
+        with patch.object(catalog_module, '_load_documents') as load:
+            self.assertIs(get_catalog(), catalog)
+            load.assert_not_called()
+
+    def test_catalog_reloads_when_file_changes(self):
+        catalog = get_catalog()
+        self._touch('ny_elective_courses', [["CS-UY 2164 ", "Intro to Programming in C", "4"]])
+        reloaded = get_catalog()
+        self.assertIsNot(reloaded, catalog)
+        self.assertNotEqual(reloaded.version, catalog.version)
+        self.assertEqual(reloaded.ny_elective_courses, (("CS-UY 2164", "Intro to Programming in C", 4),))
+
+    def test_catalog_uses_canonical_ids_and_pre_split_fields(self):
+        catalog = get_catalog()
+        self.assertEqual(catalog.major_groups[0], ('CSCI-SHU 11', 'CSCI-UA 2'))
+        ml = catalog.sh_electives_by_id['CSCI-SHU 360']
+        self.assertEqual(ml.prereq_groups[0], ('CSCI-SHU 11', 'CSCI-UA 2'))
+        ids = [course.id for courses in catalog.ny_core_courses.values() for course in courses]
+        self.assertTrue(all(course_id == course_id.strip() and '  ' not in course_id for course_id in ids))
+
+    def test_requirement_index(self):
+        catalog = get_catalog()
+        self.assertEqual(catalog.classify('MATH-UA 120'), (('major', 4, 4),))
+        # exact lookups, no substring matches
+        self.assertEqual(catalog.classify('MATH-UA 1'), ())
+        self.assertEqual(catalog.classify('CSCI-SHU 1'), ())
+        # cross-listed courses are indexed under both numbers
+        self.assertEqual(catalog.classify('TECH-UB 23'), (('ny_core', 'AT', 3),))
+        self.assertEqual(catalog.classify('INFO-UB 23'), (('ny_core', 'AT', 3),))
+        kinds = [requirement.kind for requirement in catalog.classify('CSCI-SHU 11')]
+        self.assertEqual(kinds, ['sh_core', 'major'])
+
+    def test_malformed_catalog_is_rejected(self):
+        self._touch('sh_core_courses', ["not", "a", "mapping"])
+        with self.assertRaises(CatalogError):
+            get_catalog()
+
+
+class DisplayCoreAPIViewTestCase(SimpleTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('core-courses-api')
+
+    def test_core_courses_by_location(self):
+        response = self.client.get(self.url, {'loc': 'SH'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.json()['course_lists']), set(get_catalog().sh_core_courses))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_gzip(self):
+        plain = self.client.get(self.url, {'loc': 'ny'})
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        response = self.client.get(self.url, {'loc': 'ny'}, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        # the file is served as it is
+        with open(CATALOG_PATHS['ny_core_courses']) as f:
+            self.assertEqual(json.loads(plain.content), {'course_lists': json.load(f)})
+
+    def test_browsable_api(self):
+        response = self.client.get(self.url, {'loc': 'ny', 'format': 'api'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['course_lists'], get_catalog().core_course_lists['ny'])
+
+    def test_invalid_location(self):
+        response = self.client.get(self.url, {'loc': '../../se_project/settings'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,87 @@
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from courses.catalog_version import VERSION_CACHE
+from courses.models import Course, CoursePrereq, Major, MajorRequirement
+
+
+# the cached version does not expire during a test
+@override_settings(CATALOG_VERSION_TIMEOUT=3600)
+class CatalogETagTestCase(APITestCase):
+    def setUp(self):
+        caches[VERSION_CACHE].clear()
+        self.client = APIClient()
+        cs = Major.objects.create(name='CS')
+        requirement = MajorRequirement.objects.create(major=cs, count=1, elective=False)
+        self.course = Course.objects.create(id='CSCI-SHU 210', name='Data Structures')
+        requirement.courses.add(self.course)
+        CoursePrereq.objects.create(course=self.course).prereqs.add(Course.objects.create(id='CSCI-SHU 11', name='Intro'))
+        self.urls = [
+            reverse('course-detail', args=['CSCI-SHU 210']),
+            reverse('major-detail', args=['cs']),
+            reverse('core-courses-api') + '?loc=sh',
+        ]
+
+    def test_not_modified(self):
+        for url in self.urls:
+            first = self.client.get(url)
+            self.assertEqual(first.status_code, status.HTTP_200_OK)
+            self.assertFalse(first['ETag'].startswith('W/'))
+            self.assertIn('must-revalidate', first['Cache-Control'])
+            # no query and no body, the version is cached
+            with self.assertNumQueries(0):
+                second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED, url)
+            self.assertEqual(second['ETag'], first['ETag'])
+            self.assertGreater(len(first.content), 0)
+            self.assertEqual(second.content, b'')
+
+    def test_gzip_has_its_own_etag(self):
+        url = self.urls[2]
+        plain = self.client.get(url)
+        zipped = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(zipped['Content-Encoding'], 'gzip')
+        self.assertNotEqual(zipped['ETag'], plain['ETag'])
+        # the identity ETag does not validate the gzip body
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=plain['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=zipped['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_savings(self):
+        # the course detail, whose queries grow with its prerequisites and majors
+        with CaptureQueriesContext(connection) as full:
+            first = self.client.get(self.urls[0])
+        with CaptureQueriesContext(connection) as conditional:
+            second = self.client.get(self.urls[0], HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual((len(full), len(first.content) > 200), (5, True))
+        self.assertEqual((len(conditional), len(second.content)), (0, 0))
+
+    def test_catalog_change_changes_etag(self):
+        etags = [self.client.get(url)['ETag'] for url in self.urls]
+        self.course.name = 'Data Structures and Algorithms'
+        self.course.save()
+        for url, etag in zip(self.urls[:2], etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn('Data Structures and Algorithms', response.content.decode())
+        # the core courses are read from the catalog files
+        self.assertEqual(self.client.get(self.urls[2], HTTP_IF_NONE_MATCH=etags[2]).status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_any_etag_needs_a_resource(self):
+        response = self.client.get(self.urls[0], HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        for url in (reverse('course-detail', args=['NOPE-SHU 1']), reverse('major-detail', args=['nope'])):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH='*')
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, url)
+
+    def test_errors_have_no_etag(self):
+        response = self.client.get(reverse('course-detail', args=['NOPE-SHU 1']))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(response.has_header('ETag'))
@@ -0,0 +1,100 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from courses.catalog_import import catalog_data, import_catalog
+from courses.catalog_version import VERSION_CACHE, get_catalog_version
+from courses.models import Course, CoursePrereq, Major, MajorRequirement, Student, StudentRequirementProgress
+from courses.recommendor.catalog import get_catalog
+
+
+@override_settings(CATALOG_VERSION_TIMEOUT=3600)
+class ImportCatalogTestCase(TestCase):
+    def setUp(self):
+        caches[VERSION_CACHE].clear()
+        self.data = catalog_data(get_catalog())
+
+    def requirements(self, name):
+        return sorted(
+            (requirement.count, requirement.elective, sorted(course.id for course in requirement.courses.all()))
+            for requirement in MajorRequirement.objects.filter(major__name=name)
+        )
+
+    def test_import(self):
+        version = get_catalog_version()
+        diff = import_catalog()
+        self.assertEqual(get_catalog_version(), version + 1)
+        self.assertEqual(len(diff.new_courses), len(self.data.courses))
+        self.assertEqual(Course.objects.get(id='CSCI-SHU 210').name, 'Data Structures')
+
+        self.assertEqual(
+            list(Major.objects.order_by('id').values_list('name', 'is_major')),
+            [('CS', True), ('AT', False), ('ED', False), ('Math', False), ('STS', False), ('IPC/HPC/SSPC', False)],
+        )
+        cs = self.requirements('CS')
+        # one requirement per group of interchangeable courses, and the electives
+        self.assertEqual(len(cs), len(get_catalog().major_groups) + 1)
+        self.assertIn((1, False, ['CSCI-SHU 11', 'CSCI-UA 2']), cs)
+        self.assertEqual([(count, elective) for count, elective, courses in self.requirements('IPC/HPC/SSPC')], [(2, False)])
+        self.assertFalse(Major.objects.filter(name__in=['IPC', 'Language']).exists())
+
+        # 360 needs one course of every set of its catalog entry
+        self.assertEqual(
+            sorted(sorted(prereq.prereqs.values_list('id', flat=True)) for prereq in CoursePrereq.objects.filter(course='CSCI-SHU 360')),
+            sorted(sorted(group) for group in self.data.prereqs['CSCI-SHU 360']),
+        )
+
+    def test_unchanged(self):
+        import_catalog()
+        version = get_catalog_version()
+        # read the courses, majors, requirements, their courses and the prerequisites, write nothing
+        with self.assertNumQueries(5):
+            diff = import_catalog()
+        self.assertFalse(diff)
+        self.assertEqual(diff.summary(), [])
+        self.assertEqual(get_catalog_version(), version)
+
+    def test_diff(self):
+        import_catalog()
+        Course.objects.filter(id='CSCI-SHU 210').update(name='Old name', description='Kept')
+        Course.objects.create(id='CSCI-SHU 999', name='From a history')
+        cs = Major.objects.get(name='CS')
+        kept = MajorRequirement.objects.filter(major=cs, elective=True).get()
+        kept.courses.remove('CSCI-SHU 360')
+        # a requirement imported twice
+        MajorRequirement.objects.create(major=cs, count=4, elective=True).courses.set(kept.courses.all())
+        CoursePrereq.objects.filter(course='CSCI-SHU 360').first().delete()
+        student = Student.objects.create(user=User.objects.create_user(username='testuser'))
+        student.major.add(cs)
+        student.taken_courses.create(course_id='CSCI-SHU 360', semester='Fall 2021')
+
+        diff = import_catalog()
+        self.assertEqual(diff.summary(), [
+            'courses: 0 created, 1 updated, 0 deleted',
+            'requirements: 0 created, 1 updated, 1 deleted',
+            'prerequisite sets: 1 created, 0 updated, 0 deleted',
+        ])
+        course = Course.objects.get(id='CSCI-SHU 210')
+        self.assertEqual((course.name, course.description), ('Data Structures', 'Kept'))
+        self.assertTrue(Course.objects.filter(id='CSCI-SHU 999').exists())
+        # the requirement changed keeps its id, and the progress of the students follows it
+        self.assertEqual(MajorRequirement.objects.get(major=cs, elective=True).id, kept.id)
+        self.assertEqual(StudentRequirementProgress.objects.get(student=student, requirement=kept).courses, ['CSCI-SHU 360'])
+        self.assertEqual(CoursePrereq.objects.filter(course='CSCI-SHU 360').count(), len(self.data.prereqs['CSCI-SHU 360']))
+        self.assertFalse(import_catalog())
+
+    def test_command(self):
+        out = StringIO()
+        call_command('import_catalog', '--dry-run', stdout=out)
+        self.assertIn('dry run', out.getvalue())
+        self.assertFalse(Course.objects.exists())
+
+        out = StringIO()
+        call_command('import_catalog', stdout=out)
+        self.assertIn(f'courses: {len(self.data.courses)} created', out.getvalue())
+        out = StringIO()
+        call_command('import_catalog', stdout=out)
+        self.assertEqual(out.getvalue(), 'catalog unchanged\n')
@@ -0,0 +1,74 @@
+from importlib import import_module
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+
+from courses.course_id import canonical_course_id, course_id_aliases, split_course_title
+from courses.models import Course, CoursePrereq, Major, MajorRequirement, Student, StudentRequirementProgress, StudentTakenCourse
+
+
+class CourseIdTestCase(SimpleTestCase):
+    def test_canonical_course_id(self):
+        for course_id in ['CSCI-SHU - 220', 'CSCI-SHU 220', ' csci-shu  220 ', 'CSCI-SHU-220']:
+            self.assertEqual(canonical_course_id(course_id), 'CSCI-SHU 220')
+        self.assertEqual(canonical_course_id('CHIN-SHU 301a'), 'CHIN-SHU 301A')
+        self.assertEqual(canonical_course_id(''), '')
+
+    def test_canonical_course_id_is_interned(self):
+        self.assertIs(canonical_course_id('CSCI-SHU - 220'), canonical_course_id(''.join(['CSCI-SHU', ' 220'])))
+
+    def test_cross_listed_course(self):
+        self.assertEqual(canonical_course_id('INFO-UB 23 / TECH-UB  23'), 'INFO-UB 23/TECH-UB 23')
+        self.assertEqual(course_id_aliases('INFO-UB 23/TECH-UB 23'), ('INFO-UB 23', 'TECH-UB 23'))
+        self.assertEqual(course_id_aliases('CSCI-SHU - 220'), ('CSCI-SHU 220',))
+
+    def test_split_course_title(self):
+        self.assertEqual(split_course_title('CSCI-SHU 11 Introduction to Computer Programming'),
+                         ('CSCI-SHU 11', 'Introduction to Computer Programming'))
+        self.assertEqual(split_course_title('CSCI-SHU 11'), ('CSCI-SHU 11', ''))
+        with self.assertRaises(ValueError):
+            split_course_title('Introduction to Computer Programming')
+
+
+class CanonicalCourseIdMigrationTestCase(TestCase):
+    def setUp(self):
+        # 'CSCI-SHU - 220' is renamed, 'MATH-SHU - 131' is merged into 'MATH-SHU 131'
+        for course_id, credit in (('CSCI-SHU - 220', 4), ('MATH-SHU - 131', 4), ('MATH-SHU 131', 2)):
+            Course.objects.create(id=course_id, name=course_id, credit=credit)
+        self.student = Student.objects.create(user=User.objects.create_user(username='testuser'), course_dict={
+            'Fall 2021': [['CSCI-SHU - 220', 'Algorithms', '4'], ['MATH-SHU - 131', 'Calculus', '4']],
+        })
+        for course_id, semester in (('CSCI-SHU - 220', 'Fall 2021'), ('MATH-SHU - 131', 'Fall 2021'),
+                                    ('MATH-SHU 131', 'Fall 2021'), ('MATH-SHU - 131', 'Spring 2022')):
+            StudentTakenCourse.objects.create(student=self.student, course_id=course_id, semester=semester)
+        self.requirement = MajorRequirement.objects.create(major=Major.objects.create(name='CS'), count=1)
+        self.requirement.courses.set(['CSCI-SHU - 220', 'MATH-SHU - 131', 'MATH-SHU 131'])
+        CoursePrereq.objects.create(course_id='CSCI-SHU - 220').prereqs.set(['MATH-SHU - 131', 'MATH-SHU 131'])
+        self.progress = StudentRequirementProgress.objects.create(
+            student=self.student, requirement=self.requirement, satisfied=3, credits=10,
+            courses=['CSCI-SHU - 220', 'MATH-SHU - 131', 'MATH-SHU 131'],
+        )
+
+    def test_migration_canonicalizes_the_stored_ids(self):
+        migration = import_module('courses.migrations.0009_canonical_course_ids')
+        migration.canonicalize_course_ids(apps, None)
+
+        self.assertEqual(set(Course.objects.values_list('id', 'credit')), {('CSCI-SHU 220', 4), ('MATH-SHU 131', 2)})
+        self.assertEqual(set(self.student.taken_courses.values_list('course_id', 'semester')), {
+            ('CSCI-SHU 220', 'Fall 2021'), ('MATH-SHU 131', 'Fall 2021'), ('MATH-SHU 131', 'Spring 2022'),
+        })
+        self.assertEqual(sorted(self.requirement.courses.values_list('id', flat=True)), ['CSCI-SHU 220', 'MATH-SHU 131'])
+        prereq = CoursePrereq.objects.get()
+        self.assertEqual((prereq.course_id, list(prereq.prereqs.values_list('id', flat=True))), ('CSCI-SHU 220', ['MATH-SHU 131']))
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.course_dict, {
+            'Fall 2021': [['CSCI-SHU 220', 'Algorithms', '4'], ['MATH-SHU 131', 'Calculus', '4']],
+        })
+        self.progress.refresh_from_db()
+        self.assertEqual((self.progress.satisfied, self.progress.credits, self.progress.courses),
+                         (2, 6, ['CSCI-SHU 220', 'MATH-SHU 131']))
+
+        # canonical ids are left as they are
+        migration.canonicalize_course_ids(apps, None)
+        self.assertEqual(self.student.taken_courses.count(), 3)
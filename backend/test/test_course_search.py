@@ -0,0 +1,92 @@
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from courses import search
+from courses.models import Course
+from courses.search import CourseSearchIndex
+
+
+COURSES = [
+    ('CSCI-SHU 11', 'Introduction to Computer Programming', '', 4),
+    ('CSCI-SHU 210', 'Data Structures', 'Lists, trees, hash tables and graphs', 4),
+    ('CSCI-SHU 220', 'Algorithms', 'Sorting, graph algorithms and dynamic programming', 4),
+    ('CSCI-SHU 360', 'Machine Learning', 'Supervised and unsupervised learning', 4),
+    ('MATH-SHU 131', 'Calculus', '', 4),
+    ('MATH-SHU 140', 'Linear Algebra', 'Matrices and vector spaces', 4),
+    ('CCSF-SHU 123', 'Cont Chinese Political Thought', '', 4),
+]
+
+
+class CourseSearchIndexTestCase(SimpleTestCase):
+    def setUp(self):
+        self.index = CourseSearchIndex(1, sorted(COURSES))
+
+    def ids(self, query, **kwargs):
+        return [hit.id for hit in self.index.search(query, **kwargs)[1]]
+
+    def test_words(self):
+        self.assertEqual(self.ids('algorithms'), ['CSCI-SHU 220'])
+        self.assertEqual(self.ids('Machine Learning')[0], 'CSCI-SHU 360')
+        # stop words are dropped, the name counts more than the description
+        self.assertEqual(self.ids('graph and the data'), ['CSCI-SHU 210', 'CSCI-SHU 220'])
+
+    def test_typos_and_prefixes(self):
+        self.assertEqual(self.ids('algoritms'), ['CSCI-SHU 220'])
+        self.assertEqual(self.ids('machne lerning')[0], 'CSCI-SHU 360')
+        self.assertEqual(self.ids('calc'), ['MATH-SHU 131'])
+        self.assertEqual(self.ids('progr')[:2], ['CSCI-SHU 11', 'CSCI-SHU 220'])
+        self.assertEqual(self.ids('xylophone'), [])
+
+    def test_course_ids(self):
+        self.assertEqual(self.ids('CSCI-SHU 210')[0], 'CSCI-SHU 210')
+        self.assertEqual(self.ids('cscishu210')[0], 'CSCI-SHU 210')
+        self.assertEqual(self.ids('csci-shu 2')[:2], ['CSCI-SHU 210', 'CSCI-SHU 220'])
+        # numbers are not typo tolerant
+        self.assertEqual(self.ids('141'), [])
+        self.assertEqual(self.ids('MATH-SHU 141')[:2], ['MATH-SHU 131', 'MATH-SHU 140'])
+
+    def test_pagination(self):
+        count, hits = self.index.search('shu', limit=3)
+        self.assertEqual(count, len(COURSES))
+        pages = [hit.id for offset in range(0, count, 3) for hit in self.index.search('shu', offset=offset, limit=3)[1]]
+        # ties are ordered by course id
+        self.assertEqual(pages, sorted(course[0] for course in COURSES))
+
+
+@override_settings(CATALOG_VERSION_TIMEOUT=3600)
+class CourseSearchAPIViewTestCase(APITestCase):
+    def setUp(self):
+        caches['default'].clear()
+        search._index = None
+        self.addCleanup(setattr, search, '_index', None)
+        self.client = APIClient()
+        self.url = reverse('course-search')
+        Course.objects.bulk_create(
+            Course(id=course_id, name=name, description=description, credit=credit)
+            for course_id, name, description, credit in COURSES
+        )
+
+    def test_search(self):
+        self.client.get(self.url, {'q': 'warm'})
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {'q': 'data structres', 'page_size': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['page_size'], 1)
+        self.assertEqual(response.data['results'][0]['id'], 'CSCI-SHU 210')
+        self.assertEqual(len(response.data['results']), 1)
+        # not a course id
+        self.assertEqual(reverse('course-search'), '/api/courses/search')
+
+    def test_catalog_change(self):
+        self.assertEqual(self.client.get(self.url, {'q': 'robotics'}).data['count'], 0)
+        Course.objects.create(id='CSCI-SHU 365', name='Robotics')
+        response = self.client.get(self.url, {'q': 'robotics'})
+        self.assertEqual([course['id'] for course in response.data['results']], ['CSCI-SHU 365'])
+
+    def test_bad_parameters(self):
+        for params in ({}, {'q': ' '}, {'q': 'data', 'page': 0}, {'q': 'data', 'page_size': 101}, {'q': 'data', 'page': 'x'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
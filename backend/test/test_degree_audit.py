@@ -0,0 +1,166 @@
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from courses.models import Course, Major, MajorRequirement, Student, StudentRequirementProgress, StudentTakenCourse
+from courses.progress import check_progress
+from courses.transcript_import import ParsedFile, import_histories
+
+
+class DegreeAuditTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.student = Student.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        for course_id, credit in (('CSCI-SHU 11', 4), ('CSCI-SHU 210', 4), ('CSCI-SHU 220', 4),
+                                  ('CSCI-SHU 360', 4), ('MATH-SHU 131', 4), ('MATH-SHU 140', 2)):
+            Course.objects.create(id=course_id, name=course_id, credit=credit)
+        self.cs = Major.objects.create(name='CS')
+        self.math_core = Major.objects.create(name='Math', is_major=False)
+        self.required = MajorRequirement.objects.create(major=self.cs, count=1, elective=False)
+        self.required.courses.set(['CSCI-SHU 11'])
+        self.elective = MajorRequirement.objects.create(major=self.cs, count=2, elective=True)
+        self.elective.courses.set(['CSCI-SHU 210', 'CSCI-SHU 220', 'CSCI-SHU 360', 'MATH-SHU 140'])
+        self.core = MajorRequirement.objects.create(major=self.math_core, count=1, elective=False)
+        self.core.courses.set(['MATH-SHU 131', 'MATH-SHU 140'])
+
+    def sync(self, history):
+        self.student.course_dict = {
+            semester: [[course_id, course_id, '4'] for course_id in courses] for semester, courses in history.items()
+        }
+        self.student.sync_courses()
+        self.student.save()
+
+    def progress(self):
+        return {
+            progress.requirement_id: (progress.satisfied, progress.credits, progress.courses)
+            for progress in StudentRequirementProgress.objects.filter(student=self.student)
+        }
+
+    def test_progress_follows_the_taken_courses(self):
+        # without a major only the cores are audited
+        self.sync({'Fall 2021': ['CSCI-SHU 11', 'MATH-SHU 140']})
+        self.assertEqual(self.progress(), {self.core.id: (1, 2, ['MATH-SHU 140'])})
+
+        self.student.major.add(self.cs)
+        self.assertEqual(self.progress(), {
+            self.required.id: (1, 4, ['CSCI-SHU 11']),
+            self.elective.id: (1, 2, ['MATH-SHU 140']),
+            self.core.id: (1, 2, ['MATH-SHU 140']),
+        })
+
+        # a course taken twice counts once, courses no longer taken are removed
+        self.sync({
+            'Fall 2021': ['MATH-SHU 140', 'CSCI-SHU 210'],
+            'Spring 2022': ['CSCI-SHU 210', 'CSCI-SHU 220', 'MATH-SHU 131'],
+        })
+        self.assertEqual(self.progress(), {
+            self.required.id: (0, 0, []),
+            self.elective.id: (3, 10, ['CSCI-SHU 210', 'CSCI-SHU 220', 'MATH-SHU 140']),
+            self.core.id: (2, 6, ['MATH-SHU 131', 'MATH-SHU 140']),
+        })
+        self.assertEqual(check_progress([self.student.id]), [])
+
+        self.student.major.remove(self.cs)
+        self.assertEqual(set(self.progress()), {self.core.id})
+
+    def test_audit(self):
+        self.student.major.add(self.cs)
+        self.sync({'Fall 2021': ['CSCI-SHU 11', 'CSCI-SHU 210']})
+        self.user = User.objects.get(id=self.user.id)
+        self.client.force_authenticate(user=self.user)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('degree-audit'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['credit'], 8)
+        audit = {(row['major'], row['elective']): row for row in response.data['requirements']}
+        self.assertEqual(set(audit), {('CS', False), ('CS', True), ('Math', False)})
+        self.assertTrue(audit['CS', False]['complete'])
+        self.assertEqual(audit['CS', True]['courses'], ['CSCI-SHU 210'])
+        self.assertFalse(audit['CS', True]['complete'])
+        self.assertEqual(audit['Math', False]['satisfied'], 0)
+
+    def test_audit_without_student(self):
+        self.client.force_authenticate(user=User.objects.create_user(username='other'))
+        response = self.client.get(reverse('degree-audit'))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_import_writes_the_progress(self):
+        import_histories([ParsedFile('testuser.html', 'testuser', {'Fall 2021': [['MATH-SHU - 131', 'Calculus', '4']]}, None)])
+        self.assertEqual(self.progress(), {self.core.id: (1, 4, ['MATH-SHU 131'])})
+
+    def test_requirement_courses_refresh_the_progress(self):
+        self.student.major.add(self.cs)
+        self.sync({'Fall 2021': ['CSCI-SHU 11', 'CSCI-SHU 360', 'MATH-SHU 140']})
+        self.required.courses.add('CSCI-SHU 360')
+        self.assertEqual(self.progress()[self.required.id], (2, 8, ['CSCI-SHU 11', 'CSCI-SHU 360']))
+        self.core.courses.remove('MATH-SHU 140')
+        self.assertEqual(self.progress()[self.core.id], (0, 0, []))
+        Course.objects.get(id='CSCI-SHU 11').major_requirements.clear()
+        self.assertEqual(self.progress()[self.required.id], (1, 4, ['CSCI-SHU 360']))
+        self.elective.courses.clear()
+        self.assertEqual(self.progress()[self.elective.id], (0, 0, []))
+        self.assertEqual(check_progress([self.student.id]), [])
+
+    def test_taken_courses_refresh_the_progress(self):
+        self.student.major.add(self.cs)
+        with self.captureOnCommitCallbacks(execute=True):
+            taken = StudentTakenCourse.objects.create(student=self.student, course_id='CSCI-SHU 11', semester='Fall 2021')
+        self.assertEqual(self.progress()[self.required.id], (1, 4, ['CSCI-SHU 11']))
+        with self.captureOnCommitCallbacks(execute=True):
+            taken.course_id = 'MATH-SHU 131'
+            taken.save()
+        self.assertEqual(self.progress()[self.required.id], (0, 0, []))
+        self.assertEqual(self.progress()[self.core.id], (1, 4, ['MATH-SHU 131']))
+        with self.captureOnCommitCallbacks(execute=True):
+            taken.delete()
+        self.assertEqual(self.progress()[self.core.id], (0, 0, []))
+        self.assertEqual(check_progress([self.student.id]), [])
+
+        # the taken courses of a deleted student refresh nothing
+        self.sync({'Fall 2021': ['CSCI-SHU 11']})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.delete()
+        self.assertFalse(StudentRequirementProgress.objects.exists())
+
+    def test_sync_refreshes_the_progress_once(self):
+        self.sync({'Fall 2021': ['CSCI-SHU 11', 'MATH-SHU 131']})
+        # the deleted taken course does not refresh the progress again after the commit
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.sync({'Fall 2021': ['CSCI-SHU 11']})
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.progress(), {self.core.id: (0, 0, [])})
+
+    def test_migration_backfills_the_progress(self):
+        self.student.major.add(self.cs)
+        self.sync({'Fall 2021': ['CSCI-SHU 11', 'MATH-SHU 140']})
+        expected = self.progress()
+        StudentRequirementProgress.objects.all().delete()
+        StudentRequirementProgress.objects.create(student=self.student, requirement=self.core, satisfied=5)
+        migration = import_module('courses.migrations.0008_backfill_requirement_progress')
+        migration.backfill_progress(apps, None)
+        self.assertEqual(self.progress(), expected)
+
+    def test_rebuild(self):
+        self.student.major.add(self.cs)
+        self.sync({'Fall 2021': ['CSCI-SHU 11', 'CSCI-SHU 360']})
+        expected = self.progress()
+        # a requirement changed without the progress following it
+        StudentRequirementProgress.objects.filter(requirement=self.elective).update(satisfied=0, courses=[])
+        self.assertEqual(check_progress([self.student.id]), [self.student.id])
+        out, err = StringIO(), StringIO()
+        with self.assertRaises(CommandError):
+            call_command('rebuild_progress', '--check', stdout=out, stderr=err)
+        self.assertIn(f'student {self.student.id}', err.getvalue())
+
+        call_command('rebuild_progress', '--batch-size', '1', stdout=out)
+        self.assertEqual(self.progress(), expected)
+        call_command('rebuild_progress', '--check', stdout=out, stderr=err)
+        self.assertIn('0 with a wrong progress', out.getvalue())
@@ -0,0 +1,62 @@
+import random
+
+from django.test import SimpleTestCase
+
+from courses.recommendor.catalog import get_catalog
+from courses.recommendor.recommendor import ElectivePool, Recommendor
+
+
+class ElectivePoolTestCase(SimpleTestCase):
+    def test_draws_without_replacement(self):
+        groups = [(('A', 'a', 4),), (('B', 'b1', 4), ('B', 'b2', 4)), (('C', 'c', 4),)]
+        pool = ElectivePool(groups)
+        rng = random.Random(0)
+        drawn = [pool.draw(rng) for _ in range(3)]
+        self.assertEqual(sorted(course[0] for course in drawn), ['A', 'B', 'C'])
+        self.assertIsNone(pool.draw(rng))
+        # copies are independent
+        self.assertEqual(len(ElectivePool(groups).copy()), 3)
+
+
+class ElectiveStressTestCase(SimpleTestCase):
+    """Histories that took nearly every elective, the old rejection loop could spin for ever on them."""
+
+    def setUp(self):
+        catalog = get_catalog()
+        self.left = [group[0].id for group in catalog.ny_elective_groups[:2]]
+        taken = [group[0] for group in catalog.ny_elective_groups[2:]] + list(catalog.sh_elective_courses)
+        self.course_history = {'Fall 2020': [[course.id, course.name, '4', 'A'] for course in taken]}
+        self.taken_ids = {course.id for course in taken}
+
+    def check(self, recommend):
+        recommended = [' '.join(course.split()[:2]) for courses in recommend.values() for course in courses]
+        electives = [course_num for course_num in recommended if course_num in get_catalog().ny_electives_by_id]
+        self.assertEqual(len(electives), len(set(electives)))
+        self.assertFalse(set(electives) & self.taken_ids)
+        self.assertTrue(set(electives) <= set(self.left))
+        for courses in recommend.values():
+            self.assertEqual(len(courses), 4)
+
+    def test_greedy(self):
+        for seed in range(200):
+            for tense in [False, True]:
+                valid, recommend = Recommendor(self.course_history, 'chinese', tense, seed=seed).recommend()
+                self.check(recommend)
+
+    def test_search(self):
+        for seed in range(50):
+            valid, recommend = Recommendor(self.course_history, 'inter', True, seed=seed).recommend_search()
+            self.check(recommend)
+
+    def test_plans(self):
+        plans = Recommendor(self.course_history, 'chinese', True, seed=0).recommend_plans(5)
+        for valid, recommend in plans:
+            self.check(recommend)
+
+    def test_one_elective_per_semester_once_enough(self):
+        # with 5 electives taken a NY semester still gets its one elective
+        catalog = get_catalog()
+        course_history = {'Fall 2020': [[course.id, course.name, '4', 'A'] for course in catalog.sh_elective_courses[:5]]}
+        valid, recommend = Recommendor(course_history, 'chinese', False, seed=0).recommend()
+        junior = [' '.join(course.split()[:2]) for course in recommend['junior_2nd']]
+        self.assertTrue(any(course_num in catalog.ny_electives_by_id for course_num in junior), recommend['junior_2nd'])
@@ -0,0 +1,81 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from courses.models import Course, CoursePrereq, Student, StudentTakenCourse
+
+
+class EligibleCoursesTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.student = Student.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        courses = {
+            course_id: Course.objects.create(id=course_id, name=course_id)
+            for course_id in ('CSCI-SHU 11', 'MATH-SHU 131', 'CSCI-SHU 210', 'CSCI-SHU 220', 'CSCI-SHU 360', 'CSCI-SHU 999')
+        }
+        # 210 needs 11, 220 needs 210 and one of 131 or 11, 360 needs 220, 999 has an empty set
+        for course_id, prereq_sets in {
+            'CSCI-SHU 210': [['CSCI-SHU 11']],
+            'CSCI-SHU 220': [['CSCI-SHU 210'], ['MATH-SHU 131', 'CSCI-SHU 11']],
+            'CSCI-SHU 360': [['CSCI-SHU 220']],
+            'CSCI-SHU 999': [[]],
+        }.items():
+            for prereq_ids in prereq_sets:
+                prereq = CoursePrereq.objects.create(course=courses[course_id])
+                prereq.prereqs.set([courses[prereq_id] for prereq_id in prereq_ids])
+        self.courses = courses
+
+    def take(self, *course_ids):
+        for course_id in course_ids:
+            StudentTakenCourse.objects.create(student=self.student, course=self.courses[course_id], semester='Fall 2021')
+
+    def eligible(self):
+        response = self.client.get(reverse('eligible-courses'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [course['id'] for course in response.data['courses']]
+
+    def test_eligible_courses(self):
+        self.assertEqual(self.eligible(), ['CSCI-SHU 11', 'MATH-SHU 131'])
+        self.take('CSCI-SHU 11')
+        self.assertEqual(self.eligible(), ['CSCI-SHU 210', 'MATH-SHU 131'])
+        self.take('CSCI-SHU 210')
+        self.assertEqual(self.eligible(), ['CSCI-SHU 220', 'MATH-SHU 131'])
+
+    def test_validate_student(self):
+        self.take('MATH-SHU 131', 'CSCI-SHU 210')
+        self.assertTrue(self.courses['CSCI-SHU 220'].validate_student(self.student))
+        self.assertFalse(self.courses['CSCI-SHU 360'].validate_student(self.student))
+        self.assertFalse(self.courses['CSCI-SHU 999'].validate_student(self.student))
+        self.assertTrue(self.courses['CSCI-SHU 11'].validate_student(self.student))
+        # the taken courses, the prerequisites and the course
+        with CaptureQueriesContext(connection) as queries:
+            self.courses['CSCI-SHU 220'].validate_student(self.student)
+        self.assertEqual(len(queries), 3)
+        # only the prerequisites of the course are read, not those of the catalog
+        prereq_sql, = [query['sql'] for query in queries if 'courses_courseprereq' in query['sql']]
+        self.assertIn("'CSCI-SHU 220'", prereq_sql)
+
+    def test_queries_do_not_grow_with_the_catalog(self):
+        self.take('CSCI-SHU 11')
+        # the student, its taken courses, the prerequisites and the eligible courses,
+        # the user is loaded again as in a new request
+        self.client.force_authenticate(user=User.objects.get(id=self.user.id))
+        with self.assertNumQueries(4):
+            self.eligible()
+        for i in range(200):
+            course = Course.objects.create(id=f'TEST-SHU {i}', name=f'Test {i}')
+            for j in range(3):
+                prereq = CoursePrereq.objects.create(course=course)
+                prereq.prereqs.set([self.courses['CSCI-SHU 11'], self.courses['MATH-SHU 131']][:j % 2 + 1])
+        self.client.force_authenticate(user=User.objects.get(id=self.user.id))
+        with self.assertNumQueries(4):
+            self.assertEqual(len(self.eligible()), 202)
+
+    def test_no_student(self):
+        self.client.force_authenticate(user=User.objects.create_user(username='other', password='testpassword123'))
+        self.assertEqual(self.client.get(reverse('eligible-courses')).status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,64 @@
+from django.core.cache import caches
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from courses.catalog_version import catalog_import, get_catalog_version
+from courses.models import Course, Major, MajorRequirement
+from courses.snapshots import SNAPSHOT_CACHE
+
+
+# the cached version does not expire during a test
+@override_settings(CATALOG_VERSION_TIMEOUT=3600)
+class MajorDetailTestCase(APITestCase):
+    def setUp(self):
+        caches[SNAPSHOT_CACHE].clear()
+        self.client = APIClient()
+        cs = Major.objects.create(name='CS')
+        for i in range(10):
+            requirement = MajorRequirement.objects.create(major=cs, count=1, elective=bool(i % 2))
+            requirement.courses.set(
+                Course.objects.create(id=f'CSCI-SHU {i}{j}', name=f'Course {i}{j}') for j in range(3)
+            )
+        self.url = reverse('major-detail', args=['cs'])
+
+    def test_requirements(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        requirements = response.json()['requirements']
+        self.assertEqual(len(requirements), 10)
+        self.assertEqual(requirements[1][:2], [1, 'Elective'])
+        self.assertEqual([course['id'] for course in requirements[0][2]], ['CSCI-SHU 00', 'CSCI-SHU 01', 'CSCI-SHU 02'])
+
+    def test_snapshot_is_built_once_then_served_without_queries(self):
+        # the major, its requirements and their courses, the version is cached since the catalog changed
+        with self.assertNumQueries(3):
+            first = self.client.get(self.url)
+        # none, the version is cached too
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse('major-detail', args=['CS']))
+        self.assertEqual(first.content, second.content)
+
+    def test_catalog_change_rebuilds(self):
+        self.client.get(self.url)
+        version = get_catalog_version()
+        course = Course.objects.get(id='CSCI-SHU 00')
+        course.name = 'Renamed'
+        course.save()
+        self.assertEqual(get_catalog_version(), version + 1)
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()['requirements'][0][2][0]['name'], 'Renamed')
+
+    def test_import_bumps_once(self):
+        version = get_catalog_version()
+        with catalog_import():
+            Major.objects.create(name='Data Science')
+            MajorRequirement.objects.create(major=Major.objects.get(name='CS')).courses.add('CSCI-SHU 00')
+        self.assertEqual(get_catalog_version(), version + 1)
+
+    def test_unknown_major(self):
+        for i in range(2):
+            response = self.client.get(reverse('major-detail', args=['history']))
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIsNone(caches[SNAPSHOT_CACHE].get(f'major-snapshot:{get_catalog_version()}:history'))
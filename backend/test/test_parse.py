@@ -17,12 +17,12 @@ if __name__ == '__main__':
     file_idx = 0
 
     correct_course_dict = [
-        {'Spring 2024': [['CSCI-SHU - 220', 'Algorithms', '4'], ['CSCI-SHU - 410', 'Software Engineering', '4'], ['CSCI-SHU - 997', 'Computer Sci Independent Study', '4']]},
-        {'Spring 2024': [['CSCI-SHU - 220', 'Algorithms', '4'], ['CSCI-SHU - 410', 'Software Engineering', '4'], ['CSCI-SHU - 997', 'Computer Sci Independent Study', '4']], 'Fall 2023': [['MUS-SHU - 152', 'Group Guqin, All Levels', '2'], ['CCSF-SHU - 123', 'Cont Chinese Political Thought', '4'], ['CSCI-SHU - 375', 'Reinforcement Learning', '4'], ['CSCI-SHU - 420', 'CS Senior Project', '4']]},
-        {'Spring 2024': [['CSCI-SHU - 220', 'Algorithms', '4'], ['CSCI-SHU - 410', 'Software Engineering', '4'], ['CSCI-SHU - 997', 'Computer Sci Independent Study', '4']], 'Fall 2023': [['MUS-SHU - 152', 'Group Guqin, All Levels', '2'], ['CCSF-SHU - 123', 'Cont Chinese Political Thought', '4'], ['CSCI-SHU - 375', 'Reinforcement Learning', '4'], ['CSCI-SHU - 420', 'CS Senior Project', '4']], 'Fall 2022': [['CAMS-UA - 110', 'The Science of Happiness', '4'], ['MATH-UA - 120', 'Discrete Mathematics', '4'], ['CSCI-UA - 202', 'Operating Systems', '4'], ['NUTR-UE - 119', 'Nutrition and Health', '3']]},
-        {'Fall 2022': [['CAMS-UA - 110', 'The Science of Happiness', ''], ['MATH-UA - 120', 'Discrete Mathematics', '4'], ['CSCI-UA - 202', 'Operating Systems', '4'], ['NUTR-UE - 119', 'Nutrition and Health', '3']]},
-        {'Fall 2022': [['CAMS-UA - 110', 'The Science of Happiness', '4'], ['MATH-UA - 120', 'Discrete Mathematics', '4'], ['CSCI-UA - 202', '', '4'], ['NUTR-UE - 119', 'Nutrition and Health', '3']]},
-        {'Fall 2022': [['CAMS-UA - 110', 'The Science of Happiness', '4'], ['MATH-UA - 120', 'Discrete Mathematics', '4'], ['CSCI-UA - 202', 'Operating Systems', '4'], ['NUTR-UE - 119', 'Nutrition and Health', '3']]},
+        {'Spring 2024': [['CSCI-SHU 220', 'Algorithms', '4'], ['CSCI-SHU 410', 'Software Engineering', '4'], ['CSCI-SHU 997', 'Computer Sci Independent Study', '4']]},
+        {'Spring 2024': [['CSCI-SHU 220', 'Algorithms', '4'], ['CSCI-SHU 410', 'Software Engineering', '4'], ['CSCI-SHU 997', 'Computer Sci Independent Study', '4']], 'Fall 2023': [['MUS-SHU 152', 'Group Guqin, All Levels', '2'], ['CCSF-SHU 123', 'Cont Chinese Political Thought', '4'], ['CSCI-SHU 375', 'Reinforcement Learning', '4'], ['CSCI-SHU 420', 'CS Senior Project', '4']]},
+        {'Spring 2024': [['CSCI-SHU 220', 'Algorithms', '4'], ['CSCI-SHU 410', 'Software Engineering', '4'], ['CSCI-SHU 997', 'Computer Sci Independent Study', '4']], 'Fall 2023': [['MUS-SHU 152', 'Group Guqin, All Levels', '2'], ['CCSF-SHU 123', 'Cont Chinese Political Thought', '4'], ['CSCI-SHU 375', 'Reinforcement Learning', '4'], ['CSCI-SHU 420', 'CS Senior Project', '4']], 'Fall 2022': [['CAMS-UA 110', 'The Science of Happiness', '4'], ['MATH-UA 120', 'Discrete Mathematics', '4'], ['CSCI-UA 202', 'Operating Systems', '4'], ['NUTR-UE 119', 'Nutrition and Health', '3']]},
+        {'Fall 2022': [['CAMS-UA 110', 'The Science of Happiness', ''], ['MATH-UA 120', 'Discrete Mathematics', '4'], ['CSCI-UA 202', 'Operating Systems', '4'], ['NUTR-UE 119', 'Nutrition and Health', '3']]},
+        {'Fall 2022': [['CAMS-UA 110', 'The Science of Happiness', '4'], ['MATH-UA 120', 'Discrete Mathematics', '4'], ['CSCI-UA 202', '', '4'], ['NUTR-UE 119', 'Nutrition and Health', '3']]},
+        {'Fall 2022': [['CAMS-UA 110', 'The Science of Happiness', '4'], ['MATH-UA 120', 'Discrete Mathematics', '4'], ['CSCI-UA 202', 'Operating Systems', '4'], ['NUTR-UE 119', 'Nutrition and Health', '3']]},
     ]
     test_pass = [True for i in range(6)]
     test_idx = 0
@@ -0,0 +1,112 @@
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+from courses import parse_cache
+from courses.models import Student
+from courses.parse_cache import PARSE_CACHE, PageFingerprint, page_fingerprint, parse_key, parser_version
+from courses.parse_course_history import parse_course_history
+
+
+FIXTURES = os.path.join(settings.BASE_DIR, 'test/course_history_tests')
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name)) as f:
+        return f.read()
+
+
+class ParserVersionTestCase(SimpleTestCase):
+    def test_changes_with_the_parser(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.py', delete=False) as f:
+            f.write('PARSER = 1\n')
+        self.addCleanup(os.remove, f.name)
+        module = SimpleNamespace(__file__=f.name)
+        version = parser_version(module)
+        with open(f.name, 'w') as f:
+            f.write('PARSER = 2\n')
+        self.assertNotEqual(parser_version(module), version)
+        self.assertIn(parse_cache.PARSER_VERSION, parse_key('fingerprint'))
+
+
+class PageFingerprintTestCase(SimpleTestCase):
+    def test_normalized(self):
+        text = read_fixture('test_case3.txt')
+        self.assertEqual(page_fingerprint(text), page_fingerprint('\n ' + text.replace('\n', '\r\n') + '\n\n'))
+        self.assertNotEqual(page_fingerprint(text), page_fingerprint(read_fixture('test_case2.txt')))
+
+    def test_chunks(self):
+        text = '  <h3>Fall\r\n 2022</h3>\r\n\r\n<p>x</p>\r\n  '
+        for size in (1, 2, 3, 5):
+            fingerprint = PageFingerprint()
+            for start in range(0, len(text), size):
+                fingerprint.update(text[start:start + size])
+            self.assertEqual(fingerprint.hexdigest(), page_fingerprint(text), size)
+
+
+class UploadShortCircuitTestCase(APITestCase):
+    def setUp(self):
+        caches[PARSE_CACHE].clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('taken-courses-api')
+        self.text = read_fixture('test_case3.txt')
+
+    def upload(self, text):
+        return self.client.post(self.url, {
+            'course_file': SimpleUploadedFile('history.html', text.encode()),
+            'updateCourse': 'true',
+        }, format='multipart')
+
+    def post_page(self, text):
+        return self.client.post(self.url, {
+            'course_dict': text, 'parseCourse': True, 'updateCourse': True,
+        }, format='json')
+
+    def test_same_page_is_parsed_once(self):
+        with patch.object(parse_cache, 'CourseHistoryParser', wraps=parse_cache.CourseHistoryParser) as parse:
+            first = self.upload(self.text)
+            second = self.upload(self.text.replace('\n', '\r\n'))
+        self.assertEqual(parse.call_count, 1)
+        self.assertEqual(first.data['student'], second.data['student'])
+        self.assertEqual(Student.objects.get(user=self.user).course_dict, parse_course_history(self.text))
+
+    def test_unchanged_upload_skips_the_write(self):
+        first = self.upload(self.text)
+        self.assertFalse(first.data['skipped'])
+        # the student and its majors are read, nothing is written
+        with self.assertNumQueries(2):
+            second = self.upload(self.text)
+        self.assertTrue(second.data['skipped'])
+        self.assertEqual(second.data['student'], first.data['student'])
+        # a changed history is written too, with its taken courses, in a transaction
+        with self.assertNumQueries(9):
+            third = self.post_page(read_fixture('test_case2.txt'))
+        self.assertFalse(third.data['skipped'])
+
+    def test_unchanged_history_keeps_the_recommendation(self):
+        self.upload(self.text)
+        with patch('courses.views.recommendation_cache') as recommendation_cache:
+            response = self.post_page(self.text)
+        self.assertTrue(response.data['skipped'])
+        recommendation_cache.invalidate_student.assert_not_called()
+
+    def test_json_history(self):
+        history = {'Fall 2022': [['MATH-SHU 131', 'Calculus', '4']]}
+        self.client.post(self.url, {'course_dict': json.dumps(history), 'updateCourse': True}, format='json')
+        response = self.client.post(self.url, {'course_dict': json.dumps(history), 'updateCourse': True}, format='json')
+        self.assertTrue(response.data['skipped'])
+        response = self.client.post(self.url, {'course_dict': json.dumps({}), 'updateCourse': False}, format='json')
+        self.assertTrue(response.data['skipped'])
+        self.assertEqual(Student.objects.get(user=self.user).course_dict, history)
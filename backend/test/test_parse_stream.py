@@ -0,0 +1,84 @@
+import os
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from courses.models import Student
+from courses.parse_course_history import CourseHistoryParser, parse_course_history, parse_course_history_lines
+
+
+FIXTURES = os.path.join(settings.BASE_DIR, 'test/course_history_tests')
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name)) as f:
+        return f.read()
+
+
+class StreamingParseTestCase(SimpleTestCase):
+    def test_file_lines_match_text(self):
+        for i in range(1, 7):
+            name = f'test_case{i}.txt'
+            with open(os.path.join(FIXTURES, name)) as f:
+                self.assertEqual(parse_course_history_lines(f), parse_course_history(read_fixture(name)), name)
+
+    def test_fixture(self):
+        self.assertEqual(parse_course_history(read_fixture('test_case4.txt')), {'Fall 2022': [
+            ['CAMS-UA 110', 'The Science of Happiness', ''],
+            ['MATH-UA 120', 'Discrete Mathematics', '4'],
+            ['CSCI-UA 202', 'Operating Systems', '4'],
+            ['NUTR-UE 119', 'Nutrition and Health', '3'],
+        ]})
+
+    def test_many_semesters(self):
+        text = read_fixture('test_case3.txt')
+        head, tail = text.split('<h3>Fall 2022</h3>')
+        semester, rest = tail.split('</table>', 1)
+        # 200 more semesters, parsed one line at a time
+        extra = ''.join(f'<h3>Fall {1000 + i}</h3>{semester}</table>\n' for i in range(200))
+        parser = CourseHistoryParser()
+        for line in (head + '<h3>Fall 2022</h3>' + semester + '</table>\n' + extra + rest).splitlines(True):
+            parser.feed(line)
+        course_dict = parser.close()
+        self.assertEqual(len(course_dict), 203)
+        self.assertEqual(course_dict['Fall 1100'], course_dict['Fall 2022'])
+
+    def test_chunks_cut_anywhere(self):
+        text = read_fixture('test_case3.txt')
+        longest = max(
+            semester.index('</table>') for semester in text[text.index('Cumulative'):].split('\n<h3>')[1:]
+        )
+        for size in (1, 7, 1000):
+            parser = CourseHistoryParser()
+            kept = 0
+            for start in range(0, len(text), size):
+                parser.feed(text[start:start + size])
+                kept = max(kept, len(parser._text))
+            self.assertEqual(parser.close(), parse_course_history(text), size)
+            # at most a semester is kept, from its '\n<h3>' to its '</table>'
+            self.assertLess(kept, len('\n<h3>') + longest + len('</table>') + size, size)
+
+    def test_invalid_input(self):
+        self.assertEqual(parse_course_history(''), {})
+        self.assertEqual(parse_course_history('<h3>Fall 2022</h3>\n'), {})
+
+
+class UploadParseTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_upload_file(self):
+        text = read_fixture('test_case3.txt')
+        response = self.client.post(reverse('taken-courses-api'), {
+            'course_file': SimpleUploadedFile('history.html', text.encode()),
+            'updateCourse': 'true',
+        }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Student.objects.get(user=self.user).course_dict, parse_course_history(text))
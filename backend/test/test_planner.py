@@ -0,0 +1,112 @@
+import json
+import os
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from courses.models import Student
+from courses.recommendor import planner as planner_module
+from courses.recommendor.cache import RECOMMENDATION_CACHE
+from courses.recommendor.catalog import get_catalog
+from courses.recommendor.planner import PlanSemester, SearchPlanner
+from courses.recommendor.recommendor import Recommendor
+
+
+def load_history(name):
+    with open(os.path.join(settings.BASE_DIR, f"test/course_recommend_test/{name}.json")) as f:
+        return json.load(f)
+
+
+class SearchPlannerTestCase(SimpleTestCase):
+    def make_planner(self, **kwargs):
+        # 2 free slots in each of 3 semesters. Taking 3 and 4 together in the second
+        # semester, as the first descent does, leaves no time for 0 -> 2 -> 5
+        semesters = [PlanSemester(f'semester_{i}', False, ('Language', 'GPS')) for i in range(3)]
+        return SearchPlanner(
+            semesters, [], [1, 3, 4, 0, 2, 5], 0, get_catalog().major_prereqs, 0, 0,
+            lambda item, ny: 0, 0, lambda completed: 0, **kwargs
+        )
+
+    def test_search_beats_first_descent(self):
+        result = self.make_planner().plan()
+        self.assertTrue(result.optimal)
+        self.assertEqual(result.unmet, 0)
+        order = {item.major: i for i, (items, electives) in enumerate(result.semesters) for item in items}
+        self.assertLess(order[0], order[2])
+        self.assertLess(order[2], order[5])
+        self.assertTrue(all(len(items) <= 2 for items, electives in result.semesters))
+
+    def test_budget_returns_best_so_far(self):
+        with patch.object(planner_module, 'DEADLINE_CHECK_INTERVAL', 1):
+            result = self.make_planner(time_budget=0).plan()
+        self.assertFalse(result.optimal)
+        self.assertEqual(len(result.semesters), 3)
+        self.assertEqual(result.unmet, 1)
+
+    def test_recommend_search(self):
+        cases = [('test_course_history', True), ('test_bf_course_history', False)]
+        for name, expected in cases:
+            for identity in ['chinese', 'inter']:
+                for tense in [False, True]:
+                    valid, recommend = Recommendor(load_history(name), identity, tense).recommend_search()
+                    self.assertEqual(valid, expected, (name, identity, tense))
+                    self.assertTrue(all(len(courses) == 4 for courses in recommend.values()))
+        valid, recommend = Recommendor({}, 'chinese', seed=0).recommend_search()
+        self.assertTrue(valid)
+        self.assertEqual(len(recommend), 8)
+
+    def test_majors_follow_prerequisites(self):
+        recommendor = Recommendor({}, 'inter', seed=0)
+        valid, recommend = recommendor.recommend_search()
+        catalog = recommendor.catalog
+        completed_majors = 0
+        for courses in recommend.values():
+            semester_majors = [
+                requirement.category
+                for course in courses
+                for requirement in catalog.classify(' '.join(course.split()[:2]))
+                if requirement.kind == 'major'
+            ]
+            for major in semester_majors:
+                self.assertTrue(catalog.major_prereqs.is_unlocked(major, completed_majors), major)
+            completed_majors |= catalog.major_prereqs.mask(semester_majors)
+
+
+class SearchPlannerViewTestCase(APITestCase):
+    def setUp(self):
+        caches[RECOMMENDATION_CACHE].clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        Student.objects.create(user=self.user, course_dict=load_history('test_course_history'))
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('rec-courses')
+
+    def test_search_planner(self):
+        response = self.client.get(self.url, {'identity': 'chinese', 'intense': 'false', 'planner': 'search'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['valid'])
+
+    def test_full_history(self):
+        history = load_history('test_course_history')
+        semesters = list(history.values())
+        self.user.student.course_dict = {
+            f'{season} {year}': semesters[i % len(semesters)]
+            for i, (year, season) in enumerate((year, season) for year in range(2020, 2024) for season in ('Spring', 'Fall'))
+        }
+        self.user.student.save()
+        for planner in ('greedy', 'search'):
+            response = self.client.get(self.url, {'identity': 'chinese', 'intense': 'false', 'planner': planner})
+            self.assertEqual(response.status_code, status.HTTP_200_OK, planner)
+            self.assertEqual(response.data, {'valid': None, 'recommend_courses': {}}, planner)
+
+    def test_invalid_planner(self):
+        response = self.client.get(self.url, {'identity': 'chinese', 'intense': 'false', 'planner': 'random'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'identity': 'chinese', 'intense': 'false', 'planner': 'search', 'plans': 2})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,103 @@
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase
+
+from courses.catalog_import import import_catalog
+from courses.catalog_version import VERSION_CACHE
+from courses.models import Course, CoursePrereq
+from courses.recommendor.catalog import get_catalog, get_major_prereqs
+from courses.recommendor.prereq_graph import PrereqCycleError, PrereqGraph
+from courses.recommendor.recommendor import Recommendor
+
+
+class PrereqGraphTestCase(SimpleTestCase):
+    def setUp(self):
+        # 'C' requires ('A' OR 'B') AND 'D', 'E' requires 'C'
+        self.graph = PrereqGraph({'C': [['A', 'B'], ['D']], 'E': [['C']]})
+
+    def test_or_groups(self):
+        self.assertFalse(self.graph.is_unlocked('C', self.graph.mask(['A'])))
+        self.assertTrue(self.graph.is_unlocked('C', self.graph.mask(['A', 'D'])))
+        self.assertTrue(self.graph.is_unlocked('C', self.graph.mask(['B', 'D'])))
+        self.assertTrue(self.graph.is_unlocked('A', 0))
+        # unknown courses have no prerequisites and do not change the bitset
+        self.assertTrue(self.graph.is_unlocked('Z', 0))
+        self.assertEqual(self.graph.mask(['Z']), 0)
+
+    def test_unlocked(self):
+        self.assertEqual(set(self.graph.unlocked(self.graph.mask(['B', 'D']))), {'A', 'B', 'C', 'D'})
+        self.assertEqual(self.graph.unlocked(self.graph.mask(['B', 'D', 'C']), ['E', 'C', 'A']), ['E', 'C', 'A'])
+
+    def test_topological_order(self):
+        order = self.graph.order
+        self.assertLess(order.index('D'), order.index('C'))
+        self.assertLess(order.index('C'), order.index('E'))
+
+    def test_cycle(self):
+        with self.assertRaises(PrereqCycleError):
+            PrereqGraph({'A': [['B']], 'B': [['C']], 'C': [['A']]})
+
+    def test_between_groups(self):
+        # 'C' requires 'A' or 'B', both in the first group, and 'D' or 'E', one of each group
+        graph = PrereqGraph({'C': [['A', 'B'], ['D', 'E']], 'E': [['D']]}).between_groups([['A', 'B'], ['C'], ['E']])
+        self.assertEqual(graph.prereqs(1), ((0,), (2,)))
+        # 'D' is in no group, 'E' requires nothing of the groups
+        self.assertEqual(graph.prereqs(2), ())
+        self.assertFalse(graph.is_unlocked(1, graph.mask([0])))
+        self.assertTrue(graph.is_unlocked(1, graph.mask([0, 2])))
+
+    def test_catalog_graphs(self):
+        catalog = get_catalog()
+        completed = catalog.elective_prereqs.mask(['CSCI-UA 2', 'MATH-UA 101', 'ECON-UA 18'])
+        self.assertIn('CSCI-SHU 360', catalog.elective_prereqs.unlocked(completed))
+        self.assertNotIn('CSCI-SHU 375', catalog.elective_prereqs.unlocked(completed))
+        self.assertFalse(catalog.major_prereqs.is_unlocked(8, catalog.major_prereqs.mask([6])))
+        self.assertTrue(catalog.major_prereqs.is_unlocked(8, catalog.major_prereqs.mask([6, 4])))
+
+    def test_recommended_electives_are_unlocked(self):
+        recommendor = Recommendor({}, 'chinese', False)
+        recommendor.recommend()
+        catalog = recommendor.catalog
+        completed = 0
+        for semester in recommendor.semesters:
+            for course in recommendor.course_history[semester]:
+                course_num = ' '.join(course.split()[:2])
+                if course_num in catalog.sh_electives_by_id:
+                    self.assertTrue(catalog.elective_prereqs.is_unlocked(course_num, completed), course)
+            completed |= catalog.elective_prereqs.mask(' '.join(course.split()[:2]) for course in recommendor.course_history[semester])
+
+
+class PrereqGraphModelsTestCase(TestCase):
+    def setUp(self):
+        caches[VERSION_CACHE].clear()
+
+    def test_from_models(self):
+        ics, ds, algo = (Course.objects.create(id=id, name=id) for id in ['CSCI-SHU 101', 'CSCI-SHU 210', 'CSCI-SHU 220'])
+        discrete = Course.objects.create(id='CSCI-SHU 2314', name='Discrete')
+        CoursePrereq.objects.create(course=ds).prereqs.add(ics)
+        CoursePrereq.objects.create(course=algo).prereqs.add(ds)
+        CoursePrereq.objects.create(course=algo).prereqs.add(discrete)
+
+        with self.assertNumQueries(2):
+            graph = PrereqGraph.from_models()
+        self.assertFalse(graph.is_unlocked('CSCI-SHU 220', graph.mask(['CSCI-SHU 210'])))
+        self.assertTrue(graph.is_unlocked('CSCI-SHU 220', graph.mask(['CSCI-SHU 210', 'CSCI-SHU 2314'])))
+
+    def test_major_prereqs_are_read_from_the_database(self):
+        catalog = get_catalog()
+        # not imported yet, the files order the major courses
+        self.assertIs(get_major_prereqs(catalog), catalog.major_prereqs)
+
+        import_catalog(catalog)
+        major_prereqs = get_major_prereqs(catalog)
+        for group_idx in range(len(catalog.major_groups)):
+            self.assertEqual(major_prereqs.prereqs(group_idx), catalog.major_prereqs.prereqs(group_idx))
+        with self.assertNumQueries(0):
+            self.assertIs(get_major_prereqs(catalog), major_prereqs)
+
+        # algorithms no longer require discrete mathematics
+        for course_prereq in CoursePrereq.objects.filter(course__in=catalog.major_groups[8]):
+            if 'CSCI-SHU 2314' in course_prereq.prereqs.values_list('id', flat=True):
+                course_prereq.delete()
+        major_prereqs = get_major_prereqs(catalog)
+        self.assertTrue(major_prereqs.is_unlocked(8, major_prereqs.mask([6])))
+        self.assertFalse(catalog.major_prereqs.is_unlocked(8, catalog.major_prereqs.mask([6])))
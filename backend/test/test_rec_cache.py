@@ -0,0 +1,78 @@
+import json
+import os
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from courses.catalog_version import get_catalog_version
+from courses.models import Student
+from courses.recommendor import cache as cache_module
+from courses.recommendor.cache import RECOMMENDATION_CACHE, history_fingerprint, recommendation_key
+
+
+class RecommendationKeyTestCase(APITestCase):
+    def test_fingerprint_is_normalized(self):
+        history = {'Fall 2021': [['CSCI-SHU - 210', 'Data Structures', '4'], ['MATH-SHU - 131', 'Calculus', '4']]}
+        same = {'Fall 2021': [['MATH-SHU 131', 'Calculus I', '4'], ['CSCI-SHU 210', 'Data Structures', '4']]}
+        self.assertEqual(history_fingerprint(history), history_fingerprint(same))
+        self.assertNotEqual(history_fingerprint(history), history_fingerprint({'Spring 2022': history['Fall 2021']}))
+
+    def test_key_covers_identity_mode_and_catalog(self):
+        keys = {
+            recommendation_key({}, 'chinese', False, 'v1'),
+            recommendation_key({}, 'inter', False, 'v1'),
+            recommendation_key({}, 'chinese', True, 'v1'),
+            recommendation_key({}, 'chinese', False, 'v2'),
+        }
+        self.assertEqual(len(keys), 4)
+
+
+class RecommendCourseCacheTestCase(APITestCase):
+    def setUp(self):
+        caches[RECOMMENDATION_CACHE].clear()
+        with open(os.path.join(settings.BASE_DIR, "test/course_recommend_test/test_course_history.json")) as f:
+            self.course_history = json.load(f)
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.student = Student.objects.create(user=self.user, course_dict=self.course_history)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('rec-courses')
+        self.params = {'identity': 'chinese', 'intense': 'false'}
+
+    def test_second_request_is_a_hit(self):
+        with patch.object(cache_module, 'Recommendor', wraps=cache_module.Recommendor) as recommendor:
+            first = self.client.get(self.url, self.params)
+            second = self.client.get(self.url, self.params)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(recommendor.call_count, 1)
+        self.assertEqual(cache_module.recommendation_cache.stats(), {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+    def test_history_update_invalidates(self):
+        self.client.get(self.url, self.params)
+        response = self.client.post(reverse('taken-courses-api'), {
+            'course_dict': json.dumps({}), 'updateCourse': True, 'parseCourse': False,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        catalog_version = f'{cache_module.get_catalog().version}.{get_catalog_version()}'
+        key = recommendation_key(self.course_history, 'chinese', False, catalog_version)
+        self.assertIsNone(caches[RECOMMENDATION_CACHE].get(key))
+
+        # a fresh user, as a new request would load it
+        self.client.force_authenticate(user=User.objects.get(id=self.user.id))
+        response = self.client.get(self.url, self.params)
+        self.assertEqual(cache_module.recommendation_cache.stats()['misses'], 2)
+        self.assertIn('freshmen_1st', response.data['recommend_courses'])
+
+    def test_stats_endpoint_requires_staff(self):
+        response = self.client.get(reverse('rec-courses-cache-stats'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(reverse('rec-courses-cache-stats'))
+        self.assertEqual(response.data, {'hits': 0, 'misses': 0, 'hit_rate': 0.0})
@@ -0,0 +1,89 @@
+import json
+import os
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from courses.models import Student
+from courses.recommendor.cache import RECOMMENDATION_CACHE
+from courses.recommendor.recommendor import Recommendor, RecommendorPreparer
+
+
+def load_history():
+    with open(os.path.join(settings.BASE_DIR, "test/course_recommend_test/test_course_history.json")) as f:
+        return json.load(f)
+
+
+class RecommendPlansTestCase(SimpleTestCase):
+    def setUp(self):
+        self.course_history = {'Fall 2020': load_history()['Fall 2020']}
+
+    def test_same_seed_same_plans(self):
+        first = Recommendor(dict(self.course_history), 'chinese', seed=7).recommend_plans(3)
+        second = Recommendor(dict(self.course_history), 'chinese', seed=7).recommend_plans(3)
+        self.assertEqual(first, second)
+        self.assertEqual(
+            Recommendor(dict(self.course_history), 'chinese', seed=7).recommend(),
+            Recommendor(dict(self.course_history), 'chinese', seed=7).recommend(),
+        )
+
+    def test_plans_are_distinct(self):
+        plans = Recommendor(dict(self.course_history), 'chinese', seed=1).recommend_plans(5)
+        self.assertEqual(len(plans), 5)
+        semesters = [json.dumps(recommend, sort_keys=True) for valid, recommend in plans]
+        self.assertEqual(len(set(semesters)), 5)
+
+    def test_plans_share_major_schedule(self):
+        recommendor = Recommendor(dict(self.course_history), 'chinese', seed=3)
+        plans = recommendor.recommend_plans(4)
+        major_courses = {course for group in recommendor.cs_major_courses for course in group}
+
+        def majors(recommend):
+            return {
+                semester: [course.split(' | ')[0] for course in courses if course.split(' | ')[0] in major_courses]
+                for semester, courses in recommend.items()
+            }
+
+        # only the core and elective picks differ, the major courses are sequenced once
+        for valid, recommend in plans:
+            self.assertEqual(majors(recommend), majors(plans[0][1]))
+
+    def test_preparation_runs_once(self):
+        with patch.object(RecommendorPreparer, 'general_prepare', wraps=RecommendorPreparer().general_prepare) as prepare:
+            Recommendor(dict(self.course_history), 'chinese', seed=0).recommend_plans(4)
+        self.assertEqual(prepare.call_count, 1)
+
+    def test_no_semester_left(self):
+        history = {semester: [] for semester in Recommendor({}, 'chinese').semesters}
+        self.assertEqual(Recommendor(history, 'chinese').recommend_plans(3), [])
+
+
+class RecommendPlansViewTestCase(APITestCase):
+    def setUp(self):
+        caches[RECOMMENDATION_CACHE].clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        Student.objects.create(user=self.user, course_dict={'Fall 2020': load_history()['Fall 2020']})
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('rec-courses')
+
+    def test_plans(self):
+        params = {'identity': 'chinese', 'intense': 'false', 'plans': 3, 'seed': 11}
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['plans']), 3)
+        self.assertEqual(set(response.data['plans'][0]), {'valid', 'recommend_courses'})
+
+        caches[RECOMMENDATION_CACHE].clear()
+        self.assertEqual(self.client.get(self.url, params).data, response.data)
+
+    def test_invalid_plans(self):
+        for plans in ['0', '11', 'many']:
+            response = self.client.get(self.url, {'identity': 'chinese', 'intense': 'false', 'plans': plans})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, plans)
@@ -0,0 +1,99 @@
+import random
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase
+
+from courses.recommendor import cache as cache_module
+from courses.recommendor.cache import RECOMMENDATION_CACHE, RecommendationCache
+from courses.recommendor.catalog import get_catalog
+from courses.recommendor.recommendor import Recommendor, RecommendorPreparer
+from courses.recommendor.requirements import RequirementState
+
+
+def catalog_courses(catalog):
+    courses = [[course_num, '', '4', 'A'] for group in catalog.major_groups for course_num in group]
+    for core_courses in list(catalog.sh_core_courses.values()) + list(catalog.ny_core_courses.values()):
+        courses += [[course.id, course.name, '4', 'A'] for course in core_courses]
+    courses += [[course.id, course.name, '4', 'A'] for course in catalog.sh_elective_courses]
+    courses += [[course.id, course.name, '4', 'A'] for course in catalog.ny_elective_courses[:50]]
+    return courses + [['ECON-SHU 1', 'Principles of Macroeconomics', '4', 'A'], ['MATH-SHU - 131', 'Calculus', '4', 'A']]
+
+
+class RequirementStateTestCase(SimpleTestCase):
+    def setUp(self):
+        self.catalog = get_catalog()
+        self.courses = catalog_courses(self.catalog)
+        self.semesters = Recommendor({}, 'chinese').semesters
+
+    def assertSameState(self, state, course_history):
+        recommendor = Recommendor(course_history, 'chinese')
+        untaken_core_courses, taken_electives = RecommendorPreparer(self.catalog).general_prepare(recommendor.course_history)
+        self.assertEqual(state.untaken_core_courses(), untaken_core_courses)
+        self.assertEqual(sorted(state.taken_electives()), sorted(taken_electives))
+        self.assertEqual(state.untaken_major_courses(recommendor.major_course_list), recommendor.untaken_major_courses)
+        self.assertEqual(state.completed, recommendor.completed)
+
+    def test_random_edits_match_full_recompute(self):
+        rng = random.Random(0)
+        course_history = {}
+        state = RequirementState.from_history(self.catalog, course_history)
+        for step in range(300):
+            semester = self.semesters[rng.randrange(len(self.semesters))]
+            action = rng.random()
+            if action < 0.6:
+                course_history.setdefault(semester, []).append(rng.choice(self.courses))
+            elif action < 0.9 and course_history.get(semester):
+                course_history[semester].pop(rng.randrange(len(course_history[semester])))
+            else:
+                course_history.pop(semester, None)
+            state.update(self.catalog, {key: list(courses) for key, courses in course_history.items()})
+            self.assertSameState(state, course_history)
+
+    def test_update_reports_changed_semesters(self):
+        course_history = {'Fall 2020': [self.courses[0]], 'Spring 2021': [self.courses[1]]}
+        state = RequirementState.from_history(self.catalog, course_history)
+        self.assertEqual(state.update(self.catalog, course_history), [])
+        changed = {'Fall 2020': [self.courses[0]], 'Spring 2021': [self.courses[2]]}
+        self.assertEqual(state.update(self.catalog, changed), ['Spring 2021'])
+        self.assertEqual(state.update(self.catalog, {'Fall 2020': [self.courses[0]]}), ['Spring 2021'])
+
+    def test_same_recommendation(self):
+        rng = random.Random(1)
+        for i in range(20):
+            course_history = {
+                semester: rng.sample(self.courses, 4) for semester in self.semesters[:rng.randint(0, 6)]
+            }
+            state = RequirementState.from_history(self.catalog, course_history)
+            for seed in range(3):
+                self.assertEqual(
+                    Recommendor(course_history, 'inter', seed=seed, requirements=state).recommend(),
+                    Recommendor(course_history, 'inter', seed=seed).recommend(),
+                )
+                self.assertEqual(
+                    Recommendor(course_history, 'chinese', True, seed=seed, requirements=state).recommend_search(),
+                    Recommendor(course_history, 'chinese', True, seed=seed).recommend_search(),
+                )
+
+
+# the recommendation cache reads the major course prerequisites from the database
+class SavedRequirementStateTestCase(TestCase):
+    def setUp(self):
+        caches[RECOMMENDATION_CACHE].clear()
+        self.catalog = get_catalog()
+        self.courses = catalog_courses(self.catalog)
+
+    def test_state_is_updated_not_rebuilt(self):
+        rec_cache = RecommendationCache()
+        course_history = {'Fall 2020': self.courses[:4]}
+        with patch.object(cache_module.RequirementState, 'from_history', wraps=RequirementState.from_history) as from_history:
+            rec_cache.get_or_compute(1, course_history, 'chinese', False)
+            course_history = {'Fall 2020': self.courses[:4], 'Spring 2021': self.courses[4:8]}
+            rec_cache.get_or_compute(1, course_history, 'chinese', False, seed=0)
+        self.assertEqual(from_history.call_count, 1)
+        state = rec_cache.requirement_state(1, course_history, self.catalog)
+        self.assertEqual(list(state.history), ['Fall 2020', 'Spring 2021'])
+        self.assertEqual(
+            rec_cache.get_or_compute(1, course_history, 'chinese', False, seed=5),
+            Recommendor(course_history, 'chinese', False, seed=5).recommend(),
+        )
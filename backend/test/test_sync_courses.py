@@ -0,0 +1,79 @@
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from courses.models import Course, Student, StudentTakenCourse
+
+
+def make_history(semesters, courses_per_semester, subject='CSCI-SHU'):
+    """A history of new courses, numbered by semester."""
+    return {
+        f'Fall {2000 + semester}': [
+            [f'{subject} - {semester * 100 + course}', f'Course {semester}.{course}', '4' if course % 2 else '2']
+            for course in range(courses_per_semester)
+        ]
+        for semester in range(semesters)
+    }
+
+
+class SyncCoursesTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.student = Student.objects.create(user=self.user)
+        Course.objects.create(id='MATH-SHU 131', name='Calculus', credit=4)
+
+    def taken(self):
+        return sorted(self.student.taken_courses.values_list('semester', 'course_id'))
+
+    def test_sync(self):
+        self.student.course_dict = {
+            'Fall 2021': [['MATH-SHU - 131', 'Calculus', '4'], ['CSCI-SHU - 11', 'Introduction', '']],
+            'Spring 2022': [['CSCI-SHU 210', 'Data Structures', '4'], ['CSCI-SHU - 210', 'Data Structures', '4']],
+        }
+        self.student.sync_courses()
+        self.assertEqual(self.taken(), [
+            ('Fall 2021', 'CSCI-SHU 11'), ('Fall 2021', 'MATH-SHU 131'), ('Spring 2022', 'CSCI-SHU 210'),
+        ])
+        # empty credits give the default credits
+        self.assertEqual(Course.objects.get(id='CSCI-SHU 11').credit, 4)
+        self.assertEqual(self.student.credit, 12)
+        self.assertEqual(self.student.level_id, 2)
+        self.student.calc_taken_credit()
+        self.assertEqual(self.student.credit, 12)
+
+        self.student.course_dict = {'Fall 2021': [['MATH-SHU 131', 'Calculus', '4']], 'Spring 2022': []}
+        self.student.sync_courses()
+        self.assertEqual(self.taken(), [('Fall 2021', 'MATH-SHU 131')])
+        self.assertEqual(self.student.credit, 4)
+
+    def test_taken_courses_are_unique(self):
+        course = Course.objects.get(id='MATH-SHU 131')
+        StudentTakenCourse.objects.create(student=self.student, course=course, semester='Fall 2021')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            StudentTakenCourse.objects.create(student=self.student, course=course, semester='Fall 2021')
+        StudentTakenCourse.objects.create(student=self.student, course=course, semester='Spring 2022')
+        self.student.course_dict = {'Fall 2021': [['MATH-SHU 131', 'Calculus', '4']]}
+        self.student.sync_courses()
+        self.assertEqual(self.taken(), [('Fall 2021', 'MATH-SHU 131')])
+
+    def test_queries_do_not_grow_with_the_history(self):
+        for semesters, courses_per_semester in ((2, 1), (8, 5), (40, 6)):
+            Course.objects.exclude(id='MATH-SHU 131').delete()
+            self.student.taken_courses.all().delete()
+            history = make_history(semesters, courses_per_semester)
+            # taken courses and courses read, courses and taken courses created, requirements of the courses read
+            self.student.course_dict = history
+            with self.assertNumQueries(5):
+                self.student.sync_courses()
+            self.assertEqual(len(self.taken()), semesters * courses_per_semester)
+            # nothing changed: only read
+            with self.assertNumQueries(2):
+                self.student.sync_courses()
+            # half of the semesters replaced: read, taken courses created and deleted, no new course
+            self.student.course_dict = dict(list(history.items())[::2] + [
+                (f'Spring {semester}', courses) for semester, courses in list(history.items())[1::2]
+            ])
+            with self.assertNumQueries(4):
+                self.student.sync_courses()
+            self.assertEqual(len(self.taken()), semesters * courses_per_semester)
+            self.assertEqual(self.student.credit, semesters * sum(4 if course % 2 else 2 for course in range(courses_per_semester)))
@@ -0,0 +1,61 @@
+import os
+import re
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from courses.parse_course_history import (
+    CourseHistoryParser, TranscriptCourse, parse_course_history, parse_gpa, parse_transcript,
+)
+
+
+FIXTURES = os.path.join(settings.BASE_DIR, 'test/course_history_tests')
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name)) as f:
+        return f.read()
+
+
+class TranscriptTestCase(SimpleTestCase):
+    def test_fixtures_match_course_history(self):
+        for i in range(1, 7):
+            text = read_fixture(f'test_case{i}.txt')
+            self.assertEqual(parse_transcript(text).course_dict(), parse_course_history(text), i)
+
+    def test_grades_and_gpa(self):
+        transcript = parse_transcript(read_fixture('test_case3.txt'))
+        self.assertEqual(transcript.gpa, 0.001)
+        self.assertEqual([semester.name for semester in transcript.semesters], ['Spring 2024', 'Fall 2023', 'Fall 2022'])
+        self.assertEqual([semester.gpa for semester in transcript.semesters], [None, 3.715, 3.933])
+        self.assertEqual(transcript.semesters[2].courses[0], TranscriptCourse('CAMS-UA 110', 'The Science of Happiness', '4', 'A'))
+        self.assertEqual([course.grade for course in transcript.semesters[1].courses], ['A', 'A-', 'A-', 'A-'])
+        # not graded yet
+        self.assertEqual({course.grade for course in transcript.semesters[0].courses}, {''})
+
+    def test_missing_cells(self):
+        transcript = parse_transcript(read_fixture('test_case6.txt'))
+        self.assertEqual([course.grade for course in transcript.semesters[0].courses], ['A', 'A', '', ''])
+
+    def test_moved_cells(self):
+        text = read_fixture('test_case4.txt')
+        # the grade cell first and an attribute after every data-label
+        moved = re.sub(
+            r'(<tr class=" accordion-row[^>]*>\n)((?:<td[^\n]*</td>\n)*?)(<td[^\n]*data-label="Final Grade">[^\n]*\n)',
+            r'\1\3\2', text,
+        )
+        self.assertNotEqual(moved, text)
+        moved = re.sub(r'(data-label="[^"]*")>', r'\1 data-x="1">', moved).replace(
+            '<tr class=" accordion-row', '<tr data-y="2" class=" accordion-row')
+        self.assertEqual(parse_transcript(moved), parse_transcript(text))
+
+    def test_chunks(self):
+        text = read_fixture('test_case3.txt')
+        parser = CourseHistoryParser()
+        for start in range(0, len(text), 7):
+            parser.feed(text[start:start + 7])
+        self.assertEqual(parser.close_transcript(), parse_transcript(text))
+
+    def test_no_grades(self):
+        self.assertEqual(parse_transcript('<html><h3>Fall 2022</h3></html>').semesters, [])
+        self.assertIsNone(parse_gpa(' Not Calculated'))
@@ -0,0 +1,125 @@
+import os
+import shutil
+import tarfile
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from courses.models import Course, Major, Student, StudentTakenCourse
+from courses.parse_course_history import parse_course_history
+from courses.transcript_import import (
+    CHUNKS_PER_WORKER, ImportCheckpoint, ParsedFile, import_histories, iter_transcripts, parse_transcript_files,
+)
+
+
+FIXTURES = os.path.join(settings.BASE_DIR, 'test/course_history_tests')
+
+
+class ImportTranscriptsTestCase(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+        os.mkdir(os.path.join(self.folder, 'cohort'))
+        self.histories = {}
+        for i in range(1, 7):
+            with open(os.path.join(FIXTURES, f'test_case{i}.txt')) as f:
+                text = f.read()
+            name = f'student{i}.html' if i % 2 else f'cohort/student{i}.html'
+            with open(os.path.join(self.folder, name), 'w') as f:
+                f.write(text)
+            self.histories[f'student{i}'] = parse_course_history(text)
+        with open(os.path.join(self.folder, 'broken.html'), 'w') as f:
+            f.write('<html>not a transcript</html>')
+        self.cs = Major.objects.create(name='CS')
+
+    def run_command(self, path, *args):
+        out, err = StringIO(), StringIO()
+        call_command('import_transcripts', path, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def assert_imported(self):
+        for username, course_dict in self.histories.items():
+            student = Student.objects.get(user__username=username)
+            self.assertEqual(student.course_dict, course_dict)
+            self.assertEqual(student.level_id, len(course_dict))
+            taken = sorted(StudentTakenCourse.objects.filter(student=student).values_list('semester', 'course_id'))
+            self.assertEqual(taken, sorted(
+                (semester, course[0]) for semester, courses in course_dict.items() for course in courses
+            ))
+            self.assertEqual(student.credit, sum(
+                Course.objects.get(id=course_id).credit for semester, course_id in taken
+            ))
+            self.assertEqual(list(student.major.all()), [self.cs])
+
+    def test_folder(self):
+        out, err = self.run_command(self.folder, '--workers', '1', '--batch-size', '4')
+        self.assertIn('7 files, 6 imported, 1 failed', out)
+        self.assertIn('broken.html\tValueError: no course history found', err)
+        self.assertFalse(User.objects.get(username='student1').has_usable_password())
+        self.assert_imported()
+
+    def test_pool_and_reimport(self):
+        self.run_command(self.folder, '--workers', '2', '--batch-size', '2')
+        self.assert_imported()
+        # importing again replaces the histories
+        Student.objects.filter(user__username='student1').update(course_dict={})
+        self.run_command(self.folder, '--workers', '2')
+        self.assertEqual(Student.objects.count(), 6)
+        self.assert_imported()
+
+    def test_files_are_read_as_they_are_parsed(self):
+        read = []
+
+        def items():
+            for i in range(100):
+                read.append(i)
+                yield f'student{i}.html', b'<html>not a transcript</html>'
+
+        results = parse_transcript_files(items(), workers=2, chunksize=3)
+        self.assertEqual(next(results).name, 'student0.html')
+        # the chunks in flight only, not the whole input
+        self.assertLessEqual(len(read), 2 * CHUNKS_PER_WORKER * 3)
+        self.assertEqual([result.name for result in results], [f'student{i}.html' for i in range(1, 100)])
+
+    def test_course_listed_twice(self):
+        history = {
+            'Fall 2021': [['CSCI-SHU 11', 'Intro', '4'], ['CSCI-SHU - 11', 'Intro', '4'], ['MATH-SHU 131', 'Calculus', '2']],
+            'Spring 2022': [['CSCI-SHU 11', 'Intro', '4']],
+        }
+        import_histories([ParsedFile('imported.html', 'imported', history, None)])
+        imported = Student.objects.get(user__username='imported')
+        uploaded = Student.objects.create(user=User.objects.create_user(username='uploaded'), course_dict=history)
+        uploaded.sync_courses()
+        # the same credits and taken courses as a history synced after an upload
+        self.assertEqual(imported.credit, 10)
+        self.assertEqual(imported.credit, uploaded.credit)
+        self.assertEqual(imported.taken_courses.count(), uploaded.taken_courses.count())
+
+    def test_tarball(self):
+        tarball = os.path.join(self.folder, 'cohort.tar.gz')
+        with tarfile.open(tarball, 'w:gz') as tar:
+            tar.add(self.folder, arcname='export', filter=lambda info: None if info.name.endswith('.gz') else info)
+        out, err = self.run_command(tarball, '--workers', '1', '--pattern', 'student*')
+        self.assertIn('6 files, 6 imported, 0 failed', out)
+        self.assert_imported()
+
+    def test_resume(self):
+        checkpoint = os.path.join(self.folder, 'checkpoint.json')
+        error_log = os.path.join(self.folder, 'errors.log')
+        ImportCheckpoint(checkpoint).add(['student1.html', 'cohort/student2.html'])
+        out, err = self.run_command(
+            self.folder, '--workers', '1', '--checkpoint', checkpoint, '--error-log', error_log, '--pattern', '*.html',
+        )
+        self.assertIn('5 files, 4 imported, 1 failed, 2 skipped', out)
+        self.assertFalse(Student.objects.filter(user__username__in=['student1', 'student2']).exists())
+        with open(error_log) as f:
+            self.assertEqual(f.read(), 'broken.html\tValueError: no course history found\n')
+        # the failed file is tried again, the rest is skipped
+        self.assertEqual(
+            [name for name, data in iter_transcripts(self.folder, '*.html', ImportCheckpoint(checkpoint).done)],
+            ['broken.html'],
+        )
@@ -0,0 +1,118 @@
+import os
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from courses import uploads
+from courses.models import Student, UploadJob
+from courses.parse_course_history import parse_course_history
+
+
+FIXTURES = os.path.join(settings.BASE_DIR, 'test/course_history_tests')
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name)) as f:
+        return f.read()
+
+
+@override_settings(UPLOAD_JOB_WORKERS=0)
+class UploadJobTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.text = read_fixture('test_case3.txt')
+
+    def upload(self, text):
+        return self.client.post(reverse('taken-courses-api'), {
+            'course_file': SimpleUploadedFile('history.html', text.encode()),
+            'updateCourse': 'true',
+            'async': 'true',
+        }, format='multipart')
+
+    def test_upload_returns_before_parsing(self):
+        with patch.object(uploads, 'parse_page', wraps=uploads.parse_page) as parse:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.upload(self.text)
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+            # the web process leaves the job to the worker
+            parse.assert_not_called()
+            job = self.client.get(response.data['status_url']).data
+            self.assertEqual((job['job'], job['status']), (response.data['job'], 'pending'))
+            self.assertEqual(uploads.run_pending_jobs(), 1)
+            parse.assert_called_once()
+        job = self.client.get(response.data['status_url']).data
+        self.assertEqual(job['status'], 'done')
+        self.assertFalse(job['skipped'])
+        self.assertEqual(job['student']['course_dict'], parse_course_history(self.text))
+        self.assertEqual(UploadJob.objects.get(id=job['job']).page, '')
+
+    def test_failed_job(self):
+        response = self.upload(self.text)
+        uploads.run_pending_jobs()
+        failed = self.upload(self.text)
+        with patch.object(uploads, 'parse_page', side_effect=ValueError('bad page')):
+            uploads.run_pending_jobs()
+        self.assertEqual(self.client.get(response.data['status_url']).data['status'], 'done')
+        job = self.client.get(failed.data['status_url']).data
+        self.assertEqual((job['status'], job['error']), ('failed', 'ValueError: bad page'))
+
+    def test_lost_job_is_run_again(self):
+        response = self.upload(self.text)
+        # a worker claimed the job and crashed
+        UploadJob.objects.filter(id=response.data['job']).update(status=UploadJob.Status.RUNNING, started=timezone.now())
+        self.assertEqual(uploads.run_pending_jobs(), 0)
+        UploadJob.objects.filter(id=response.data['job']).update(
+            started=timezone.now() - timedelta(seconds=settings.UPLOAD_JOB_TIMEOUT + 1))
+        self.assertEqual(uploads.run_pending_jobs(), 1)
+        self.assertEqual(self.client.get(response.data['status_url']).data['status'], 'done')
+
+    def test_jobs_of_other_users_are_hidden(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.upload(self.text)
+        other = User.objects.create_user(username='other', password='testpassword123')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(response.data['status_url']).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_async_needs_a_page(self):
+        response = self.client.post(reverse('taken-courses-api'), {'course_dict': '{}', 'async': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_pending_jobs_command(self):
+        response = self.upload(self.text)
+        err = StringIO()
+        call_command('run_upload_jobs', '--once', stderr=err)
+        self.assertIn('1 upload jobs run', err.getvalue())
+        self.assertEqual(self.client.get(response.data['status_url']).data['status'], 'done')
+        # a job is run once
+        self.assertFalse(uploads.run_upload_job(response.data['job']))
+
+
+@override_settings(UPLOAD_JOB_WORKERS=2)
+class UploadJobThreadTestCase(TransactionTestCase):
+    def test_background_thread(self):
+        user = User.objects.create_user(username='testuser', password='testpassword123')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        text = read_fixture('test_case2.txt')
+        response = client.post(reverse('taken-courses-api'), {
+            'course_dict': text, 'parseCourse': True, 'updateCourse': True, 'async': True,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        deadline = time.monotonic() + 10
+        while client.get(response.data['status_url']).data['status'] in ('pending', 'running'):
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+        self.assertEqual(Student.objects.get(user=user).course_dict, parse_course_history(text))